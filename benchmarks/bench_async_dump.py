@@ -0,0 +1,60 @@
+"""
+Compare a full download of a Grove index one node at a time through
+`getNextNode` against the level-order `AsyncGroveClient.dump`.
+
+This needs the test chain to be served over JSON-RPC at ``GROVE_RPC_URL``,
+``http://127.0.0.1:8545`` by default.  Run with
+``py.test benchmarks/bench_async_dump.py -s`` to see the report.  The index
+has 10000 nodes by default; set ``GROVE_DUMP_SIZE`` to change it.
+"""
+import asyncio
+import os
+import time
+
+from grove.aio import AsyncGroveClient, AsyncRPC, ConnectionPool
+
+from conftest import random_values, report
+
+
+RPC_URL = os.environ.get('GROVE_RPC_URL', 'http://127.0.0.1:8545')
+N = int(os.environ.get('GROVE_DUMP_SIZE', '10000'))
+BATCH_SIZE = 50
+
+
+def test_async_dump(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+    index_name = "bench-async-dump"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    ids = ["n{0}".format(i) for i in range(N)]
+    values = random_values(N)
+
+    for start in range(0, N, BATCH_SIZE):
+        grove.insertMany(index_name, ids[start:start + BATCH_SIZE], values[start:start + BATCH_SIZE])
+
+    rows = []
+    dumps = []
+
+    for name, pool_size, method in (('walk', 1, 'walk'), ('dump', 1, 'dump'), ('dump', 4, 'dump'), ('dump', 16, 'dump')):
+        loop = asyncio.new_event_loop()
+        pool = ConnectionPool(RPC_URL, size=pool_size)
+        client = AsyncGroveClient(AsyncRPC(pool), grove._meta.address)
+
+        started_at = time.time()
+        dumps.append(loop.run_until_complete(getattr(client, method)(index_id)))
+        elapsed = time.time() - started_at
+
+        pool.close()
+        loop.close()
+
+        rows.append((name, pool_size, pool.requests, "{0:.2f}".format(elapsed)))
+
+    assert len(dumps[0]) == N
+    for dump in dumps[1:]:
+        assert dump == dumps[0]
+
+    report(
+        "full download of {0} nodes".format(N),
+        ('method', 'pool', 'requests', 'seconds'),
+        rows,
+    )
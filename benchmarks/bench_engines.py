@@ -0,0 +1,87 @@
+"""
+Compare the gas spent by the `Grove` (AVL) and `BTreeGrove` (B+tree) engines
+as the size of the index grows.
+
+Run with ``py.test benchmarks/bench_engines.py -s`` to see the report.  The
+sizes default to 100 and 1000 entries.  Set ``GROVE_BENCH_SIZES`` to a comma
+separated list to change them, e.g. ``GROVE_BENCH_SIZES=1000,10000,100000``,
+which takes a long time as every entry is a transaction on the test chain.
+"""
+import os
+import random
+
+import pytest
+
+from conftest import random_values, report
+
+
+SIZES = tuple(
+    int(size) for size in os.environ.get('GROVE_BENCH_SIZES', '100,1000').split(',')
+)
+BATCH_SIZE = 50
+SAMPLES = 20
+
+
+def fill_index(grove, index_name, ids, values):
+    for start in range(0, len(ids), BATCH_SIZE):
+        grove.insertMany(
+            index_name,
+            ids[start:start + BATCH_SIZE],
+            values[start:start + BATCH_SIZE],
+        )
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_engine_gas_by_size(deploy_coinbase, deployed_contracts, measure_gas, n):
+    ids = ["n{0}".format(i) for i in range(n)]
+    values = random_values(n)
+    index_name = "bench-engines-{0}".format(n)
+
+    samples = random.Random(n).sample(range(n), min(SAMPLES, n))
+
+    rows = []
+
+    for name in ('Grove', 'BTreeGrove'):
+        grove = getattr(deployed_contracts, name)
+        index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+        fill_index(grove, index_name, ids, values)
+
+        # Lookups are constant, so send them as transactions to see the
+        # gas they would use.
+        query_gas = sum(
+            measure_gas(grove.query.sendTransaction, index_id, ">=", values[i])
+            for i in samples
+        )
+        next_gas = sum(
+            measure_gas(grove.getNextNode.sendTransaction, grove.computeNodeId(index_id, ids[i]))
+            for i in samples
+        )
+        scan_gas = measure_gas(grove.scan.sendTransaction, index_id, ">=", 0, False, 100)
+
+        # Remove and re-insert the sampled entries so the index stays the
+        # same size.
+        remove_gas = sum(
+            measure_gas(grove.remove, index_name, ids[i])
+            for i in samples
+        )
+        insert_gas = sum(
+            measure_gas(grove.insert, index_name, ids[i], values[i])
+            for i in samples
+        )
+
+        count = len(samples)
+        rows.append((
+            name,
+            query_gas // count,
+            next_gas // count,
+            scan_gas,
+            insert_gas // count,
+            remove_gas // count,
+        ))
+
+    report(
+        "{0} entries, average gas per operation".format(n),
+        ('engine', 'query', 'next', 'scan 100', 'insert', 'remove'),
+        rows,
+    )
@@ -0,0 +1,126 @@
+"""
+Gas used by the `Grove` operations across index sizes and value
+distributions.
+
+Run with ``py.test benchmarks/bench_gas_suite.py -s``.  For every workload
+in `conftest.WORKLOADS` and every size the suite fills an index, then
+measures the average gas of `insert`, `remove`, `query` for each operator,
+`getNextNode` and `exists` over a sample of nodes at that size.
+
+The sizes default to 10, 100, 1000 and 10000 and can be changed with
+``GROVE_SUITE_SIZES``, e.g. ``GROVE_SUITE_SIZES=10,100``.  The results are
+written as JSON to ``GROVE_GAS_REPORT``, ``gas-report.json`` by default,
+keyed by workload, then size, then operation.
+
+To use the suite as a regression gate, point ``GROVE_GAS_BASELINE`` at a
+report from an earlier run.  Any operation that uses more than
+``GROVE_GAS_THRESHOLD`` percent more gas than in the baseline, 5 by default,
+fails its test.
+"""
+import json
+import os
+import random
+
+import pytest
+
+from conftest import WORKLOADS, report
+
+
+SIZES = tuple(
+    int(size) for size in os.environ.get('GROVE_SUITE_SIZES', '10,100,1000,10000').split(',')
+)
+REPORT_PATH = os.environ.get('GROVE_GAS_REPORT', 'gas-report.json')
+BASELINE_PATH = os.environ.get('GROVE_GAS_BASELINE')
+THRESHOLD = float(os.environ.get('GROVE_GAS_THRESHOLD', '5'))
+
+BATCH_SIZE = 50
+SAMPLES = 10
+OPERATORS = ('<', '<=', '>', '>=', '==')
+
+results = {}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def gas_report(request):
+    def write_report():
+        with open(REPORT_PATH, 'w') as report_file:
+            json.dump(results, report_file, indent=2, sort_keys=True)
+    request.addfinalizer(write_report)
+
+
+def load_baseline():
+    if not BASELINE_PATH:
+        return {}
+
+    with open(BASELINE_PATH) as baseline_file:
+        return json.load(baseline_file)
+
+
+def average(gas):
+    return sum(gas) // len(gas)
+
+
+@pytest.mark.parametrize('n', SIZES)
+@pytest.mark.parametrize('workload', sorted(WORKLOADS))
+def test_gas(deploy_coinbase, deployed_contracts, measure_gas, workload, n):
+    grove = deployed_contracts.Grove
+    index_name = "bench-suite-{0}-{1}".format(workload, n)
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    ids = ["n{0}".format(i) for i in range(n)]
+    values = WORKLOADS[workload](n)
+    samples = sorted(random.Random(n).sample(range(n), min(SAMPLES, n)))
+    sampled = set(samples)
+
+    # Load everything but the samples in batches, then insert the samples
+    # one at a time in their order in the workload.
+    rest = [i for i in range(n) if i not in sampled]
+    for start in range(0, len(rest), BATCH_SIZE):
+        batch = rest[start:start + BATCH_SIZE]
+        grove.insertMany(index_name, [ids[i] for i in batch], [values[i] for i in batch])
+
+    gas = {}
+
+    gas['insert'] = average([
+        measure_gas(grove.insert, index_name, ids[i], values[i])
+        for i in samples
+    ])
+
+    # Constant functions are sent as transactions to see the gas they
+    # would use.
+    for operator in OPERATORS:
+        gas['query ' + operator] = average([
+            measure_gas(grove.query.sendTransaction, index_id, operator, values[i])
+            for i in samples
+        ])
+
+    gas['getNextNode'] = average([
+        measure_gas(grove.getNextNode.sendTransaction, grove.computeNodeId(index_id, ids[i]))
+        for i in samples
+    ])
+    gas['exists'] = average([
+        measure_gas(grove.exists.sendTransaction, index_id, ids[i])
+        for i in samples
+    ])
+
+    gas['remove'] = average([
+        measure_gas(grove.remove, index_name, ids[i])
+        for i in samples
+    ])
+
+    results.setdefault(workload, {})[str(n)] = gas
+
+    report(
+        "{0} workload, {1} entries, average gas per operation".format(workload, n),
+        ('operation', 'gas'),
+        sorted(gas.items()),
+    )
+
+    baseline = load_baseline().get(workload, {}).get(str(n), {})
+    regressions = [
+        "{0}: {1} -> {2}".format(operation, baseline[operation], used)
+        for operation, used in sorted(gas.items())
+        if operation in baseline and used > baseline[operation] * (1 + THRESHOLD / 100.0)
+    ]
+
+    assert not regressions, "Gas regressions over {0}%: {1}".format(THRESHOLD, ", ".join(regressions))
@@ -0,0 +1,67 @@
+"""
+Average gas of `insert` as an index grows, to check the gas saved by
+stopping rebalancing once subtree heights stop changing.
+
+Run with ``py.test benchmarks/bench_insert_rebalancing.py -s``.  Every node
+is inserted with it's own transaction, and the report gives the average gas
+over all of the inserts and over the last tenth of them, which go into an
+index of close to the full size.  The sizes default to 1000 and 10000 and
+can be changed with ``GROVE_REBALANCE_SIZES``.
+
+To compare against the tree from before rebalancing stopped early, build
+it's contracts with the same compiler as the populus build, solc 0.1.5 with
+``--optimize``, and point ``GROVE_REBALANCE_BASELINE_BUILD`` at the output
+of::
+
+    solc --optimize --combined-json abi,binary \\
+        contracts/Grove.sol libraries/GroveLib.sol > baseline.json
+"""
+import os
+
+import pytest
+
+from conftest import WORKLOADS, deploy_build, load_build, report
+
+
+SIZES = tuple(
+    int(size) for size in os.environ.get('GROVE_REBALANCE_SIZES', '1000,10000').split(',')
+)
+BASELINE_BUILD_PATH = os.environ.get('GROVE_REBALANCE_BASELINE_BUILD')
+
+
+@pytest.mark.parametrize('workload', ('random', 'ascending'))
+@pytest.mark.parametrize('n', SIZES)
+def test_insert_gas_by_size(deploy_client, deploy_coinbase, deployed_contracts, measure_gas, n, workload):
+    groves = [('current', deployed_contracts.Grove)]
+
+    if BASELINE_BUILD_PATH:
+        baseline = deploy_build(
+            deploy_client, deploy_coinbase, load_build(BASELINE_BUILD_PATH), ('GroveLib', 'Grove'),
+        )
+        groves.insert(0, ('baseline', baseline['Grove']))
+
+    values = WORKLOADS[workload](n)
+    ids = ["n{0}".format(i) for i in range(n)]
+    index_name = "bench-rebalance-{0}-{1}".format(workload, n)
+    tail = n // 10
+
+    rows = []
+
+    for name, grove in groves:
+        gas = [
+            measure_gas(grove.insert, index_name, _id, value)
+            for _id, value in zip(ids, values)
+        ]
+        rows.append((name, n, sum(gas) // n, sum(gas[-tail:]) // tail))
+
+    if len(rows) == 2:
+        rows.append(('change %', n) + tuple(
+            "{0:+.1f}".format(100.0 * (after - before) / before)
+            for before, after in zip(rows[0][2:], rows[1][2:])
+        ))
+
+    report(
+        "{0} workload, average gas per insert".format(workload),
+        ('tree', 'n', 'all', 'last 10%'),
+        rows,
+    )
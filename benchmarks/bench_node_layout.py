@@ -0,0 +1,71 @@
+"""
+Compare the gas used by the v0.3 node layout with the packed v0.4 layout.
+
+The populus build of this tree has the v0.4 layout.  Build the v0.3
+contracts with the same compiler, solc 0.1.5 with ``--optimize``, from the
+tree before the packed layout and point ``GROVE_V03_BUILD`` at the output
+of::
+
+    solc --optimize --combined-json abi,binary \\
+        contracts/Grove.sol libraries/GroveLib.sol > v0.3.json
+
+Run with ``py.test benchmarks/bench_node_layout.py -s`` to see the report.
+v0.4 also logs every change and tracks the first and last node of each
+index, which is included in it's numbers.
+"""
+import os
+
+import pytest
+
+from conftest import WORKLOADS, deploy_build, load_build, report
+
+
+V03_BUILD_PATH = os.environ.get('GROVE_V03_BUILD')
+
+N = 200
+SAMPLES = 20
+
+
+@pytest.mark.skipif(not V03_BUILD_PATH, reason="GROVE_V03_BUILD is not set")
+@pytest.mark.parametrize('workload', sorted(WORKLOADS))
+def test_node_layout_gas(deploy_client, deploy_coinbase, deployed_contracts, measure_gas, workload):
+    v03 = deploy_build(deploy_client, deploy_coinbase, load_build(V03_BUILD_PATH), ('GroveLib', 'Grove'))
+
+    values = WORKLOADS[workload](N)
+    ids = ["n{0}".format(i) for i in range(N)]
+    index_name = "bench-layout-{0}".format(workload)
+
+    rows = []
+
+    for name, grove in (('v0.3', v03['Grove']), ('v0.4', deployed_contracts.Grove)):
+        index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+        insert_gas = sum(
+            measure_gas(grove.insert, index_name, _id, value)
+            for _id, value in zip(ids, values)
+        )
+        query_gas = sum(
+            measure_gas(grove.query.sendTransaction, index_id, ">=", values[i])
+            for i in range(SAMPLES)
+        )
+        next_gas = sum(
+            measure_gas(grove.getNextNode.sendTransaction, grove.computeNodeId(index_id, ids[i]))
+            for i in range(SAMPLES)
+        )
+        remove_gas = sum(
+            measure_gas(grove.remove, index_name, _id)
+            for _id in ids
+        )
+
+        rows.append((name, insert_gas // N, query_gas // SAMPLES, next_gas // SAMPLES, remove_gas // N))
+
+    rows.append(('change %',) + tuple(
+        "{0:+.1f}".format(100.0 * (after - before) / before)
+        for before, after in zip(rows[0][1:], rows[1][1:])
+    ))
+
+    report(
+        "{0} workload, average gas per operation".format(workload),
+        ('layout', 'insert', 'query', 'next', 'remove'),
+        rows,
+    )
@@ -0,0 +1,43 @@
+"""
+Compare the gas spent writing to the `Grove` and `PathGrove` engines.
+
+Run with ``py.test benchmarks/bench_parent_pointers.py -s`` to see the
+report.
+"""
+import pytest
+
+from conftest import WORKLOADS, report
+
+
+N = 200
+
+
+@pytest.mark.parametrize('workload', sorted(WORKLOADS))
+def test_parent_pointer_write_gas(deployed_contracts, measure_gas, workload):
+    values = WORKLOADS[workload](N)
+    ids = ["n{0}".format(i) for i in range(N)]
+    index_name = "bench-{0}".format(workload)
+
+    rows = []
+
+    for name in ('Grove', 'PathGrove'):
+        grove = getattr(deployed_contracts, name)
+
+        insert_gas = sum(
+            measure_gas(grove.insert, index_name, _id, value)
+            for _id, value in zip(ids, values)
+        )
+        # Remove in insertion order, which takes nodes from all over the
+        # tree for the random workload and from one edge for the others.
+        remove_gas = sum(
+            measure_gas(grove.remove, index_name, _id)
+            for _id in ids
+        )
+
+        rows.append((name, N, insert_gas // N, remove_gas // N))
+
+    report(
+        "{0} workload, average gas per operation".format(workload),
+        ('engine', 'n', 'insert', 'remove'),
+        rows,
+    )
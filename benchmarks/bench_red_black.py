@@ -0,0 +1,73 @@
+"""
+Compare the gas spent by AVL and red-black indexes in `Grove` under churn,
+where nodes are constantly inserted and removed and there are 5 writes for
+every read.
+
+Run with ``py.test benchmarks/bench_red_black.py -s`` to see the report.
+"""
+import random
+
+import pytest
+
+from conftest import report
+
+
+N = 200
+ROUNDS = 100
+WRITES_PER_READ = 5
+
+
+@pytest.mark.parametrize('with_counts', (False, True))
+def test_red_black_churn_gas(deploy_coinbase, deployed_contracts, measure_gas, with_counts):
+    grove = deployed_contracts.Grove
+
+    rows = []
+
+    for red_black in (False, True):
+        index_name = "bench-churn-{0}-{1}".format(int(red_black), int(with_counts))
+        index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+        if red_black:
+            grove.enableRedBlack(index_name)
+        if with_counts:
+            grove.enableNodeCounts(index_name)
+
+        # Both engines see the same sequence of operations.
+        rng = random.Random(0)
+        live = []
+
+        for i in range(N):
+            _id = "n{0}".format(i)
+            grove.insert(index_name, _id, rng.randint(0, 10 ** 6))
+            live.append(_id)
+
+        insert_gas = []
+        remove_gas = []
+        query_gas = []
+        next_id = N
+
+        for _ in range(ROUNDS):
+            for _ in range(WRITES_PER_READ):
+                if rng.random() < 0.5:
+                    _id = "n{0}".format(next_id)
+                    next_id += 1
+                    insert_gas.append(measure_gas(grove.insert, index_name, _id, rng.randint(0, 10 ** 6)))
+                    live.append(_id)
+                else:
+                    _id = live.pop(rng.randrange(len(live)))
+                    remove_gas.append(measure_gas(grove.remove, index_name, _id))
+
+            query_gas.append(measure_gas(grove.query.sendTransaction, index_id, ">=", rng.randint(0, 10 ** 6)))
+
+        rows.append((
+            ('AVL', 'red-black')[red_black],
+            sum(insert_gas) // len(insert_gas),
+            sum(remove_gas) // len(remove_gas),
+            sum(query_gas) // len(query_gas),
+        ))
+
+    report(
+        "churn on {0} nodes{1}, average gas per operation".format(N, ", with node counts" if with_counts else ""),
+        ('engine', 'insert', 'remove', 'query'),
+        rows,
+    )
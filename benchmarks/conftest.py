@@ -0,0 +1,106 @@
+import json
+import random
+import re
+
+import pytest
+
+
+def random_values(n, seed=0):
+    values = list(range(n))
+    random.Random(seed).shuffle(values)
+    return values
+
+
+WORKLOADS = {
+    'random': random_values,
+    'ascending': lambda n: list(range(n)),
+    'descending': lambda n: list(reversed(range(n))),
+    # Around ten nodes share each value.
+    'duplicates': lambda n: [value // 10 for value in random_values(n)],
+}
+
+
+@pytest.fixture
+def measure_gas(deploy_client):
+    """
+    Send a transaction with the given contract function and return the gas
+    it used.
+    """
+    def _measure_gas(function, *args):
+        txn_hash = function(*args)
+        receipt = deploy_client.wait_for_transaction(txn_hash)
+        return int(receipt['gasUsed'], 16)
+    return _measure_gas
+
+
+def report(title, header, rows):
+    print("")
+    print(title)
+    for row in (header,) + tuple(rows):
+        print("  " + "".join("{0:>12}".format(column) for column in row))
+
+
+# Library placeholders are 40 characters starting with two underscores, and
+# hex never contains an underscore.
+LIBRARY_PLACEHOLDER = re.compile(r'__.{38}')
+
+
+def load_build(build_path):
+    """
+    The contracts in the ``--combined-json`` output of solc at `build_path`,
+    keyed by contract name.
+    """
+    with open(build_path) as build_file:
+        build = json.load(build_file)
+
+    # Newer compilers key the contracts by `path:Name`.
+    return dict(
+        (key.split(':')[-1], contract) for key, contract in build['contracts'].items()
+    )
+
+
+def link(code, addresses):
+    """
+    Fill in the library placeholders in `code` with the addresses of the
+    deployed libraries.
+    """
+    def address_of(match):
+        # Newer compilers name the library by `path:Name`.
+        name = match.group(0).strip('_').split(':')[-1]
+        return addresses[name][2:]
+    return LIBRARY_PLACEHOLDER.sub(address_of, code)
+
+
+def deploy_build(deploy_client, deploy_coinbase, build, names):
+    """
+    Deploy the contracts `names` of a build from `load_build` in order,
+    linking each one against the libraries deployed before it.  Returns the
+    populus contract object of each, keyed by name.
+    """
+    from populus.contracts import deploy_contract, package_contracts
+    from populus.utils import get_contract_address_from_txn
+
+    addresses = {}
+    deployed = {}
+
+    for name in names:
+        # solc 0.1.5 calls the creation code `binary` rather than `bin`.
+        code = build[name].get('bin', build[name].get('binary'))
+        abi = build[name]['abi']
+        if not isinstance(abi, list):
+            abi = json.loads(abi)
+
+        contract_class = getattr(package_contracts({
+            name: {'code': '0x' + link(code, addresses), 'info': {'abiDefinition': abi, 'source': None}},
+        }), name)
+
+        txn_hash = deploy_contract(
+            deploy_client,
+            contract_class,
+            _from=deploy_coinbase,
+            gas=int(deploy_client.get_max_gas() * 0.98),
+        )
+        addresses[name] = get_contract_address_from_txn(deploy_client, txn_hash, max_wait=60)
+        deployed[name] = contract_class(addresses[name], deploy_client)
+
+    return deployed
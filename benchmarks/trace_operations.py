@@ -0,0 +1,130 @@
+"""
+Profile where the gas, storage reads and storage writes of `Grove`
+operations go, down to the `GroveLib` functions that spent them.
+
+The populus build of this tree is compiled with solc 0.1.5, which does not
+emit source maps.  Build the contracts with a solc that does and point
+``GROVE_TRACE_BUILD`` at the output of::
+
+    solc --optimize --combined-json abi,bin,bin-runtime,srcmap-runtime \\
+        contracts/Grove.sol libraries/GroveLib.sol > build.json
+
+The profiled contracts are deployed from that build, as the source maps only
+line up with the bytecode they were compiled with, and the code on chain is
+checked against it before anything is traced.
+
+The test chain must support ``debug_traceTransaction``.  Run with
+``py.test benchmarks/trace_operations.py -s``.  For each operation a
+``<operation>.<metric>.folded`` file is written to ``GROVE_TRACE_DIR``,
+``traces`` by default, for every metric of `grove.trace.Profile`.  Render
+them with ``flamegraph.pl traces/insert.gas.folded > insert.svg``.
+"""
+import json
+import os
+
+import pytest
+
+from grove.trace import Code, Profile
+
+from conftest import deploy_build, link, load_build, random_values, report
+
+
+BUILD_PATH = os.environ.get('GROVE_TRACE_BUILD')
+TRACE_DIR = os.environ.get('GROVE_TRACE_DIR', 'traces')
+
+N = 200
+SAMPLES = 20
+
+
+def load_sources(build_path):
+    with open(build_path) as build_file:
+        source_list = json.load(build_file).get('sourceList', ())
+
+    sources = []
+    for path in source_list:
+        with open(path) as source_file:
+            sources.append(source_file.read())
+    return sources
+
+
+def runtime_code(deploy_client, build, name, addresses):
+    """
+    The runtime bytecode of the deployed contract, after checking that it is
+    the bytecode of the build.
+    """
+    expected = link(build[name]['bin-runtime'], addresses)
+    code = deploy_client.get_code(addresses[name])[2:]
+
+    # Libraries from solc 0.4.20 on start by pushing their own address,
+    # which is only filled in when they are deployed.
+    library_prefix = '73' + '0' * 40
+    if expected.startswith(library_prefix):
+        expected = code[:len(library_prefix)] + expected[len(library_prefix):]
+
+    if code != expected:
+        raise ValueError("The code deployed for {0} does not match {1}".format(name, BUILD_PATH))
+    return code
+
+
+def load_codes(deploy_client, build, sources, addresses):
+    return dict(
+        (address, Code(
+            name,
+            runtime_code(deploy_client, build, name, addresses),
+            build[name]['srcmap-runtime'],
+            sources,
+        ))
+        for name, address in addresses.items()
+    )
+
+
+@pytest.mark.skipif(not BUILD_PATH, reason="GROVE_TRACE_BUILD is not set")
+def test_trace_operations(deploy_client, deploy_coinbase):
+    build = load_build(BUILD_PATH)
+    deployed = deploy_build(deploy_client, deploy_coinbase, build, ('GroveLib', 'Grove'))
+    addresses = dict((name, contract._meta.address) for name, contract in deployed.items())
+
+    grove = deployed['Grove']
+    index_name = "trace-operations"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+    grove_address = addresses['Grove']
+
+    codes = load_codes(deploy_client, build, load_sources(BUILD_PATH), addresses)
+
+    def trace(operation, txn_hash):
+        deploy_client.wait_for_transaction(txn_hash)
+        response = deploy_client.make_request('debug_traceTransaction', [
+            txn_hash, {'disableStorage': True, 'disableMemory': True},
+        ])
+        profiles.setdefault(operation, Profile(codes)).add_trace(grove_address, response['result']['structLogs'])
+
+    profiles = {}
+    ids = ["n{0}".format(i) for i in range(N)]
+    values = random_values(N)
+
+    for _id, value in zip(ids, values):
+        trace('insert', grove.insert(index_name, _id, value))
+    for i in range(SAMPLES):
+        trace('query', grove.query.sendTransaction(index_id, '>=', values[i]))
+        trace('update', grove.insert(index_name, ids[i], values[i] + N))
+    for _id in ids[::2]:
+        trace('remove', grove.remove(index_name, _id))
+
+    if not os.path.isdir(TRACE_DIR):
+        os.makedirs(TRACE_DIR)
+
+    for operation, profile in sorted(profiles.items()):
+        for metric in Profile.METRICS:
+            path = os.path.join(TRACE_DIR, "{0}.{1}.folded".format(operation, metric))
+            with open(path, 'w') as folded_file:
+                folded_file.write(profile.folded(metric) + '\n')
+
+        totals = profile.by_function()
+        report(
+            "{0}, totals per function".format(operation),
+            ('gas', 'sload', 'sstore', 'function'),
+            sorted(
+                ((total['gas'], total['sload'], total['sstore'], name) for name, total in totals.items()),
+                reverse=True,
+            ),
+        )
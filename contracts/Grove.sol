@@ -1,4 +1,4 @@
-// Grove v0.3
+// Grove v0.4
 import "libraries/GroveLib.sol";
 
 
@@ -8,7 +8,8 @@ contract Grove {
         /*
          *  Indexes for ordered data
          *
-         *  Address: 0x8017f24a47c889b1ee80501ff84beb3c017edf0b
+         *  v0.3 address, which does not have the v0.4 node layout:
+         *  0x8017f24a47c889b1ee80501ff84beb3c017edf0b
          */
         // Map index_id to index
         mapping (bytes32 => GroveLib.Index) index_lookup;
@@ -17,6 +18,17 @@ contract Grove {
         mapping (bytes32 => bytes32) node_to_index;
         mapping (bytes32 => bytes32) node_id_lookup;
 
+        /*
+         *  Events
+         *
+         *  Every change to the nodes of an index is logged so that it can
+         *  be followed off-chain without reading the index back.  Only the
+         *  index id is indexed, which keeps the cost of each log down.
+         */
+        event NodeInserted(bytes32 indexed indexId, bytes32 id, int value);
+        event NodeUpdated(bytes32 indexed indexId, bytes32 id, int value);
+        event NodeRemoved(bytes32 indexed indexId, bytes32 id, int value);
+
         /// @notice Computes the id for a Grove index which is sha3(owner, indexName)
         /// @param owner The address of the index owner.
         /// @param indexName The name of the index.
@@ -58,6 +70,12 @@ contract Grove {
             return GroveLib.getNodeHeight(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
         }
 
+        /// @dev Retrieve whether the node is red, which only a node of a red-black index can be.
+        /// @param nodeId The id for the node
+        function isNodeRed(bytes32 nodeId) constant returns (bool) {
+            return GroveLib.isNodeRed(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
+        }
+
         /// @dev Retrieve the parent id of the node.
         /// @param nodeId The id for the node
         function getNodeParent(bytes32 nodeId) constant returns (bytes32) {
@@ -76,6 +94,110 @@ contract Grove {
             return GroveLib.getNodeRightChild(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
         }
 
+        /** @dev Retrieve every field of many nodes in a single call.  The
+         *  fields are returned as arrays in the same order as `nodeIds`, and
+         *  are all 0x0 or 0 for a node that does not exist.  The parent and
+         *  children are unique identifiers, as with `getNodeParent`.
+         */
+        /// @param nodeIds The ids of the nodes.
+        function getNodes(bytes32[] nodeIds) constant returns (bytes32[] indexIds, bytes32[] ids, int[] values, uint[] heights, bytes32[] parents, bytes32[] leftChildren, bytes32[] rightChildren) {
+                indexIds = new bytes32[](nodeIds.length);
+                ids = new bytes32[](nodeIds.length);
+                values = new int[](nodeIds.length);
+                heights = new uint[](nodeIds.length);
+                parents = new bytes32[](nodeIds.length);
+                leftChildren = new bytes32[](nodeIds.length);
+                rightChildren = new bytes32[](nodeIds.length);
+
+                for (uint i = 0; i < nodeIds.length; i++) {
+                    indexIds[i] = node_to_index[nodeIds[i]];
+                    ids[i] = node_id_lookup[nodeIds[i]];
+
+                    // Read the node straight out of storage rather than
+                    // through a library call per field.
+                    GroveLib.Node storage node = index_lookup[indexIds[i]].nodes[ids[i]];
+
+                    if (node.height == 0) {
+                        continue;
+                    }
+
+                    values[i] = node.value;
+                    heights[i] = node.height;
+                    parents[i] = node.parent;
+                    leftChildren[i] = node.left;
+                    rightChildren[i] = node.right;
+                }
+        }
+
+        /** @dev Retrieve the shape of the tree below a node, down to `depth`
+         *  levels, in a single call.  The nodes are laid out level by level
+         *  like a binary heap: the node is at position 0 and the children of
+         *  the node at position `k` are at `2k + 1` and `2k + 2`.  Positions
+         *  without a node are left as 0x0.  `depth` is capped at the height
+         *  of the node, or at the largest possible height of the tree for
+         *  red-black indexes, so the arrays have `2 ** depth - 1` entries.
+         */
+        /// @param nodeId The id of the node at the top of the subtree.
+        /// @param depth The number of levels to retrieve.
+        function getSubtree(bytes32 nodeId, uint depth) constant returns (bytes32[] ids, int[] values, uint[] heights) {
+                GroveLib.Index storage index = index_lookup[node_to_index[nodeId]];
+                bytes32 id = node_id_lookup[nodeId];
+                uint maxDepth = index.nodes[id].height;
+
+                if (index.redBlack && maxDepth > 0) {
+                    // Heights are not tracked for red-black indexes.
+                    maxDepth = GroveLib._getMaxHeight(index);
+                }
+                if (depth > maxDepth) {
+                    depth = maxDepth;
+                }
+
+                ids = new bytes32[](2 ** depth - 1);
+                values = new int[](ids.length);
+                heights = new uint[](ids.length);
+
+                for (uint k = 0; k < ids.length; k++) {
+                    if (k > 0) {
+                        // The parent of the node at `k` is at `(k - 1) / 2`.
+                        id = ids[(k - 1) / 2];
+
+                        if (id == 0x0) {
+                            continue;
+                        }
+                        if (k % 2 == 1) {
+                            id = index.nodes[id].left;
+                        }
+                        else {
+                            id = index.nodes[id].right;
+                        }
+                    }
+
+                    if (id == 0x0) {
+                        continue;
+                    }
+
+                    ids[k] = id;
+                    values[k] = index.nodes[id].value;
+                    heights[k] = index.nodes[id].height;
+                }
+        }
+
+        /** @dev Retrieve the unique identifier of the node with the smallest
+         *  value in the index.  Returns 0x0 if the index is empty.
+         */
+        /// @param indexId The id of the index.
+        function getFirst(bytes32 indexId) constant returns (bytes32) {
+            return GroveLib.getFirst(index_lookup[indexId]);
+        }
+
+        /** @dev Retrieve the unique identifier of the node with the largest
+         *  value in the index.  Returns 0x0 if the index is empty.
+         */
+        /// @param indexId The id of the index.
+        function getLast(bytes32 indexId) constant returns (bytes32) {
+            return GroveLib.getLast(index_lookup[indexId]);
+        }
+
         /** @dev Retrieve the id of the node that comes immediately before this
          *  one.  Returns 0x0 if there is no previous node.
          */
@@ -92,6 +214,42 @@ contract Grove {
             return GroveLib.getNextNode(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
         }
 
+        /** @dev Enable node counts for the index, which is required for
+         *  `rank`, `select` and `count`.  Must be called before anything is
+         *  inserted into the index.
+         */
+        /// @param indexName The name of the index.
+        function enableNodeCounts(bytes32 indexName) public {
+                GroveLib.enableNodeCounts(index_lookup[computeIndexId(msg.sender, indexName)]);
+        }
+
+        /** @dev Enable value sums for the index, which is required for
+         *  `sumRange`.  Must be called before anything is inserted into the
+         *  index.
+         */
+        /// @param indexName The name of the index.
+        function enableValueSums(bytes32 indexName) public {
+                GroveLib.enableValueSums(index_lookup[computeIndexId(msg.sender, indexName)]);
+        }
+
+        /** @dev Enable value buckets for the index, which keeps nodes with
+         *  equal values out of the tree.  Must be called before anything is
+         *  inserted into the index.
+         */
+        /// @param indexName The name of the index.
+        function enableValueBuckets(bytes32 indexName) public {
+                GroveLib.enableValueBuckets(index_lookup[computeIndexId(msg.sender, indexName)]);
+        }
+
+        /** @dev Keep the index balanced as a red-black tree rather than an
+         *  AVL tree, which does less rebalancing work on writes.  Must be
+         *  called before anything is inserted into the index.
+         */
+        /// @param indexName The name of the index.
+        function enableRedBlack(bytes32 indexName) public {
+                GroveLib.enableRedBlack(index_lookup[computeIndexId(msg.sender, indexName)]);
+        }
+
         /** @dev Update or Insert a data element represented by the unique
          *  identifier `id` into the index.
          */
@@ -100,14 +258,121 @@ contract Grove {
         /// @param value The number which represents this data elements total ordering.
         function insert(bytes32 indexName, bytes32 id, int value) public {
                 bytes32 indexId = computeIndexId(msg.sender, indexName);
-                GroveLib.Index storage index = index_lookup[indexId];
 
+                _insertNode(indexId, id, value);
+        }
+
+        /** @dev Update or Insert many data elements into the index in a
+         *  single transaction.  `ids` and `values` must be the same length.
+         */
+        /// @param indexName The human readable name for the index that the nodes should be upserted into.
+        /// @param ids The unique identifiers that the index nodes represent.
+        /// @param values The numbers which represent each data element's total ordering.
+        function insertMany(bytes32 indexName, bytes32[] ids, int[] values) public {
+                if (ids.length != values.length) {
+                    throw;
+                }
+
+                bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+                for (uint i = 0; i < ids.length; i++) {
+                    _insertNode(indexId, ids[i], values[i]);
+                }
+        }
+
+        /** @dev Start loading `total` nodes into an empty index.  The nodes
+         *  are then provided sorted by value over one or more calls to
+         *  `bulkLoad` and are linked directly into a balanced tree.  The
+         *  index cannot be modified until the load is complete.
+         */
+        /// @param indexName The name of the index.
+        /// @param total The number of nodes that will be loaded.
+        function startBulkLoad(bytes32 indexName, uint total) public {
+                GroveLib.startBulkLoad(index_lookup[computeIndexId(msg.sender, indexName)], total);
+        }
+
+        /** @dev Load the next chunk of nodes of a bulk load.  The values must
+         *  continue in non-decreasing order from the previous chunk.
+         */
+        /// @param indexName The name of the index.
+        /// @param ids The unique identifiers that the index nodes represent.
+        /// @param values The numbers which represent each data element's total ordering.
+        function bulkLoad(bytes32 indexName, bytes32[] ids, int[] values) public {
+                bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+                for (uint i = 0; i < ids.length; i++) {
+                    _trackNode(indexId, ids[i]);
+                    NodeInserted(indexId, ids[i], values[i]);
+                }
+
+                GroveLib.bulkLoad(index_lookup[indexId], ids, values);
+        }
+
+        /// @dev Retrieve the number of nodes still to be provided for the bulk load in progress.
+        /// @param indexId The id of the index.
+        function getBulkLoadRemaining(bytes32 indexId) constant returns (uint) {
+                return GroveLib.getBulkLoadRemaining(index_lookup[indexId]);
+        }
+
+        /** @dev Store the mapping from nodeId to the indexId and id of a
+         *  node that was just inserted.  The mappings are only ever set for
+         *  nodes that exist, so they never need to be read first.
+         */
+        /// @param indexId The id of the index the node belongs to.
+        /// @param id The unique identifier that the index node represents.
+        function _trackNode(bytes32 indexId, bytes32 id) internal {
                 bytes32 nodeId = computeNodeId(indexId, id);
-                // Store the mapping from nodeId to the indexId
+
                 node_to_index[nodeId] = indexId;
                 node_id_lookup[nodeId] = id;
+        }
+
+        /// @dev Clear the mapping from nodeId to the indexId and id of a node that was just removed.
+        /// @param indexId The id of the index the node belonged to.
+        /// @param id The unique identifier that the index node represented.
+        function _untrackNode(bytes32 indexId, bytes32 id) internal {
+                bytes32 nodeId = computeNodeId(indexId, id);
+
+                node_to_index[nodeId] = 0x0;
+                node_id_lookup[nodeId] = 0x0;
+        }
+
+        /// @dev Update or Insert the node and log the change, if there is one.
+        /// @param indexId The id of the index the node belongs to.
+        /// @param id The unique identifier that the index node represents.
+        /// @param value The number which represents this data elements total ordering.
+        function _insertNode(bytes32 indexId, bytes32 id, int value) internal {
+                GroveLib.Index storage index = index_lookup[indexId];
+                bool isUpdate = (index.nodes[id].height > 0);
+                int previousValue = index.nodes[id].value;
 
                 GroveLib.insert(index, id, value);
+
+                if (!isUpdate) {
+                    _trackNode(indexId, id);
+                    NodeInserted(indexId, id, value);
+                }
+                else if (previousValue != value) {
+                    NodeUpdated(indexId, id, value);
+                }
+        }
+
+        /// @dev Remove the node and log the removal if it existed.
+        /// @param indexId The id of the index the node belongs to.
+        /// @param id The unique identifier that the index node represents.
+        function _removeNode(bytes32 indexId, bytes32 id) internal {
+                GroveLib.Index storage index = index_lookup[indexId];
+
+                if (index.nodes[id].height == 0) {
+                    return;
+                }
+
+                int value = index.nodes[id].value;
+
+                GroveLib.remove(index, id);
+
+                _untrackNode(indexId, id);
+                NodeRemoved(indexId, id, value);
         }
 
         /// @dev Query whether a node exists within the specified index for the unique identifier.
@@ -121,7 +386,114 @@ contract Grove {
         /// @param indexName The name of the index.
         /// @param id The unique identifier of the data element.
         function remove(bytes32 indexName, bytes32 id) public {
-            GroveLib.remove(index_lookup[computeIndexId(msg.sender, indexName)], id);
+            _removeNode(computeIndexId(msg.sender, indexName), id);
+        }
+
+        /// @dev Remove the index nodes for many unique identifiers in a single transaction.
+        /// @param indexName The name of the index.
+        /// @param ids The unique identifiers of the data elements.
+        function removeMany(bytes32 indexName, bytes32[] ids) public {
+            bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+            for (uint i = 0; i < ids.length; i++) {
+                _removeNode(indexId, ids[i]);
+            }
+        }
+
+        /** @dev Remove the node with the smallest value from the index and
+         *  return its unique identifier and value.  Returns 0x0 if the index
+         *  is empty.
+         */
+        /// @param indexName The name of the index.
+        function popFirst(bytes32 indexName) public returns (bytes32 id, int value) {
+            bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+            (id, value) = GroveLib.popFirst(index_lookup[indexId]);
+
+            if (id != 0x0) {
+                _untrackNode(indexId, id);
+                NodeRemoved(indexId, id, value);
+            }
+        }
+
+        /** @dev Remove the node with the largest value from the index and
+         *  return its unique identifier and value.  Returns 0x0 if the index
+         *  is empty.
+         */
+        /// @param indexName The name of the index.
+        function popLast(bytes32 indexName) public returns (bytes32 id, int value) {
+            bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+            (id, value) = GroveLib.popLast(index_lookup[indexId]);
+
+            if (id != 0x0) {
+                _untrackNode(indexId, id);
+                NodeRemoved(indexId, id, value);
+            }
+        }
+
+        /** @dev Remove up to `maxCount` of the nodes whose values are below
+         *  ('<', '<=') or above ('>', '>=') the given value.  Returns the
+         *  number of nodes removed, which is less than `maxCount` once no
+         *  matching nodes remain.
+         */
+        /// @param indexName The name of the index.
+        /// @param operator One of '<', '<=', '>', '>='.
+        /// @param value The value to compare against.
+        /// @param maxCount The maximum number of nodes to remove.
+        function removeRange(bytes32 indexName, bytes2 operator, int value, uint maxCount) public returns (uint removed) {
+            bytes32 indexId = computeIndexId(msg.sender, indexName);
+            GroveLib.Index storage index = index_lookup[indexId];
+            bool fromEnd = (operator == ">" || operator == ">=");
+            bool inclusive = (operator == "<=" || operator == ">=");
+            bytes32 id;
+            int nodeValue;
+
+            if (!fromEnd && !inclusive && operator != "<") {
+                // Invalid operator.
+                throw;
+            }
+
+            // Remove the nodes one at a time so that each of them is logged.
+            // They come off the end of the index that the range starts at.
+            // The edge of the index is read from storage here, so each
+            // removal is a single library call.
+            while (removed < maxCount) {
+                if (fromEnd) {
+                    id = index.tail;
+                }
+                else {
+                    id = index.head;
+                }
+
+                if (id == 0x0) {
+                    // The index is empty.
+                    break;
+                }
+
+                nodeValue = index.nodes[id].value;
+
+                if (nodeValue == value && !inclusive) {
+                    break;
+                }
+                if (fromEnd && nodeValue < value) {
+                    break;
+                }
+                if (!fromEnd && nodeValue > value) {
+                    break;
+                }
+
+                if (fromEnd) {
+                    GroveLib.popLast(index);
+                }
+                else {
+                    GroveLib.popFirst(index);
+                }
+
+                _untrackNode(indexId, id);
+                NodeRemoved(indexId, id, nodeValue);
+                removed += 1;
+            }
         }
 
         /** @dev Query the index for the edge-most node that satisfies the
@@ -136,4 +508,72 @@ contract Grove {
         function query(bytes32 indexId, bytes2 operator, int value) constant returns (bytes32) {
                 return GroveLib.query(index_lookup[indexId], operator, value);
         }
+
+        /** @dev Retrieve a page of up to `limit` nodes starting at the
+         *  edge-most node that satisfies the given query.  Returns the ids
+         *  and values of the nodes, and the id to pass to `scanFrom` to
+         *  retrieve the next page, which is 0x0 once the end of the index
+         *  is reached.  Entries past the end of the index are left as 0x0.
+         */
+        /// @param indexId The id of the index that should be scanned.
+        /// @param operator One of '>', '>=', '<', '<=', '==' to specify what type of comparison operator should be used.
+        /// @param value The value to compare against.
+        /// @param reverse Whether to walk towards the previous nodes rather than the next nodes.
+        /// @param limit The maximum number of nodes to return.
+        function scan(bytes32 indexId, bytes2 operator, int value, bool reverse, uint limit) constant returns (bytes32[] ids, int[] values, bytes32 cursor) {
+                GroveLib.Index storage index = index_lookup[indexId];
+
+                return GroveLib.scan(index, GroveLib.query(index, operator, value), reverse, limit);
+        }
+
+        /** @dev Retrieve a page of up to `limit` nodes starting at the node
+         *  for the unique identifier `id`.  Used to continue a `scan` with
+         *  the returned cursor.
+         */
+        /// @param indexId The id of the index that should be scanned.
+        /// @param id The unique identifier of the first data element of the page.
+        /// @param reverse Whether to walk towards the previous nodes rather than the next nodes.
+        /// @param limit The maximum number of nodes to return.
+        function scanFrom(bytes32 indexId, bytes32 id, bool reverse, uint limit) constant returns (bytes32[] ids, int[] values, bytes32 cursor) {
+                return GroveLib.scan(index_lookup[indexId], id, reverse, limit);
+        }
+
+        /*
+         *  Order statistics
+         */
+        /// @dev Retrieve the number of nodes whose value is less than the given value.
+        /// @param indexId The id of the index that should be queried.
+        /// @param value The value to compare against.
+        function rank(bytes32 indexId, int value) constant returns (uint) {
+                return GroveLib.rank(index_lookup[indexId], value);
+        }
+
+        /** @dev Retrieve the unique identifier of the node at position `k`
+         *  in the index, counting from 0 at the node with the smallest
+         *  value.  Returns 0x0 if the index has `k` or fewer nodes.
+         */
+        /// @param indexId The id of the index that should be queried.
+        /// @param k The position of the node.
+        function select(bytes32 indexId, uint k) constant returns (bytes32) {
+                return GroveLib.select(index_lookup[indexId], k);
+        }
+
+        /// @dev Retrieve the number of nodes whose value is between `lo` and `hi` inclusive.
+        /// @param indexId The id of the index that should be queried.
+        /// @param lo The lower bound of the range.
+        /// @param hi The upper bound of the range.
+        function count(bytes32 indexId, int lo, int hi) constant returns (uint) {
+                return GroveLib.count(index_lookup[indexId], lo, hi);
+        }
+
+        /*
+         *  Range sums
+         */
+        /// @dev Retrieve the sum of the values of the nodes whose value is between `lo` and `hi` inclusive.
+        /// @param indexId The id of the index that should be queried.
+        /// @param lo The lower bound of the range.
+        /// @param hi The upper bound of the range.
+        function sumRange(bytes32 indexId, int lo, int hi) constant returns (int) {
+                return GroveLib.sumRange(index_lookup[indexId], lo, hi);
+        }
 }
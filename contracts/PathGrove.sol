@@ -0,0 +1,379 @@
+// Grove v0.4
+import "libraries/PathGroveLib.sol";
+
+
+/// @title PathGrove - queryable indexes for ordered data without parent pointers.
+/// @author Piper Merriam <pipermerriam@gmail.com>
+contract PathGrove {
+        /*
+         *  Indexes for ordered data
+         *
+         *  This has the same interface as `Grove` but is backed by
+         *  `PathGroveLib`, which writes less storage when the tree is
+         *  modified and reads more of it to navigate.  Nodes with equal values
+         *  are ordered by their id, and node counts, value sums, value
+         *  buckets and bulk loading are not supported.
+         */
+        // Map index_id to index
+        mapping (bytes32 => PathGroveLib.Index) index_lookup;
+
+        // Map node_id to index_id.
+        mapping (bytes32 => bytes32) node_to_index;
+        mapping (bytes32 => bytes32) node_id_lookup;
+
+        /*
+         *  Events
+         *
+         *  Every change to the nodes of an index is logged so that it can
+         *  be followed off-chain without reading the index back.  Only the
+         *  index id is indexed, which keeps the cost of each log down.
+         */
+        event NodeInserted(bytes32 indexed indexId, bytes32 id, int value);
+        event NodeUpdated(bytes32 indexed indexId, bytes32 id, int value);
+        event NodeRemoved(bytes32 indexed indexId, bytes32 id, int value);
+
+        /// @notice Computes the id for a Grove index which is sha3(owner, indexName)
+        /// @param owner The address of the index owner.
+        /// @param indexName The name of the index.
+        function computeIndexId(address owner, bytes32 indexName) constant returns (bytes32) {
+                return sha3(owner, indexName);
+        }
+
+        /// @notice Computes the id for a node in a given Grove index which is sha3(indexId, id)
+        /// @param indexId The id for the index the node belongs to.
+        /// @param id The unique identifier for the data this node represents.
+        function computeNodeId(bytes32 indexId, bytes32 id) constant returns (bytes32) {
+                return sha3(indexId, id);
+        }
+
+        /*
+         *  Node getters
+         */
+        /// @notice Retrieves the id of the root node for this index.
+        /// @param indexId The id of the index.
+        function getIndexRoot(bytes32 indexId) constant returns (bytes32) {
+            return index_lookup[indexId].root;
+        }
+
+        /// @dev Retrieve the index id for the node.
+        /// @param nodeId The id for the node
+        function getNodeIndexId(bytes32 nodeId) constant returns (bytes32) {
+            return node_to_index[nodeId];
+        }
+
+        /// @dev Retrieve the value of the node.
+        /// @param nodeId The id for the node
+        function getNodeValue(bytes32 nodeId) constant returns (int) {
+            return PathGroveLib.getNodeValue(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
+        }
+
+        /// @dev Retrieve the height of the node.
+        /// @param nodeId The id for the node
+        function getNodeHeight(bytes32 nodeId) constant returns (uint) {
+            return PathGroveLib.getNodeHeight(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
+        }
+
+        /// @dev Retrieve the parent id of the node, which is found by descending from the root.
+        /// @param nodeId The id for the node
+        function getNodeParent(bytes32 nodeId) constant returns (bytes32) {
+            return PathGroveLib.getNodeParent(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
+        }
+
+        /// @dev Retrieve the left child id of the node.
+        /// @param nodeId The id for the node
+        function getNodeLeftChild(bytes32 nodeId) constant returns (bytes32) {
+            return PathGroveLib.getNodeLeftChild(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
+        }
+
+        /// @dev Retrieve the right child id of the node.
+        /// @param nodeId The id for the node
+        function getNodeRightChild(bytes32 nodeId) constant returns (bytes32) {
+            return PathGroveLib.getNodeRightChild(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
+        }
+
+        /** @dev Retrieve the unique identifier of the node with the smallest
+         *  value in the index.  Returns 0x0 if the index is empty.
+         */
+        /// @param indexId The id of the index.
+        function getFirst(bytes32 indexId) constant returns (bytes32) {
+            return PathGroveLib.getFirst(index_lookup[indexId]);
+        }
+
+        /** @dev Retrieve the unique identifier of the node with the largest
+         *  value in the index.  Returns 0x0 if the index is empty.
+         */
+        /// @param indexId The id of the index.
+        function getLast(bytes32 indexId) constant returns (bytes32) {
+            return PathGroveLib.getLast(index_lookup[indexId]);
+        }
+
+        /** @dev Retrieve the id of the node that comes immediately before this
+         *  one.  Returns 0x0 if there is no previous node.
+         */
+        /// @param nodeId The id for the node
+        function getPreviousNode(bytes32 nodeId) constant returns (bytes32) {
+            return PathGroveLib.getPreviousNode(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
+        }
+
+        /** @dev Retrieve the id of the node that comes immediately after this
+         *  one.  Returns 0x0 if there is no previous node.
+         */
+        /// @param nodeId The id for the node
+        function getNextNode(bytes32 nodeId) constant returns (bytes32) {
+            return PathGroveLib.getNextNode(index_lookup[node_to_index[nodeId]], node_id_lookup[nodeId]);
+        }
+
+        /** @dev Update or Insert a data element represented by the unique
+         *  identifier `id` into the index.
+         */
+        /// @param indexName The human readable name for the index that the node should be upserted into.
+        /// @param id The unique identifier that the index node represents.
+        /// @param value The number which represents this data elements total ordering.
+        function insert(bytes32 indexName, bytes32 id, int value) public {
+                bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+                _insertNode(indexId, id, value);
+        }
+
+        /** @dev Update or Insert many data elements into the index in a
+         *  single transaction.  `ids` and `values` must be the same length.
+         */
+        /// @param indexName The human readable name for the index that the nodes should be upserted into.
+        /// @param ids The unique identifiers that the index nodes represent.
+        /// @param values The numbers which represent each data element's total ordering.
+        function insertMany(bytes32 indexName, bytes32[] ids, int[] values) public {
+                if (ids.length != values.length) {
+                    throw;
+                }
+
+                bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+                for (uint i = 0; i < ids.length; i++) {
+                    _insertNode(indexId, ids[i], values[i]);
+                }
+        }
+
+        /** @dev Store the mapping from nodeId to the indexId and id of a
+         *  node that was just inserted.  The mappings are only ever set for
+         *  nodes that exist, so they never need to be read first.
+         */
+        /// @param indexId The id of the index the node belongs to.
+        /// @param id The unique identifier that the index node represents.
+        function _trackNode(bytes32 indexId, bytes32 id) internal {
+                bytes32 nodeId = computeNodeId(indexId, id);
+
+                node_to_index[nodeId] = indexId;
+                node_id_lookup[nodeId] = id;
+        }
+
+        /// @dev Clear the mapping from nodeId to the indexId and id of a node that was just removed.
+        /// @param indexId The id of the index the node belonged to.
+        /// @param id The unique identifier that the index node represented.
+        function _untrackNode(bytes32 indexId, bytes32 id) internal {
+                bytes32 nodeId = computeNodeId(indexId, id);
+
+                node_to_index[nodeId] = 0x0;
+                node_id_lookup[nodeId] = 0x0;
+        }
+
+        /// @dev Update or Insert the node and log the change, if there is one.
+        /// @param indexId The id of the index the node belongs to.
+        /// @param id The unique identifier that the index node represents.
+        /// @param value The number which represents this data elements total ordering.
+        function _insertNode(bytes32 indexId, bytes32 id, int value) internal {
+                PathGroveLib.Index storage index = index_lookup[indexId];
+                bool isUpdate = (index.nodes[id].height > 0);
+                int previousValue = index.nodes[id].value;
+
+                PathGroveLib.insert(index, id, value);
+
+                if (!isUpdate) {
+                    _trackNode(indexId, id);
+                    NodeInserted(indexId, id, value);
+                }
+                else if (previousValue != value) {
+                    NodeUpdated(indexId, id, value);
+                }
+        }
+
+        /// @dev Remove the node and log the removal if it existed.
+        /// @param indexId The id of the index the node belongs to.
+        /// @param id The unique identifier that the index node represents.
+        function _removeNode(bytes32 indexId, bytes32 id) internal {
+                PathGroveLib.Index storage index = index_lookup[indexId];
+
+                if (index.nodes[id].height == 0) {
+                    return;
+                }
+
+                int value = index.nodes[id].value;
+
+                PathGroveLib.remove(index, id);
+
+                _untrackNode(indexId, id);
+                NodeRemoved(indexId, id, value);
+        }
+
+        /// @dev Query whether a node exists within the specified index for the unique identifier.
+        /// @param indexId The id for the index.
+        /// @param id The unique identifier of the data element.
+        function exists(bytes32 indexId, bytes32 id) constant returns (bool) {
+            return PathGroveLib.exists(index_lookup[indexId], id);
+        }
+
+        /// @dev Remove the index node for the given unique identifier.
+        /// @param indexName The name of the index.
+        /// @param id The unique identifier of the data element.
+        function remove(bytes32 indexName, bytes32 id) public {
+            _removeNode(computeIndexId(msg.sender, indexName), id);
+        }
+
+        /// @dev Remove the index nodes for many unique identifiers in a single transaction.
+        /// @param indexName The name of the index.
+        /// @param ids The unique identifiers of the data elements.
+        function removeMany(bytes32 indexName, bytes32[] ids) public {
+            bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+            for (uint i = 0; i < ids.length; i++) {
+                _removeNode(indexId, ids[i]);
+            }
+        }
+
+        /** @dev Remove the node with the smallest value from the index and
+         *  return its unique identifier and value.  Returns 0x0 if the index
+         *  is empty.
+         */
+        /// @param indexName The name of the index.
+        function popFirst(bytes32 indexName) public returns (bytes32 id, int value) {
+            bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+            (id, value) = PathGroveLib.popFirst(index_lookup[indexId]);
+
+            if (id != 0x0) {
+                _untrackNode(indexId, id);
+                NodeRemoved(indexId, id, value);
+            }
+        }
+
+        /** @dev Remove the node with the largest value from the index and
+         *  return its unique identifier and value.  Returns 0x0 if the index
+         *  is empty.
+         */
+        /// @param indexName The name of the index.
+        function popLast(bytes32 indexName) public returns (bytes32 id, int value) {
+            bytes32 indexId = computeIndexId(msg.sender, indexName);
+
+            (id, value) = PathGroveLib.popLast(index_lookup[indexId]);
+
+            if (id != 0x0) {
+                _untrackNode(indexId, id);
+                NodeRemoved(indexId, id, value);
+            }
+        }
+
+        /** @dev Remove up to `maxCount` of the nodes whose values are below
+         *  ('<', '<=') or above ('>', '>=') the given value.  Returns the
+         *  number of nodes removed, which is less than `maxCount` once no
+         *  matching nodes remain.
+         */
+        /// @param indexName The name of the index.
+        /// @param operator One of '<', '<=', '>', '>='.
+        /// @param value The value to compare against.
+        /// @param maxCount The maximum number of nodes to remove.
+        function removeRange(bytes32 indexName, bytes2 operator, int value, uint maxCount) public returns (uint removed) {
+            bytes32 indexId = computeIndexId(msg.sender, indexName);
+            PathGroveLib.Index storage index = index_lookup[indexId];
+            bool fromEnd = (operator == ">" || operator == ">=");
+            bool inclusive = (operator == "<=" || operator == ">=");
+            bytes32 id;
+            int nodeValue;
+
+            if (!fromEnd && !inclusive && operator != "<") {
+                // Invalid operator.
+                throw;
+            }
+
+            // Remove the nodes one at a time so that each of them is logged.
+            // They come off the end of the index that the range starts at.
+            // The edge of the index is read from storage here, so each
+            // removal is a single library call.
+            while (removed < maxCount) {
+                if (fromEnd) {
+                    id = index.tail;
+                }
+                else {
+                    id = index.head;
+                }
+
+                if (id == 0x0) {
+                    // The index is empty.
+                    break;
+                }
+
+                nodeValue = index.nodes[id].value;
+
+                if (nodeValue == value && !inclusive) {
+                    break;
+                }
+                if (fromEnd && nodeValue < value) {
+                    break;
+                }
+                if (!fromEnd && nodeValue > value) {
+                    break;
+                }
+
+                if (fromEnd) {
+                    PathGroveLib.popLast(index);
+                }
+                else {
+                    PathGroveLib.popFirst(index);
+                }
+
+                _untrackNode(indexId, id);
+                NodeRemoved(indexId, id, nodeValue);
+                removed += 1;
+            }
+        }
+
+        /** @dev Query the index for the edge-most node that satisfies the
+         * given query.  For >, >=, and ==, this will be the left-most node
+         * that satisfies the comparison.  For < and <= this will be the
+         * right-most node that satisfies the comparison.
+         */
+        /// @param indexId The id of the index that should be queried
+        /** @param operator One of '>', '>=', '<', '<=', '==' to specify what
+         *  type of comparison operator should be used.
+         */
+        function query(bytes32 indexId, bytes2 operator, int value) constant returns (bytes32) {
+                return PathGroveLib.query(index_lookup[indexId], operator, value);
+        }
+
+        /** @dev Retrieve a page of up to `limit` nodes starting at the
+         *  edge-most node that satisfies the given query.  Returns the ids
+         *  and values of the nodes, and the id to pass to `scanFrom` to
+         *  retrieve the next page, which is 0x0 once the end of the index
+         *  is reached.  Entries past the end of the index are left as 0x0.
+         */
+        /// @param indexId The id of the index that should be scanned.
+        /// @param operator One of '>', '>=', '<', '<=', '==' to specify what type of comparison operator should be used.
+        /// @param value The value to compare against.
+        /// @param reverse Whether to walk towards the previous nodes rather than the next nodes.
+        /// @param limit The maximum number of nodes to return.
+        function scan(bytes32 indexId, bytes2 operator, int value, bool reverse, uint limit) constant returns (bytes32[] ids, int[] values, bytes32 cursor) {
+                PathGroveLib.Index storage index = index_lookup[indexId];
+
+                return PathGroveLib.scan(index, PathGroveLib.query(index, operator, value), reverse, limit);
+        }
+
+        /** @dev Retrieve a page of up to `limit` nodes starting at the node
+         *  for the unique identifier `id`.  Used to continue a `scan` with
+         *  the returned cursor.
+         */
+        /// @param indexId The id of the index that should be scanned.
+        /// @param id The unique identifier of the first data element of the page.
+        /// @param reverse Whether to walk towards the previous nodes rather than the next nodes.
+        /// @param limit The maximum number of nodes to return.
+        function scanFrom(bytes32 indexId, bytes32 id, bool reverse, uint limit) constant returns (bytes32[] ids, int[] values, bytes32 cursor) {
+                return PathGroveLib.scan(index_lookup[indexId], id, reverse, limit);
+        }
+}
@@ -14,21 +14,63 @@ contract GroveAPI {
         function getNodeIndexId(bytes32 nodeId) constant returns (bytes32);
         function getNodeValue(bytes32 nodeId) constant returns (int);
         function getNodeHeight(bytes32 nodeId) constant returns (uint);
+        function isNodeRed(bytes32 nodeId) constant returns (bool);
         function getNodeParent(bytes32 nodeId) constant returns (bytes32);
         function getNodeLeftChild(bytes32 nodeId) constant returns (bytes32);
         function getNodeRightChild(bytes32 nodeId) constant returns (bytes32);
+        function getNodes(bytes32[] nodeIds) constant returns (bytes32[] indexIds, bytes32[] ids, int[] values, uint[] heights, bytes32[] parents, bytes32[] leftChildren, bytes32[] rightChildren);
+        function getSubtree(bytes32 nodeId, uint depth) constant returns (bytes32[] ids, int[] values, uint[] heights);
 
         /*
          *  Traversal
          */
         function getNextNode(bytes32 nodeId) constant returns (bytes32);
         function getPreviousNode(bytes32 nodeId) constant returns (bytes32);
+        function getFirst(bytes32 indexId) constant returns (bytes32);
+        function getLast(bytes32 indexId) constant returns (bytes32);
 
         /*
          *  Insert and Query API
          */
+        function enableValueBuckets(bytes32 indexName) public;
+        function enableRedBlack(bytes32 indexName) public;
         function insert(bytes32 indexName, bytes32 id, int value) public;
+        function insertMany(bytes32 indexName, bytes32[] ids, int[] values) public;
+        function startBulkLoad(bytes32 indexName, uint total) public;
+        function bulkLoad(bytes32 indexName, bytes32[] ids, int[] values) public;
+        function getBulkLoadRemaining(bytes32 indexId) constant returns (uint);
         function query(bytes32 indexId, bytes2 operator, int value) public returns (bytes32);
         function exists(bytes32 indexId, bytes32 id) constant returns (bool);
         function remove(bytes32 indexName, bytes32 id) public;
+        function removeMany(bytes32 indexName, bytes32[] ids) public;
+        function popFirst(bytes32 indexName) public returns (bytes32 id, int value);
+        function popLast(bytes32 indexName) public returns (bytes32 id, int value);
+        function removeRange(bytes32 indexName, bytes2 operator, int value, uint maxCount) public returns (uint);
+
+        /*
+         *  Range Scans
+         */
+        function scan(bytes32 indexId, bytes2 operator, int value, bool reverse, uint limit) constant returns (bytes32[] ids, int[] values, bytes32 cursor);
+        function scanFrom(bytes32 indexId, bytes32 id, bool reverse, uint limit) constant returns (bytes32[] ids, int[] values, bytes32 cursor);
+
+        /*
+         *  Order Statistics
+         */
+        function enableNodeCounts(bytes32 indexName) public;
+        function rank(bytes32 indexId, int value) constant returns (uint);
+        function select(bytes32 indexId, uint k) constant returns (bytes32);
+        function count(bytes32 indexId, int lo, int hi) constant returns (uint);
+
+        /*
+         *  Range Sums
+         */
+        function enableValueSums(bytes32 indexName) public;
+        function sumRange(bytes32 indexId, int lo, int hi) constant returns (int);
+
+        /*
+         *  Events
+         */
+        event NodeInserted(bytes32 indexed indexId, bytes32 id, int value);
+        event NodeUpdated(bytes32 indexed indexId, bytes32 id, int value);
+        event NodeRemoved(bytes32 indexed indexId, bytes32 id, int value);
 }
@@ -0,0 +1,7 @@
+"""
+Off-chain helpers for reading Grove indexes.
+"""
+from .client import GroveClient  # NOQA
+from .indexer import Indexer, ReorgTooDeep  # NOQA
+from .logs import JSONRPCSource  # NOQA
+from .mirror import IndexMirror, INSERTION_ORDER, ID_ORDER  # NOQA
@@ -0,0 +1,349 @@
+"""
+An asyncio client which downloads a Grove index in O(height) round trips.
+
+    rpc = AsyncRPC(ConnectionPool('http://127.0.0.1:8545', size=4))
+    client = AsyncGroveClient(rpc, grove_address)
+    nodes = await client.dump(index_id)
+
+Walking an index with `getNextNode` makes one call per node, each waiting
+for the previous one.  `dump` instead downloads the tree a level at a time.
+The nodes of a level are split into chunks.  The node ids of a chunk are
+computed locally and every chunk is one `getNodes` call, and the chunks
+are sent concurrently over a pool of keep-alive connections.  All
+of the calls are made against the block the dump started at, so the result
+is a consistent snapshot.
+
+This module needs python 3.5 or newer, and either pysha3 or pycryptodome
+for keccak.
+"""
+import asyncio
+import codecs
+import json
+from urllib.parse import urlparse
+
+try:
+    from sha3 import keccak_256
+except ImportError:
+    from Crypto.Hash import keccak
+
+    def keccak_256(data):
+        return keccak.new(data=data, digest_bits=256)
+
+
+# The first four bytes of the sha3 of the function signatures.
+GET_INDEX_ROOT = 'ce7cdbb7'
+GET_NODES = '9edf62dc'
+GET_NEXT_NODE = 'af82403c'
+GET_FIRST = 'fbd2e1fa'
+GET_NODE_VALUE = '82ac1d99'
+
+
+class RPCError(Exception):
+    pass
+
+
+class ConnectionPool(object):
+    """
+    Up to `size` HTTP/1.1 keep-alive connections to a JSON-RPC endpoint.
+    Only plain ``http://`` endpoints are supported.
+    """
+    def __init__(self, url, size=4):
+        parsed = urlparse(url)
+
+        if parsed.scheme != 'http':
+            raise ValueError("Unsupported scheme in {0!r}, only http is supported".format(url))
+
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.path = parsed.path or '/'
+        self.size = size
+
+        self.requests = 0
+
+        self._idle = []
+        self._semaphore = None
+
+    async def post(self, body):
+        if self._semaphore is None:
+            # Created on first use so that it belongs to the loop the pool
+            # is used on rather than to whichever loop was current when the
+            # pool was created.
+            self._semaphore = asyncio.Semaphore(self.size)
+
+        async with self._semaphore:
+            if self._idle:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+
+            try:
+                response, keep_alive = await self._send(reader, writer, body)
+            except Exception:
+                writer.close()
+                raise
+
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+
+            self.requests += 1
+            return response
+
+    async def _send(self, reader, writer, body):
+        writer.write((
+            "POST {0} HTTP/1.1\r\n"
+            "Host: {1}:{2}\r\n"
+            "Content-Type: application/json\r\n"
+            "Content-Length: {3}\r\n"
+            "Connection: keep-alive\r\n"
+            "\r\n"
+        ).format(self.path, self.host, self.port, len(body)).encode('ascii') + body)
+        await writer.drain()
+
+        status = await reader.readline()
+        if not status:
+            raise ConnectionError("Connection closed by {0}:{1}".format(self.host, self.port))
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                length = int((await reader.readline()).split(b';')[0], 16)
+                chunk = await reader.readexactly(length + 2)
+                if length == 0:
+                    break
+                chunks.append(chunk[:-2])
+            response = b''.join(chunks)
+        else:
+            response = await reader.readexactly(int(headers['content-length']))
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+
+        return response, keep_alive
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle = []
+
+
+class AsyncRPC(object):
+    """
+    JSON-RPC requests, singly or as a batch, over a `ConnectionPool`.
+    """
+    def __init__(self, pool):
+        self.pool = pool
+        self._next_id = 0
+
+    def _message(self, method, params):
+        self._next_id += 1
+        return {'jsonrpc': '2.0', 'id': self._next_id, 'method': method, 'params': params}
+
+    async def request(self, method, params):
+        response = json.loads((await self.pool.post(
+            json.dumps(self._message(method, params)).encode('utf-8')
+        )).decode('utf-8'))
+
+        if 'error' in response:
+            raise RPCError(response['error'])
+        return response['result']
+
+    async def batch(self, calls):
+        """
+        Send the (method, params) pairs as a single batch and return their
+        results in the same order.
+        """
+        if not calls:
+            return []
+
+        messages = [self._message(method, params) for method, params in calls]
+        responses = json.loads((await self.pool.post(
+            json.dumps(messages).encode('utf-8')
+        )).decode('utf-8'))
+
+        # Responses to a batch can come back in any order.
+        by_id = dict((response['id'], response) for response in responses)
+        results = []
+
+        for message in messages:
+            response = by_id[message['id']]
+            if 'error' in response:
+                raise RPCError(response['error'])
+            results.append(response['result'])
+        return results
+
+
+#
+#  ABI encoding of the few types the client needs.
+#
+def encode_bytes32(value):
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return codecs.encode(value.ljust(32, b'\x00'), 'hex').decode('ascii')
+
+
+def encode_uint(value):
+    return '{0:064x}'.format(value)
+
+
+def decode_words(result):
+    data = result[2:]
+    return [data[i:i + 64] for i in range(0, len(data), 64)]
+
+
+def decode_bytes32(word):
+    return codecs.decode(word, 'hex').rstrip(b'\x00') or None
+
+
+def decode_int(word):
+    value = int(word, 16)
+
+    if value >= 2 ** 255:
+        value -= 2 ** 256
+    return value
+
+
+def decode_arrays(result, count):
+    """
+    Split the return data of a function which returns `count` dynamic
+    arrays into the words of each array.
+    """
+    words = decode_words(result)
+    arrays = []
+
+    for k in range(count):
+        offset = int(words[k], 16) // 32
+        length = int(words[offset], 16)
+        arrays.append(words[offset + 1:offset + 1 + length])
+    return arrays
+
+
+class AsyncGroveClient(object):
+    """
+    Reads from the Grove contract at `address` through an `AsyncRPC`.
+    Every call is made against `block`, which is the latest block unless
+    given.  `dump` and `walk` pin all of their calls to the block they
+    start at, so any number of them can run at once on one client.
+    """
+    def __init__(self, rpc, address, chunk_size=200):
+        self.rpc = rpc
+        self.address = address
+        self.chunk_size = chunk_size
+
+    def _call_params(self, data, block):
+        return [{'to': self.address, 'data': '0x' + data}, block]
+
+    async def _call(self, data, block):
+        return await self.rpc.request('eth_call', self._call_params(data, block))
+
+    async def get_block_number(self):
+        return await self.rpc.request('eth_blockNumber', [])
+
+    async def getIndexRoot(self, indexId, block='latest'):
+        return decode_bytes32(decode_words(await self._call(GET_INDEX_ROOT + encode_bytes32(indexId), block))[0])
+
+    async def getFirst(self, indexId, block='latest'):
+        return decode_bytes32(decode_words(await self._call(GET_FIRST + encode_bytes32(indexId), block))[0])
+
+    async def getNextNode(self, nodeId, block='latest'):
+        return decode_bytes32(decode_words(await self._call(GET_NEXT_NODE + encode_bytes32(nodeId), block))[0])
+
+    async def getNodeValue(self, nodeId, block='latest'):
+        return decode_int(decode_words(await self._call(GET_NODE_VALUE + encode_bytes32(nodeId), block))[0])
+
+    def computeNodeId(self, indexId, id):
+        """
+        The same node id as the contract's `computeNodeId`, which is the
+        sha3 of the two bytes32 arguments, without a call.
+        """
+        return keccak_256(bytes.fromhex(encode_bytes32(indexId) + encode_bytes32(id))).digest()
+
+    async def getNodes(self, nodeIds, block='latest'):
+        """
+        The (indexId, id, value, height, parent, left, right) records of the
+        nodes from a single `getNodes` call.
+        """
+        data = GET_NODES + encode_uint(32) + encode_uint(len(nodeIds)) + ''.join(
+            encode_bytes32(node_id) for node_id in nodeIds
+        )
+        index_ids, ids, values, heights, parents, lefts, rights = decode_arrays(await self._call(data, block), 7)
+
+        return [
+            (
+                decode_bytes32(index_ids[i]),
+                decode_bytes32(ids[i]),
+                decode_int(values[i]),
+                int(heights[i], 16),
+                decode_bytes32(parents[i]),
+                decode_bytes32(lefts[i]),
+                decode_bytes32(rights[i]),
+            )
+            for i in range(len(nodeIds))
+        ]
+
+    async def _fetch_chunk(self, indexId, ids, block):
+        return await self.getNodes([self.computeNodeId(indexId, _id) for _id in ids], block)
+
+    async def dump(self, indexId):
+        """
+        Download every tree node of the index a level at a time and return
+        their (id, value) pairs in order.  Nodes kept in value buckets are
+        not children of any tree node and are not included.
+        """
+        block = await self.get_block_number()
+
+        root = await self.getIndexRoot(indexId, block)
+        records = {}
+        level = [root] if root else []
+
+        while level:
+            chunks = [level[i:i + self.chunk_size] for i in range(0, len(level), self.chunk_size)]
+            fetched = await asyncio.gather(*[self._fetch_chunk(indexId, chunk, block) for chunk in chunks])
+
+            level = []
+            for chunk, chunk_records in zip(chunks, fetched):
+                for _id, record in zip(chunk, chunk_records):
+                    records[_id] = record
+                    level.extend(child for child in record[5:7] if child)
+
+        return self._in_order(root, records)
+
+    def _in_order(self, root, records):
+        ordered = []
+        stack = []
+        current = root
+
+        while stack or current:
+            while current:
+                stack.append(current)
+                current = records[current][5]
+            current = stack.pop()
+            ordered.append((current, records[current][2]))
+            current = records[current][6]
+
+        return ordered
+
+    async def walk(self, indexId):
+        """
+        Walk the index one node at a time with `getNextNode`, which is what
+        `dump` replaces.
+        """
+        block = await self.get_block_number()
+
+        ordered = []
+        current = await self.getFirst(indexId, block)
+
+        while current:
+            node_id = self.computeNodeId(indexId, current)
+            ordered.append((current, await self.getNodeValue(node_id, block)))
+            current = await self.getNextNode(node_id, block)
+
+        return ordered
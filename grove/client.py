@@ -0,0 +1,281 @@
+"""
+A caching client for reading a Grove contract.
+
+    client = GroveClient(grove, JSONRPCSource(client))
+    client.getNodeValue(node_id)
+
+`GroveClient` has the same constant functions as the contract in
+``contracts/api.sol``.  Node records and the results of traversal calls are
+kept in an LRU cache for the current block, and the whole cache is dropped
+as soon as a new block is seen.  Identical requests made at the same time
+from several threads share a single call to the contract.
+"""
+import collections
+import threading
+import time
+
+
+class _Pending(object):
+    """
+    A call which is in flight, which other threads asking for the same key
+    wait on.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class GroveClient(object):
+    """
+    `contract` is the contract object whose functions perform the calls and
+    `source` has a ``get_block_number()`` function, such as
+    `grove.logs.JSONRPCSource`.  The block number is checked at most once
+    every `block_refresh` seconds, so results can lag behind the chain by
+    that long.  Results are only cached when the block is unchanged after
+    they are fetched, which costs a block number request per miss.
+    """
+    def __init__(self, contract, source, max_size=4096, block_refresh=1.0, clock=time.time):
+        self.contract = contract
+        self.source = source
+        self.max_size = max_size
+        self.block_refresh = block_refresh
+        self.clock = clock
+
+        self.block_number = None
+        self._block_checked_at = None
+
+        self._cache = collections.OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    @property
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'invalidations': self.invalidations,
+            'size': len(self._cache),
+            'block_number': self.block_number,
+        }
+
+    #
+    #  Cache
+    #
+    def _check_block(self):
+        now = self.clock()
+
+        with self._lock:
+            if self._block_checked_at is not None and now - self._block_checked_at < self.block_refresh:
+                return self.block_number
+
+        block_number = self.source.get_block_number()
+
+        with self._lock:
+            self._block_checked_at = now
+
+            if block_number != self.block_number:
+                if self.block_number is not None:
+                    self.invalidations += 1
+                self.block_number = block_number
+                self._cache.clear()
+
+            return self.block_number
+
+    def _refresh_block(self):
+        # Calls are made against the latest block, which may have moved on
+        # from the block a result is cached under while it was fetched, or
+        # since the block was last checked.  Checking the block again once
+        # the result is in drops the cache, and with it the result, if so.
+        with self._lock:
+            self._block_checked_at = None
+        self._check_block()
+
+    def _get(self, key, fetch):
+        key = (key, self._check_block())
+
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                value = self._cache.pop(key)
+                self._cache[key] = value
+                return value
+
+            if key in self._pending:
+                self.coalesced += 1
+                pending = self._pending[key]
+                is_owner = False
+            else:
+                self.misses += 1
+                pending = _Pending()
+                self._pending[key] = pending
+                is_owner = True
+
+        if not is_owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            pending.result = fetch()
+            self._refresh_block()
+        except Exception as error:
+            pending.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+                if pending.error is None:
+                    self._store(key, pending.result)
+            pending.done.set()
+
+        return pending.result
+
+    def _store(self, key, value):
+        # Results fetched for a block that has since been replaced are not
+        # kept.
+        if key[1] != self.block_number:
+            return
+
+        self._cache[key] = value
+
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def _call(self, name, *args):
+        return self._get((name,) + args, lambda: getattr(self.contract, name)(*args))
+
+    #
+    #  Node records
+    #
+    def get_node(self, node_id):
+        """
+        The (indexId, id, value, height, parent, left, right) record of the
+        node, fetched with a single `getNodes` call.
+        """
+        return self._get(('node', node_id), lambda: self._fetch_nodes([node_id])[0])
+
+    def get_nodes(self, node_ids):
+        """
+        The records of many nodes, fetching the ones which are neither cached
+        nor already being fetched in a single `getNodes` call.
+        """
+        block_number = self._check_block()
+
+        records = {}
+        # The nodes this call fetches and the nodes it waits on another call
+        # for, with the pending call of each.
+        missing = []
+        waiting = []
+
+        with self._lock:
+            for node_id in set(node_ids):
+                key = (('node', node_id), block_number)
+
+                if key in self._cache:
+                    self.hits += 1
+                    records[node_id] = self._cache.pop(key)
+                    self._cache[key] = records[node_id]
+                elif key in self._pending:
+                    self.coalesced += 1
+                    waiting.append((node_id, self._pending[key]))
+                else:
+                    self.misses += 1
+                    pending = _Pending()
+                    self._pending[key] = pending
+                    missing.append((node_id, pending))
+
+        if missing:
+            try:
+                fetched = self._fetch_nodes([node_id for node_id, _ in missing])
+                for (node_id, pending), record in zip(missing, fetched):
+                    pending.result = record
+                self._refresh_block()
+            except Exception as error:
+                for node_id, pending in missing:
+                    pending.error = error
+                raise
+            finally:
+                with self._lock:
+                    for node_id, pending in missing:
+                        key = (('node', node_id), block_number)
+                        del self._pending[key]
+                        if pending.error is None:
+                            self._store(key, pending.result)
+                for node_id, pending in missing:
+                    pending.done.set()
+
+        for node_id, pending in missing + waiting:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            records[node_id] = pending.result
+
+        return [records[node_id] for node_id in node_ids]
+
+    def _fetch_nodes(self, node_ids):
+        index_ids, ids, values, heights, parents, lefts, rights = self.contract.getNodes(node_ids)
+
+        return [
+            (index_id or None, _id or None, value, height, parent or None, left or None, right or None)
+            for index_id, _id, value, height, parent, left, right
+            in zip(index_ids, ids, values, heights, parents, lefts, rights)
+        ]
+
+    def getNodeIndexId(self, nodeId):
+        return self.get_node(nodeId)[0]
+
+    def getNodeId(self, nodeId):
+        return self.get_node(nodeId)[1]
+
+    def getNodeValue(self, nodeId):
+        return self.get_node(nodeId)[2]
+
+    def getNodeHeight(self, nodeId):
+        return self.get_node(nodeId)[3]
+
+    def getNodeParent(self, nodeId):
+        return self.get_node(nodeId)[4]
+
+    def getNodeLeftChild(self, nodeId):
+        return self.get_node(nodeId)[5]
+
+    def getNodeRightChild(self, nodeId):
+        return self.get_node(nodeId)[6]
+
+    #
+    #  Everything else is cached per call.
+    #
+    def computeIndexId(self, ownerAddress, indexName):
+        return self._call('computeIndexId', ownerAddress, indexName)
+
+    def computeNodeId(self, indexId, id):
+        return self._call('computeNodeId', indexId, id)
+
+    def getIndexRoot(self, indexId):
+        return self._call('getIndexRoot', indexId)
+
+    def getNextNode(self, nodeId):
+        return self._call('getNextNode', nodeId)
+
+    def getPreviousNode(self, nodeId):
+        return self._call('getPreviousNode', nodeId)
+
+    def getFirst(self, indexId):
+        return self._call('getFirst', indexId)
+
+    def getLast(self, indexId):
+        return self._call('getLast', indexId)
+
+    def exists(self, indexId, id):
+        return self._call('exists', indexId, id)
+
+    def query(self, indexId, operator, value):
+        return self._call('query', indexId, operator, value)
@@ -0,0 +1,209 @@
+"""
+Keeps an in-memory copy of every index of a Grove contract up to date by
+replaying the contract's logs.
+
+    indexer = Indexer(JSONRPCSource(client), grove_address)
+    indexer.sync()
+    indexer.query(index_id, '>=', 10)
+
+`sync` can be called again at any time to catch up with the chain.  The
+changes made by the most recent blocks are remembered so that they can be
+undone if those blocks are reorganized out of the chain.  `checkpoint`
+returns the state of the indexer as a JSON serializable dict which
+`Indexer.from_checkpoint` picks back up from.
+"""
+from .logs import decode_log, decode_bytes32, encode_bytes32
+from .mirror import IndexMirror, INSERTION_ORDER
+
+
+class ReorgTooDeep(Exception):
+    """
+    Raised when the chain was reorganized further back than the blocks the
+    indexer remembers.  The indexer has to be rebuilt from an older
+    checkpoint or from the start of the chain.
+    """
+
+
+class Indexer(object):
+    """
+    `ordering` is the ordering of nodes with equal values of the contract at
+    `address` (see `grove.mirror`) and `value_buckets` the ids of the indexes
+    which have value buckets enabled, which are not visible in the logs.
+    Only blocks at least `confirmations` blocks deep are indexed, and the
+    changes of the last `max_reorg_depth` blocks are kept to be undone.
+    """
+    def __init__(self, source, address, start_block=0, ordering=INSERTION_ORDER,
+                 value_buckets=(), confirmations=0, max_reorg_depth=64):
+        self.source = source
+        self.address = address
+        self.ordering = ordering
+        self.value_buckets = set(value_buckets)
+        self.confirmations = confirmations
+        self.max_reorg_depth = max_reorg_depth
+
+        # The last block that has been indexed.
+        self.block_number = start_block - 1
+        self.indexes = {}
+
+        # (block number, block hash, changes) for the recent blocks which
+        # changed an index and for the last block indexed.  Each change is
+        # (index id, node id, previous state of the node).
+        self._blocks = []
+
+    def get_index(self, index_id):
+        """
+        The mirror of the index, which is empty if nothing was ever inserted
+        into it.
+        """
+        if index_id not in self.indexes:
+            return IndexMirror(self.ordering, index_id in self.value_buckets)
+        return self.indexes[index_id]
+
+    def query(self, index_id, operator, value):
+        return self.get_index(index_id).query(operator, value)
+
+    def _get_or_create_index(self, index_id):
+        if index_id not in self.indexes:
+            self.indexes[index_id] = IndexMirror(self.ordering, index_id in self.value_buckets)
+        return self.indexes[index_id]
+
+    #
+    #  Syncing
+    #
+    def sync(self):
+        """
+        Index the blocks up to the current head of the chain, after undoing
+        any blocks which are no longer part of the chain.  Returns the number
+        of logs that were applied.
+        """
+        self._rewind()
+
+        head = self.source.get_block_number() - self.confirmations
+
+        if head <= self.block_number:
+            return 0
+
+        # The hash of the head is read before the logs so that a reorg while
+        # the logs are read shows up as a mismatch on the next sync.
+        head_hash = self.source.get_block_hash(head)
+        logs = self.source.get_logs(self.address, self.block_number + 1, head)
+
+        applied = 0
+        blocks = {}
+
+        for log in sorted(logs, key=lambda log: (int(log['blockNumber'], 16), int(log['logIndex'], 16))):
+            event = decode_log(log)
+
+            if event is None:
+                continue
+
+            block_number = int(log['blockNumber'], 16)
+
+            if block_number not in blocks:
+                blocks[block_number] = (block_number, log['blockHash'], [])
+                self._blocks.append(blocks[block_number])
+
+            blocks[block_number][2].append(self._apply(*event))
+            applied += 1
+
+        if head not in blocks:
+            self._blocks.append((head, head_hash, []))
+
+        self.block_number = head
+        self._prune()
+
+        return applied
+
+    def _apply(self, event, index_id, _id, value):
+        index = self._get_or_create_index(index_id)
+
+        if event == 'NodeRemoved':
+            previous = index.remove(_id)
+        else:
+            previous = index.insert(_id, value)
+
+        return index_id, _id, previous
+
+    def _rewind(self):
+        # Find the latest block which is still part of the chain before
+        # undoing anything, so that a reorg which is too deep leaves the
+        # indexer as it was.
+        keep = len(self._blocks)
+
+        while keep and self.source.get_block_hash(self._blocks[keep - 1][0]) != self._blocks[keep - 1][1]:
+            keep -= 1
+
+        if keep == len(self._blocks):
+            return
+        if keep == 0:
+            raise ReorgTooDeep(
+                "The chain was reorganized before the earliest block the indexer remembers"
+            )
+
+        for block_number, block_hash, changes in reversed(self._blocks[keep:]):
+            for index_id, _id, previous in reversed(changes):
+                self.indexes[index_id].restore(_id, previous)
+
+        del self._blocks[keep:]
+        self.block_number = self._blocks[-1][0]
+
+    def _prune(self):
+        oldest = self.block_number - self.max_reorg_depth
+
+        # Always keep the last block so there is something to check the
+        # chain against.
+        while len(self._blocks) > 1 and self._blocks[0][0] < oldest:
+            self._blocks.pop(0)
+
+    #
+    #  Checkpoints
+    #
+    def checkpoint(self):
+        """
+        The state of the indexer as a JSON serializable dict.
+        """
+        return {
+            'address': self.address,
+            'block_number': self.block_number,
+            'ordering': self.ordering,
+            'value_buckets': sorted(encode_bytes32(index_id) for index_id in self.value_buckets),
+            'indexes': dict(
+                (encode_bytes32(index_id), [[encode_bytes32(_id), value] for _id, value in index.items()])
+                for index_id, index in self.indexes.items()
+            ),
+            'blocks': [
+                [block_number, block_hash, [
+                    [encode_bytes32(index_id), encode_bytes32(_id), None if previous is None else list(previous)]
+                    for index_id, _id, previous in changes
+                ]]
+                for block_number, block_hash, changes in self._blocks
+            ],
+        }
+
+    @classmethod
+    def from_checkpoint(cls, source, checkpoint, **kwargs):
+        """
+        Create an indexer which carries on from the given checkpoint.
+        """
+        indexer = cls(
+            source,
+            checkpoint['address'],
+            start_block=checkpoint['block_number'] + 1,
+            ordering=checkpoint['ordering'],
+            value_buckets=[decode_bytes32(index_id) for index_id in checkpoint['value_buckets']],
+            **kwargs
+        )
+
+        for index_id, items in checkpoint['indexes'].items():
+            index = indexer._get_or_create_index(decode_bytes32(index_id))
+
+            for position, (_id, value) in enumerate(items):
+                index.restore(decode_bytes32(_id), (position, value))
+
+        for block_number, block_hash, changes in checkpoint['blocks']:
+            indexer._blocks.append((block_number, block_hash, [
+                (decode_bytes32(index_id), decode_bytes32(_id), None if previous is None else tuple(previous))
+                for index_id, _id, previous in changes
+            ]))
+
+        return indexer
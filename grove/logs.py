@@ -0,0 +1,95 @@
+"""
+Reading the `NodeInserted`, `NodeUpdated` and `NodeRemoved` logs of a Grove
+contract from a node.
+"""
+import codecs
+
+
+# sha3 of the event signatures, which is the first topic of each log.
+NODE_INSERTED = '0x82a9081aa44c03edea4165d9f7ba4338c31835f69b36f88a4c4c9129c9db7f84'
+NODE_UPDATED = '0x02f1e052c443d3f76268b20da8220ffddea91263db2351ae0fd809e2cccba3f8'
+NODE_REMOVED = '0xdeabe633b5bf2c7f71183b6493090daac03b8e5933f31d79856353507a03d5ad'
+
+EVENTS = {
+    NODE_INSERTED: 'NodeInserted',
+    NODE_UPDATED: 'NodeUpdated',
+    NODE_REMOVED: 'NodeRemoved',
+}
+
+
+def decode_bytes32(word):
+    """
+    Decode a hex encoded bytes32 the way the contract ABI does, with the
+    trailing zero bytes stripped.
+    """
+    return codecs.decode(word[-64:], 'hex').rstrip(b'\x00')
+
+
+def encode_bytes32(value):
+    return '0x' + codecs.encode(value.ljust(32, b'\x00'), 'hex').decode('ascii')
+
+
+def decode_int256(word):
+    value = int(word[-64:], 16)
+
+    if value >= 2 ** 255:
+        value -= 2 ** 256
+    return value
+
+
+def decode_log(log):
+    """
+    Returns the event name, index id, node id and value of a Grove log, or
+    None if the log is not one of the Grove events.
+    """
+    topics = log['topics']
+
+    if len(topics) != 2 or topics[0] not in EVENTS:
+        return None
+
+    data = log['data'][2:]
+
+    return (
+        EVENTS[topics[0]],
+        decode_bytes32(topics[1]),
+        decode_bytes32(data[:64]),
+        decode_int256(data[64:128]),
+    )
+
+
+class JSONRPCSource(object):
+    """
+    Reads blocks and logs through a client with a
+    ``make_request(method, params)`` function which returns the decoded
+    JSON-RPC response, such as the populus deploy client.
+    """
+    def __init__(self, client):
+        self.client = client
+
+    def _request(self, method, params):
+        response = self.client.make_request(method, params)
+
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response['result']
+
+    def get_block_number(self):
+        return int(self._request('eth_blockNumber', []), 16)
+
+    def get_block_hash(self, block_number):
+        """
+        The hash of the block with the given number, or None if there is no
+        such block.
+        """
+        block = self._request('eth_getBlockByNumber', ['0x{0:x}'.format(block_number), False])
+
+        if block is None:
+            return None
+        return block['hash']
+
+    def get_logs(self, address, from_block, to_block):
+        return self._request('eth_getLogs', [{
+            'address': address,
+            'fromBlock': '0x{0:x}'.format(from_block),
+            'toBlock': '0x{0:x}'.format(to_block),
+        }])
@@ -0,0 +1,264 @@
+"""
+An in-memory copy of a single Grove index.
+
+The nodes are kept in a list in the same order as the in-order walk of the
+index on chain, so that queries, neighbours and scans give the same answers
+as the contract, including which of several nodes with equal values is
+returned.
+"""
+import bisect
+
+
+# `Grove` keeps nodes with equal values in the order they were inserted.
+# `PathGrove` and `BTreeGrove` order them by their id.
+INSERTION_ORDER = 'insertion'
+ID_ORDER = 'id'
+
+OPERATORS = ('<', '<=', '>', '>=', '==')
+
+
+class IndexMirror(object):
+    """
+    The nodes of one index in order.  `ordering` is the order of nodes with
+    equal values for the contract the index lives in, and `value_buckets`
+    whether value buckets are enabled for the index, which changes when an
+    updated `Grove` node keeps its position.
+    """
+    def __init__(self, ordering=INSERTION_ORDER, value_buckets=False):
+        if ordering not in (INSERTION_ORDER, ID_ORDER):
+            raise ValueError("Unknown ordering: {0!r}".format(ordering))
+
+        self.ordering = ordering
+        self.value_buckets = value_buckets
+
+        self._ids = []
+        self._values = []
+        self._values_by_id = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, _id):
+        return _id in self._values_by_id
+
+    def exists(self, _id):
+        return _id in self._values_by_id
+
+    def get_value(self, _id):
+        return self._values_by_id.get(_id)
+
+    def items(self):
+        """
+        The (id, value) pairs of every node in order.
+        """
+        return list(zip(self._ids, self._values))
+
+    #
+    #  Writes
+    #
+    def insert(self, _id, value):
+        """
+        Insert the node or update it's value the way the contract does.
+        Returns the position and value the node had beforehand, which can be
+        passed to `restore` to undo the change.
+        """
+        previous = self._get_state(_id)
+
+        if previous is not None:
+            position, old_value = previous
+
+            if old_value == value:
+                return previous
+            if self._is_in_order(position, old_value, value):
+                self._values[position] = value
+                self._values_by_id[_id] = value
+                return previous
+
+            self._delete(position)
+
+        position = self._find_slot(_id, value)
+
+        self._ids.insert(position, _id)
+        self._values.insert(position, value)
+        self._values_by_id[_id] = value
+
+        return previous
+
+    def remove(self, _id):
+        """
+        Remove the node if it exists.  Returns the position and value it had,
+        or None.
+        """
+        previous = self._get_state(_id)
+
+        if previous is not None:
+            self._delete(previous[0])
+
+        return previous
+
+    def restore(self, _id, previous):
+        """
+        Put the node back at the position and value returned by `insert` or
+        `remove`, or remove it if `previous` is None.  Changes have to be
+        restored in the reverse of the order they were made in.
+        """
+        self.remove(_id)
+
+        if previous is not None:
+            position, value = previous
+
+            self._ids.insert(position, _id)
+            self._values.insert(position, value)
+            self._values_by_id[_id] = value
+
+    def _delete(self, position):
+        del self._values_by_id[self._ids[position]]
+        del self._ids[position]
+        del self._values[position]
+
+    def _get_state(self, _id):
+        if _id not in self._values_by_id:
+            return None
+
+        value = self._values_by_id[_id]
+        lo = bisect.bisect_left(self._values, value)
+        hi = bisect.bisect_right(self._values, value)
+
+        if self.ordering == ID_ORDER:
+            return bisect.bisect_left(self._ids, _id, lo, hi), value
+        return self._ids.index(_id, lo, hi), value
+
+    def _find_slot(self, _id, value):
+        if self.ordering == ID_ORDER:
+            lo = bisect.bisect_left(self._values, value)
+            hi = bisect.bisect_right(self._values, value)
+            return bisect.bisect_left(self._ids, _id, lo, hi)
+
+        # Equal values are inserted after the existing nodes.
+        return bisect.bisect_right(self._values, value)
+
+    def _is_in_order(self, position, old_value, value):
+        if self.ordering == ID_ORDER:
+            # The order is total, so reinserting the node puts it in the
+            # same place as updating it where it is.
+            return False
+
+        # Mirrors `GroveLib._isInOrder`.  With value buckets, a node which
+        # shares it's value with a neighbor is part of a bucket.
+        strict = self.value_buckets
+        previous_value = None
+        next_value = None
+
+        if position > 0:
+            previous_value = self._values[position - 1]
+        if position + 1 < len(self._values):
+            next_value = self._values[position + 1]
+
+        if strict and old_value in (previous_value, next_value):
+            return False
+        if previous_value is not None and (previous_value > value or (strict and previous_value == value)):
+            return False
+        if next_value is not None and (next_value < value or (strict and next_value == value)):
+            return False
+        return True
+
+    #
+    #  Reads
+    #
+    def query(self, operator, value):
+        """
+        The id of the edge-most node that satisfies the comparison, as
+        returned by `Grove.query`, or None.
+        """
+        position = self._query_position(operator, value)
+
+        if position is None:
+            return None
+        return self._ids[position]
+
+    def get_first(self):
+        if not self._ids:
+            return None
+        return self._ids[0]
+
+    def get_last(self):
+        if not self._ids:
+            return None
+        return self._ids[-1]
+
+    def get_next(self, _id):
+        return self._get_neighbor(_id, 1)
+
+    def get_previous(self, _id):
+        return self._get_neighbor(_id, -1)
+
+    def scan(self, operator, value, reverse=False, limit=None):
+        """
+        Up to `limit` ids and values starting at the result of the query,
+        and the id of the node the next page starts at, as returned by
+        `Grove.scan` without the padding.
+        """
+        return self._scan(self._query_position(operator, value), reverse, limit)
+
+    def scan_from(self, _id, reverse=False, limit=None):
+        state = self._get_state(_id)
+
+        if state is None:
+            return self._scan(None, reverse, limit)
+        return self._scan(state[0], reverse, limit)
+
+    def _get_neighbor(self, _id, step):
+        state = self._get_state(_id)
+
+        if state is None:
+            return None
+
+        position = state[0] + step
+
+        if 0 <= position < len(self._ids):
+            return self._ids[position]
+        return None
+
+    def _query_position(self, operator, value):
+        if operator not in OPERATORS:
+            raise ValueError("Invalid operator: {0!r}".format(operator))
+
+        if operator == '<':
+            position = bisect.bisect_left(self._values, value) - 1
+        elif operator == '<=':
+            position = bisect.bisect_right(self._values, value) - 1
+        elif operator == '>':
+            position = bisect.bisect_right(self._values, value)
+        else:
+            position = bisect.bisect_left(self._values, value)
+
+        if position < 0 or position >= len(self._values):
+            return None
+        if operator == '==' and self._values[position] != value:
+            return None
+        return position
+
+    def _scan(self, position, reverse, limit):
+        if position is None:
+            return [], [], None
+
+        if reverse:
+            if limit is None:
+                stop = 0
+            else:
+                stop = max(position - limit + 1, 0)
+            ids = self._ids[stop:position + 1][::-1]
+            values = self._values[stop:position + 1][::-1]
+            cursor = stop - 1
+        else:
+            if limit is None:
+                stop = len(self._ids)
+            else:
+                stop = min(position + limit, len(self._ids))
+            ids = self._ids[position:stop]
+            values = self._values[position:stop]
+            cursor = stop
+
+        if 0 <= cursor < len(self._ids):
+            return ids, values, self._ids[cursor]
+        return ids, values, None
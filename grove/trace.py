@@ -0,0 +1,275 @@
+"""
+Attribute the gas, storage reads and storage writes of a transaction to the
+Solidity functions that spent them.
+
+    profile = Profile({grove_address: grove_code, library_address: library_code})
+    profile.add_trace(grove_address, struct_logs)
+    profile.folded('sstore')
+
+`struct_logs` is the ``structLogs`` of a ``debug_traceTransaction`` with the
+stack enabled.  Each contract is described by a `Code`, built from it's
+runtime bytecode, it's runtime source map and the sources the source map
+refers to, as found in the ``--combined-json bin-runtime,srcmap-runtime``
+output of solc.
+
+Every instruction is attributed to the innermost function whose body
+contains the source range of the instruction.  Calls into internal
+functions are followed through the jump markers of the source map, so the
+profile keeps the whole stack of internal functions, and calls into other
+contracts, such as the `DELEGATECALL` into a library, continue the stack in
+the code of the called contract.  `folded` writes the profile in the folded
+stack format read by flamegraph.pl.
+"""
+import collections
+import re
+
+
+CALL_OPS = ('CALL', 'CALLCODE', 'DELEGATECALL', 'STATICCALL')
+
+_DEFINITION = re.compile(r'\b(contract|library|function)\s+(\w+)')
+
+
+def parse_source_map(source_map):
+    """
+    Expand a compressed source map into a (start, length, file, jump) tuple
+    for every instruction.
+    """
+    entries = []
+    current = [-1, -1, -1, '-']
+
+    for entry in source_map.split(';'):
+        for k, field in enumerate(entry.split(':')[:4]):
+            if field == '':
+                continue
+            if k == 3:
+                current[k] = field
+            else:
+                current[k] = int(field)
+        entries.append(tuple(current))
+
+    return entries
+
+
+def instruction_offsets(bytecode):
+    """
+    Map the program counter of every instruction to it's index, which is what
+    the source map is indexed by.
+    """
+    if bytecode.startswith('0x'):
+        bytecode = bytecode[2:]
+    code = bytearray.fromhex(bytecode)
+
+    offsets = {}
+    pc = 0
+
+    while pc < len(code):
+        offsets[pc] = len(offsets)
+
+        if 0x60 <= code[pc] <= 0x7f:
+            # PUSH1 to PUSH32 are followed by their data.
+            pc += code[pc] - 0x5f
+        pc += 1
+
+    return offsets
+
+
+def _find_block_end(source, start):
+    depth = 0
+
+    for position in range(start, len(source)):
+        if source[position] == '{':
+            depth += 1
+        elif source[position] == '}':
+            depth -= 1
+            if depth == 0:
+                return position + 1
+    return len(source)
+
+
+def find_functions(source):
+    """
+    The (start, end, name) of the body of every function in the source, with
+    the name qualified by the contract or library it belongs to.
+    """
+    definitions = []
+
+    for match in _DEFINITION.finditer(source):
+        # The body is the first block after the declaration, unless the
+        # declaration ends first, as it does for abstract functions.
+        brace = source.find('{', match.end())
+        semicolon = source.find(';', match.end())
+
+        if brace == -1 or (semicolon != -1 and semicolon < brace):
+            continue
+
+        definitions.append((match.group(1), match.group(2), match.start(), _find_block_end(source, brace)))
+
+    functions = []
+
+    for kind, name, start, end in definitions:
+        if kind == 'function':
+            owners = [
+                owner for owner_kind, owner, owner_start, owner_end in definitions
+                if owner_kind != 'function' and owner_start <= start < owner_end
+            ]
+            if owners:
+                name = owners[-1] + '.' + name
+        else:
+            name = name + '.<dispatch>'
+        functions.append((start, end, name))
+
+    return functions
+
+
+class Code(object):
+    """
+    The runtime bytecode of a contract along with what is needed to map it's
+    instructions back to functions.
+    """
+    def __init__(self, name, bytecode, source_map, sources):
+        self.name = name
+        self.offsets = instruction_offsets(bytecode)
+        self.source_map = parse_source_map(source_map)
+        self.functions = [find_functions(source) for source in sources]
+        self._names = {}
+
+    def locate(self, pc):
+        """
+        The name of the function the instruction at `pc` belongs to and the
+        jump marker of the instruction.
+        """
+        if pc not in self._names:
+            index = self.offsets.get(pc)
+            name = self.name
+            jump = '-'
+
+            if index is not None and index < len(self.source_map):
+                start, length, source_index, jump = self.source_map[index]
+
+                if 0 <= source_index < len(self.functions):
+                    # The innermost function is the one which starts last.
+                    containing = [
+                        (function_start, function_name)
+                        for function_start, function_end, function_name in self.functions[source_index]
+                        if function_start <= start and start + length <= function_end
+                    ]
+                    if containing:
+                        name = max(containing)[1]
+
+            self._names[pc] = (name, jump)
+        return self._names[pc]
+
+
+def _normalize_address(address):
+    # Addresses on the stack are padded out to a full word.
+    address = address.lower()
+    if address.startswith('0x'):
+        address = address[2:]
+    return '0x' + address[-40:].rjust(40, '0')
+
+
+class Frame(object):
+    def __init__(self, code, parent_stack):
+        self.code = code
+        self.parent_stack = parent_stack
+        # The internal functions which called the current one.
+        self.callers = []
+        self.pending_jump = None
+        self.pending_caller = None
+
+
+class Profile(object):
+    """
+    Totals of gas, SLOADs and SSTOREs for every stack of functions across
+    the traces added to it.  `codes` maps the address of every contract the
+    transactions run to it's `Code`.
+    """
+    METRICS = ('gas', 'sload', 'sstore')
+
+    def __init__(self, codes):
+        self.codes = dict((_normalize_address(address), code) for address, code in codes.items())
+        self.totals = dict((metric, collections.Counter()) for metric in self.METRICS)
+
+    def _code_for(self, address):
+        address = _normalize_address(address)
+
+        if address in self.codes:
+            return self.codes[address]
+        return Code(address, '', '', [])
+
+    def add_trace(self, address, struct_logs):
+        """
+        Add the steps of a transaction sent to `address`.
+        """
+        frames = [Frame(self._code_for(address), ())]
+        # The step of every call still in progress, with the gas used by the
+        # steps of the call.
+        calls = []
+
+        for step in struct_logs:
+            while len(frames) > step['depth']:
+                frames.pop()
+                call_step, call_stack, call_gas = calls.pop()
+                # A call's gasCost covers the gas given to the callee, so
+                # only the gas the call itself used is counted against it.
+                used = call_step['gas'] - step['gas'] - call_gas
+                self.totals['gas'][call_stack] += used
+                if calls:
+                    calls[-1][2] += used + call_gas
+
+            frame = frames[-1]
+            name, jump = frame.code.locate(step['pc'])
+
+            # A jump marked as going into a function makes the function it
+            # was made from a caller until the matching jump out of it.
+            if frame.pending_jump == 'i':
+                frame.callers.append(frame.pending_caller)
+            elif frame.pending_jump == 'o' and frame.callers:
+                frame.callers.pop()
+            frame.pending_jump = None
+
+            stack = frame.parent_stack + tuple(frame.callers) + (name,)
+            op = step['op']
+
+            if op == 'JUMP' and jump in ('i', 'o'):
+                frame.pending_jump = jump
+                frame.pending_caller = name
+
+            if op == 'SLOAD':
+                self.totals['sload'][stack] += 1
+            elif op == 'SSTORE':
+                self.totals['sstore'][stack] += 1
+
+            if op in CALL_OPS and step.get('stack'):
+                # The address is the second item on the stack, after the
+                # gas, for every kind of call.
+                frames.append(Frame(self._code_for(step['stack'][-2]), stack))
+                calls.append([step, stack, 0])
+                continue
+
+            self.totals['gas'][stack] += step['gasCost']
+            if calls:
+                calls[-1][2] += step['gasCost']
+
+    def folded(self, metric='gas'):
+        """
+        The profile as lines of ``a;b;c count``, the input of flamegraph.pl.
+        """
+        return '\n'.join(
+            "{0} {1}".format(';'.join(stack), count)
+            for stack, count in sorted(self.totals[metric].items())
+            if count
+        )
+
+    def by_function(self):
+        """
+        The totals for each function, counting only what it spent itself and
+        not what the functions it called spent.
+        """
+        totals = collections.defaultdict(lambda: dict((metric, 0) for metric in self.METRICS))
+
+        for metric in self.METRICS:
+            for stack, count in self.totals[metric].items():
+                totals[stack[-1]][metric] += count
+
+        return dict(totals)
@@ -0,0 +1,858 @@
+// Grove v0.4
+
+
+/// @title BTreeGroveLib - Library for queriable indexed ordered data stored in a B+tree.
+/// @author PiperMerriam - <pipermerriam@gmail.com>
+library BTreeGroveLib {
+        /*
+         *  Indexes for ordered data
+         *
+         *  This is an alternative to `GroveLib` which stores the index in a
+         *  B+tree.  Each tree node holds up to 15 sorted keys, which are
+         *  binary searched, so a search reads far fewer child pointers and
+         *  heights than a descent through an AVL tree of the same size.
+         *  All of the entries are kept in the leaves, which are linked to
+         *  their neighbors so that walking the index reads the entries of a
+         *  leaf one after the other.
+         *
+         *  Keys are ordered by value and then by id, so entries with equal
+         *  values come in the order of their ids.
+         */
+        struct Index {
+                // The id of the root tree node and the number of levels in
+                // the tree, the last of which are the leaves.
+                uint root;
+                uint8 depth;
+
+                // Tree node ids are allocated from this counter.
+                uint lastNodeId;
+
+                // The leaves holding the smallest and largest values.
+                uint firstLeaf;
+                uint lastLeaf;
+
+                mapping (bytes32 => Entry) entries;
+                mapping (uint => Node) nodes;
+        }
+
+        struct Entry {
+                int value;
+                bool exists;
+        }
+
+        /*
+         *  A node with `count` keys.  The keys of a leaf are the entries of
+         *  the index.  The keys of an internal node separate it's children:
+         *  every key in `children[i]` is less than key `i`, which in turn is
+         *  no greater than every key in `children[i + 1]`.  A node briefly
+         *  holds 16 keys while it is being split.
+         */
+        struct Node {
+                uint8 count;
+                bool isLeaf;
+                uint previous;
+                uint next;
+                int[16] values;
+                bytes32[16] ids;
+                uint[17] children;
+        }
+
+        uint8 constant ORDER = 16;
+        uint8 constant MIN_KEYS = 7;
+        bytes32 constant MAX_ID = 0xffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff;
+
+        /*
+         *  Entry getters
+         */
+        /// @dev Retrieve the value for the entry.
+        /// @param index The index that the entry is part of.
+        /// @param id The id for the entry to be looked up.
+        function getNodeValue(Index storage index, bytes32 id) constant returns (int) {
+            return index.entries[id].value;
+        }
+
+        /// @dev Retrieve the number of levels in the tree.
+        /// @param index The index to look up.
+        function getDepth(Index storage index) constant returns (uint) {
+            return index.depth;
+        }
+
+        /// @dev Retrieve the id of the entry with the smallest value, or 0x0 if the index is empty.
+        /// @param index The index to look up.
+        function getFirst(Index storage index) constant returns (bytes32) {
+            if (index.firstLeaf == 0) {
+                return 0x0;
+            }
+            return index.nodes[index.firstLeaf].ids[0];
+        }
+
+        /// @dev Retrieve the id of the entry with the largest value, or 0x0 if the index is empty.
+        /// @param index The index to look up.
+        function getLast(Index storage index) constant returns (bytes32) {
+            if (index.lastLeaf == 0) {
+                return 0x0;
+            }
+
+            Node storage leaf = index.nodes[index.lastLeaf];
+            return leaf.ids[leaf.count - 1];
+        }
+
+        /// @dev Retrieve the id of the previous entry in the index.
+        /// @param index The index that the entry is part of.
+        /// @param id The id for the entry to be looked up.
+        function getPreviousNode(Index storage index, bytes32 id) constant returns (bytes32) {
+            if (!index.entries[id].exists) {
+                return 0x0;
+            }
+
+            uint leafId;
+            uint position;
+            (leafId, position) = _locate(index, id);
+
+            if (position > 0) {
+                return index.nodes[leafId].ids[position - 1];
+            }
+
+            leafId = index.nodes[leafId].previous;
+
+            if (leafId == 0) {
+                // This is the first entry.
+                return 0x0;
+            }
+            return index.nodes[leafId].ids[index.nodes[leafId].count - 1];
+        }
+
+        /// @dev Retrieve the id of the next entry in the index.
+        /// @param index The index that the entry is part of.
+        /// @param id The id for the entry to be looked up.
+        function getNextNode(Index storage index, bytes32 id) constant returns (bytes32) {
+            if (!index.entries[id].exists) {
+                return 0x0;
+            }
+
+            uint leafId;
+            uint position;
+            (leafId, position) = _locate(index, id);
+
+            if (position + 1 < index.nodes[leafId].count) {
+                return index.nodes[leafId].ids[position + 1];
+            }
+
+            leafId = index.nodes[leafId].next;
+
+            if (leafId == 0) {
+                // This is the final entry.
+                return 0x0;
+            }
+            return index.nodes[leafId].ids[0];
+        }
+
+        /// @dev Checks whether an entry for the given unique identifier exists within the given index.
+        /// @param index The index that should be searched
+        /// @param id The unique identifier of the data element to check for.
+        function exists(Index storage index, bytes32 id) constant returns (bool) {
+            return index.entries[id].exists;
+        }
+
+        /// @dev Updates or Inserts the id into the index at its appropriate location based on the value provided.
+        /// @param index The index that the entry is part of.
+        /// @param id The unique identifier of the data element the index entry will represent.
+        /// @param value The value of the data element that represents it's total ordering with respect to other elementes.
+        function insert(Index storage index, bytes32 id, int value) public {
+                if (id == 0x0) {
+                    throw;
+                }
+
+                Entry storage entry = index.entries[id];
+
+                if (entry.exists) {
+                    if (entry.value == value) {
+                        return;
+                    }
+                    if (_updateInPlace(index, id, value)) {
+                        return;
+                    }
+                    remove(index, id);
+                }
+
+                entry.value = value;
+                entry.exists = true;
+
+                if (index.root == 0) {
+                    uint rootId = _newNode(index, true);
+                    index.root = rootId;
+                    index.depth = 1;
+                    index.firstLeaf = rootId;
+                    index.lastLeaf = rootId;
+
+                    index.nodes[rootId].values[0] = value;
+                    index.nodes[rootId].ids[0] = id;
+                    index.nodes[rootId].count = 1;
+                    return;
+                }
+
+                uint[] memory path;
+                uint[] memory slots;
+                (path, slots) = _findLeaf(index, value, id);
+
+                uint leafId = path[index.depth - 1];
+                Node storage leaf = index.nodes[leafId];
+                uint position = _rank(index, leafId, value, id);
+
+                for (uint i = leaf.count; i > position; i--) {
+                    leaf.values[i] = leaf.values[i - 1];
+                    leaf.ids[i] = leaf.ids[i - 1];
+                }
+                leaf.values[position] = value;
+                leaf.ids[position] = id;
+                leaf.count += 1;
+
+                if (leaf.count == ORDER) {
+                    _splitLeaf(index, path, slots);
+                }
+        }
+
+        /** @dev Update the value of an entry that keeps it's position
+         *  between it's neighbors within the leaf.  Returns whether the
+         *  value was updated.  The first key of a leaf may be used as a
+         *  separator by the leaf's ancestors, so it is never updated in
+         *  place.
+         */
+        function _updateInPlace(Index storage index, bytes32 id, int value) internal returns (bool) {
+                uint leafId;
+                uint position;
+                (leafId, position) = _locate(index, id);
+
+                Node storage leaf = index.nodes[leafId];
+
+                if (position == 0 || position + 1 >= leaf.count) {
+                    return false;
+                }
+                if (!_isBefore(leaf.values[position - 1], leaf.ids[position - 1], value, id)) {
+                    return false;
+                }
+                if (!_isBefore(value, id, leaf.values[position + 1], leaf.ids[position + 1])) {
+                    return false;
+                }
+
+                leaf.values[position] = value;
+                index.entries[id].value = value;
+                return true;
+        }
+
+        /// @dev Split the full leaf at the end of `path` in two, adding the new leaf to the parents.
+        function _splitLeaf(Index storage index, uint[] path, uint[] slots) internal {
+                uint leafId = path[index.depth - 1];
+                Node storage leaf = index.nodes[leafId];
+                uint rightId = _newNode(index, true);
+                Node storage right = index.nodes[rightId];
+
+                // The upper half of the keys move to the new leaf.
+                for (uint i = ORDER / 2; i < ORDER; i++) {
+                    right.values[i - ORDER / 2] = leaf.values[i];
+                    right.ids[i - ORDER / 2] = leaf.ids[i];
+                    leaf.values[i] = 0;
+                    leaf.ids[i] = 0x0;
+                }
+                right.count = ORDER / 2;
+                leaf.count = ORDER / 2;
+
+                // Link the new leaf in after the split leaf.
+                right.next = leaf.next;
+                right.previous = leafId;
+
+                if (leaf.next == 0) {
+                    index.lastLeaf = rightId;
+                }
+                else {
+                    index.nodes[leaf.next].previous = rightId;
+                }
+                leaf.next = rightId;
+
+                _insertIntoParents(index, path, slots, right.values[0], right.ids[0], rightId);
+        }
+
+        /** @dev Insert the separator key and new child that result from
+         *  splitting the node at `path[depth - 1]` into it's parent,
+         *  splitting each parent that fills up in turn and adding a new root
+         *  when the root is split.
+         */
+        function _insertIntoParents(Index storage index, uint[] path, uint[] slots, int value, bytes32 id, uint childId) internal {
+                uint level = index.depth - 1;
+                uint parentId;
+                uint slot;
+                uint rightId;
+                uint i;
+
+                while (level > 0) {
+                    level -= 1;
+                    parentId = path[level];
+                    slot = slots[level];
+
+                    Node storage parent = index.nodes[parentId];
+
+                    for (i = parent.count; i > slot; i--) {
+                        parent.values[i] = parent.values[i - 1];
+                        parent.ids[i] = parent.ids[i - 1];
+                        parent.children[i + 1] = parent.children[i];
+                    }
+                    parent.values[slot] = value;
+                    parent.ids[slot] = id;
+                    parent.children[slot + 1] = childId;
+                    parent.count += 1;
+
+                    if (parent.count < ORDER) {
+                        return;
+                    }
+
+                    // Split the parent.  The middle key moves up to it's
+                    // parent and the keys after it move to the new node.
+                    rightId = _newNode(index, false);
+                    Node storage right = index.nodes[rightId];
+
+                    value = parent.values[ORDER / 2];
+                    id = parent.ids[ORDER / 2];
+                    parent.values[ORDER / 2] = 0;
+                    parent.ids[ORDER / 2] = 0x0;
+
+                    for (i = ORDER / 2 + 1; i < ORDER; i++) {
+                        right.values[i - ORDER / 2 - 1] = parent.values[i];
+                        right.ids[i - ORDER / 2 - 1] = parent.ids[i];
+                        right.children[i - ORDER / 2 - 1] = parent.children[i];
+                        parent.values[i] = 0;
+                        parent.ids[i] = 0x0;
+                        parent.children[i] = 0;
+                    }
+                    right.children[ORDER / 2 - 1] = parent.children[ORDER];
+                    parent.children[ORDER] = 0;
+
+                    right.count = ORDER / 2 - 1;
+                    parent.count = ORDER / 2;
+
+                    childId = rightId;
+                }
+
+                // The root was split.
+                uint rootId = _newNode(index, false);
+                Node storage root = index.nodes[rootId];
+
+                root.values[0] = value;
+                root.ids[0] = id;
+                root.children[0] = index.root;
+                root.children[1] = childId;
+                root.count = 1;
+
+                index.root = rootId;
+                index.depth += 1;
+        }
+
+        /// @dev Remove the entry for the given unique identifier from the index.
+        /// @param index The index that should be removed
+        /// @param id The unique identifier of the data element to remove.
+        function remove(Index storage index, bytes32 id) public {
+            Entry storage entry = index.entries[id];
+
+            if (!entry.exists) {
+                // The id does not exist in the index.
+                return;
+            }
+
+            int value = entry.value;
+            entry.value = 0;
+            entry.exists = false;
+
+            uint[] memory path;
+            uint[] memory slots;
+            (path, slots) = _findLeaf(index, value, id);
+
+            uint leafId = path[index.depth - 1];
+            Node storage leaf = index.nodes[leafId];
+            uint position = _rank(index, leafId, value, id) - 1;
+
+            for (uint i = position; i + 1 < leaf.count; i++) {
+                leaf.values[i] = leaf.values[i + 1];
+                leaf.ids[i] = leaf.ids[i + 1];
+            }
+            leaf.count -= 1;
+            leaf.values[leaf.count] = 0;
+            leaf.ids[leaf.count] = 0x0;
+
+            _rebalance(index, path, slots);
+        }
+
+        /** @dev Refill the nodes along `path` that have fallen below the
+         *  minimum number of keys, from the leaf up, by borrowing a key from
+         *  a sibling or merging with it.  Then drop the root if it is left
+         *  empty.
+         */
+        function _rebalance(Index storage index, uint[] path, uint[] slots) internal {
+                uint level = index.depth - 1;
+                uint parentId;
+                uint slot;
+
+                while (level > 0) {
+                    if (index.nodes[path[level]].count >= MIN_KEYS) {
+                        return;
+                    }
+
+                    parentId = path[level - 1];
+                    slot = slots[level - 1];
+
+                    if (slot > 0 && index.nodes[index.nodes[parentId].children[slot - 1]].count > MIN_KEYS) {
+                        _borrowFromLeft(index, parentId, slot);
+                        return;
+                    }
+                    if (slot < index.nodes[parentId].count && index.nodes[index.nodes[parentId].children[slot + 1]].count > MIN_KEYS) {
+                        _borrowFromRight(index, parentId, slot);
+                        return;
+                    }
+
+                    // Neither sibling has a key to spare.
+                    if (slot > 0) {
+                        _mergeChildren(index, parentId, slot - 1);
+                    }
+                    else {
+                        _mergeChildren(index, parentId, slot);
+                    }
+                    level -= 1;
+                }
+
+                Node storage root = index.nodes[index.root];
+
+                if (root.count > 0) {
+                    return;
+                }
+
+                uint rootId = index.root;
+
+                if (root.isLeaf) {
+                    // The index is empty.
+                    index.root = 0;
+                    index.depth = 0;
+                    index.firstLeaf = 0;
+                    index.lastLeaf = 0;
+                }
+                else {
+                    index.root = root.children[0];
+                    index.depth -= 1;
+                }
+                delete index.nodes[rootId];
+        }
+
+        /// @dev Move the last key of the left sibling of `children[slot]` of the parent to the front of it.
+        function _borrowFromLeft(Index storage index, uint parentId, uint slot) internal {
+                Node storage parent = index.nodes[parentId];
+                Node storage node = index.nodes[parent.children[slot]];
+                Node storage left = index.nodes[parent.children[slot - 1]];
+                uint i;
+
+                for (i = node.count; i > 0; i--) {
+                    node.values[i] = node.values[i - 1];
+                    node.ids[i] = node.ids[i - 1];
+                }
+
+                uint last = left.count - 1;
+
+                if (node.isLeaf) {
+                    node.values[0] = left.values[last];
+                    node.ids[0] = left.ids[last];
+                    parent.values[slot - 1] = node.values[0];
+                    parent.ids[slot - 1] = node.ids[0];
+                }
+                else {
+                    // The separator moves down and the last key of the
+                    // sibling moves up to replace it.
+                    for (i = node.count + 1; i > 0; i--) {
+                        node.children[i] = node.children[i - 1];
+                    }
+                    node.values[0] = parent.values[slot - 1];
+                    node.ids[0] = parent.ids[slot - 1];
+                    node.children[0] = left.children[last + 1];
+                    parent.values[slot - 1] = left.values[last];
+                    parent.ids[slot - 1] = left.ids[last];
+                    left.children[last + 1] = 0;
+                }
+
+                left.values[last] = 0;
+                left.ids[last] = 0x0;
+                left.count -= 1;
+                node.count += 1;
+        }
+
+        /// @dev Move the first key of the right sibling of `children[slot]` of the parent to the end of it.
+        function _borrowFromRight(Index storage index, uint parentId, uint slot) internal {
+                Node storage parent = index.nodes[parentId];
+                Node storage node = index.nodes[parent.children[slot]];
+                Node storage right = index.nodes[parent.children[slot + 1]];
+                uint i;
+
+                if (node.isLeaf) {
+                    node.values[node.count] = right.values[0];
+                    node.ids[node.count] = right.ids[0];
+                }
+                else {
+                    // The separator moves down and the first key of the
+                    // sibling moves up to replace it.
+                    node.values[node.count] = parent.values[slot];
+                    node.ids[node.count] = parent.ids[slot];
+                    node.children[node.count + 1] = right.children[0];
+                    parent.values[slot] = right.values[0];
+                    parent.ids[slot] = right.ids[0];
+
+                    for (i = 0; i < right.count; i++) {
+                        right.children[i] = right.children[i + 1];
+                    }
+                    right.children[right.count] = 0;
+                }
+
+                for (i = 0; i + 1 < right.count; i++) {
+                    right.values[i] = right.values[i + 1];
+                    right.ids[i] = right.ids[i + 1];
+                }
+                right.count -= 1;
+                right.values[right.count] = 0;
+                right.ids[right.count] = 0x0;
+                node.count += 1;
+
+                if (node.isLeaf) {
+                    // The new first key of the sibling separates it.
+                    parent.values[slot] = right.values[0];
+                    parent.ids[slot] = right.ids[0];
+                }
+        }
+
+        /// @dev Merge `children[slot + 1]` of the parent into `children[slot]`, dropping the key between them.
+        function _mergeChildren(Index storage index, uint parentId, uint slot) internal {
+                Node storage parent = index.nodes[parentId];
+                uint leftId = parent.children[slot];
+                uint rightId = parent.children[slot + 1];
+                Node storage left = index.nodes[leftId];
+                Node storage right = index.nodes[rightId];
+                uint count = left.count;
+                uint i;
+
+                if (!left.isLeaf) {
+                    // The separator moves down between the keys of the two
+                    // nodes.
+                    left.values[count] = parent.values[slot];
+                    left.ids[count] = parent.ids[slot];
+                    count += 1;
+
+                    for (i = 0; i <= right.count; i++) {
+                        left.children[count + i] = right.children[i];
+                    }
+                }
+
+                for (i = 0; i < right.count; i++) {
+                    left.values[count + i] = right.values[i];
+                    left.ids[count + i] = right.ids[i];
+                }
+                left.count = uint8(count + right.count);
+
+                if (left.isLeaf) {
+                    left.next = right.next;
+
+                    if (right.next == 0) {
+                        index.lastLeaf = leftId;
+                    }
+                    else {
+                        index.nodes[right.next].previous = leftId;
+                    }
+                }
+
+                delete index.nodes[rightId];
+
+                for (i = slot; i + 1 < parent.count; i++) {
+                    parent.values[i] = parent.values[i + 1];
+                    parent.ids[i] = parent.ids[i + 1];
+                    parent.children[i + 1] = parent.children[i + 2];
+                }
+                parent.count -= 1;
+                parent.values[parent.count] = 0;
+                parent.ids[parent.count] = 0x0;
+                parent.children[parent.count + 1] = 0;
+        }
+
+        /// @dev Remove the entry with the smallest value from the index.
+        /// @param index The index that should be removed from.
+        function popFirst(Index storage index) public returns (bytes32 id, int value) {
+            id = getFirst(index);
+
+            if (id != 0x0) {
+                value = index.entries[id].value;
+                remove(index, id);
+            }
+        }
+
+        /// @dev Remove the entry with the largest value from the index.
+        /// @param index The index that should be removed from.
+        function popLast(Index storage index) public returns (bytes32 id, int value) {
+            id = getLast(index);
+
+            if (id != 0x0) {
+                value = index.entries[id].value;
+                remove(index, id);
+            }
+        }
+
+        /** @dev Remove up to `maxCount` of the entries whose values are
+         *  below ('<', '<=') or above ('>', '>=') the given value, starting
+         *  from the corresponding end of the index.  Returns the number of
+         *  entries removed.
+         */
+        /// @param index The index that should be removed from.
+        /// @param operator One of '<', '<=', '>', '>='.
+        /// @param value The value to compare against.
+        /// @param maxCount The maximum number of entries to remove.
+        function removeRange(Index storage index, bytes2 operator, int value, uint maxCount) public returns (uint removed) {
+            bool fromEnd;
+            bool inclusive;
+
+            if (operator == LTE) {
+                inclusive = true;
+            }
+            else if (operator == GT) {
+                fromEnd = true;
+            }
+            else if (operator == GTE) {
+                fromEnd = true;
+                inclusive = true;
+            }
+            else if (operator != LT) {
+                // Invalid operator.
+                throw;
+            }
+
+            bytes32 id;
+            int entryValue;
+
+            while (removed < maxCount) {
+                if (fromEnd) {
+                    id = getLast(index);
+                }
+                else {
+                    id = getFirst(index);
+                }
+
+                if (id == 0x0) {
+                    // The index is empty.
+                    break;
+                }
+
+                entryValue = index.entries[id].value;
+
+                if (entryValue == value && !inclusive) {
+                    break;
+                }
+                if (fromEnd && entryValue < value) {
+                    break;
+                }
+                if (!fromEnd && entryValue > value) {
+                    break;
+                }
+
+                remove(index, id);
+                removed += 1;
+            }
+        }
+
+        bytes2 constant GT = ">";
+        bytes2 constant LT = "<";
+        bytes2 constant GTE = ">=";
+        bytes2 constant LTE = "<=";
+        bytes2 constant EQ = "==";
+
+        /** @dev Query the index for the edge-most entry that satisfies the
+         *  given query.  For >, >=, and ==, this will be the left-most entry
+         *  that satisfies the comparison.  For < and <= this will be the
+         *  right-most entry that satisfies the comparison.
+         */
+        /// @param index The index that should be queried
+        /** @param operator One of '>', '>=', '<', '<=', '==' to specify what
+         *  type of comparison operator should be used.
+         */
+        function query(Index storage index, bytes2 operator, int value) public returns (bytes32) {
+                bool rightMost;
+                bytes32 boundId;
+
+                if (operator == LT) {
+                    rightMost = true;
+                }
+                else if (operator == LTE) {
+                    rightMost = true;
+                    boundId = MAX_ID;
+                }
+                else if (operator == GT) {
+                    boundId = MAX_ID;
+                }
+                else if (operator != GTE && operator != EQ) {
+                    // Invalid operator.
+                    throw;
+                }
+
+                if (index.root == 0) {
+                    return 0x0;
+                }
+
+                // No entry has an id of 0x0, so searching for the bound
+                // splits the keys at the given value.  The ones with an
+                // equal value fall below the bound when it's id is MAX_ID
+                // and above it otherwise.
+                uint[] memory path;
+                uint[] memory slots;
+                (path, slots) = _findLeaf(index, value, boundId);
+
+                uint leafId = path[index.depth - 1];
+                uint position = _rank(index, leafId, value, boundId);
+                Node storage leaf = index.nodes[leafId];
+
+                if (rightMost) {
+                    if (position > 0) {
+                        return leaf.ids[position - 1];
+                    }
+
+                    leafId = leaf.previous;
+
+                    if (leafId == 0) {
+                        return 0x0;
+                    }
+                    return index.nodes[leafId].ids[index.nodes[leafId].count - 1];
+                }
+
+                if (position == leaf.count) {
+                    // Every key in the leaf falls below the bound so the
+                    // match is the first key of the next leaf.
+                    leafId = leaf.next;
+                    position = 0;
+
+                    if (leafId == 0) {
+                        return 0x0;
+                    }
+                }
+
+                if (operator == EQ && index.nodes[leafId].values[position] != value) {
+                    return 0x0;
+                }
+                return index.nodes[leafId].ids[position];
+        }
+
+        /** @dev Retrieve a page of up to `limit` consecutive entries
+         *  starting at the given entry, along with the id of the entry the
+         *  next page starts at.  Entries past the end of the index are left
+         *  as 0x0.
+         */
+        /// @param index The index that should be scanned.
+        /// @param id The id of the first entry of the page.
+        /// @param reverse Whether to walk towards the previous entries rather than the next entries.
+        /// @param limit The maximum number of entries to return.
+        function scan(Index storage index, bytes32 id, bool reverse, uint limit) internal returns (bytes32[] ids, int[] values, bytes32 cursor) {
+                ids = new bytes32[](limit);
+                values = new int[](limit);
+
+                if (!index.entries[id].exists) {
+                    return;
+                }
+
+                uint leafId;
+                uint position;
+                (leafId, position) = _locate(index, id);
+
+                Node storage leaf = index.nodes[leafId];
+
+                for (uint i = 0; i < limit && leafId != 0; i++) {
+                    ids[i] = leaf.ids[position];
+                    values[i] = leaf.values[position];
+
+                    if (reverse) {
+                        if (position > 0) {
+                            position -= 1;
+                        }
+                        else {
+                            leafId = leaf.previous;
+                            leaf = index.nodes[leafId];
+                            position = leaf.count - 1;
+                        }
+                    }
+                    else {
+                        if (position + 1 < leaf.count) {
+                            position += 1;
+                        }
+                        else {
+                            leafId = leaf.next;
+                            leaf = index.nodes[leafId];
+                            position = 0;
+                        }
+                    }
+                }
+
+                if (leafId != 0) {
+                    cursor = leaf.ids[position];
+                }
+        }
+
+        /// @dev Whether the key (value, id) comes before the key (otherValue, otherId).
+        function _isBefore(int value, bytes32 id, int otherValue, bytes32 otherId) internal returns (bool) {
+                if (value == otherValue) {
+                    return id < otherId;
+                }
+                return value < otherValue;
+        }
+
+        /// @dev Binary search the keys of the node for the number of them that are no greater than (value, id).
+        function _rank(Index storage index, uint nodeId, int value, bytes32 id) internal returns (uint) {
+                Node storage node = index.nodes[nodeId];
+                uint low = 0;
+                uint high = node.count;
+                uint middle;
+
+                while (low < high) {
+                    middle = (low + high) / 2;
+
+                    if (_isBefore(value, id, node.values[middle], node.ids[middle])) {
+                        high = middle;
+                    }
+                    else {
+                        low = middle + 1;
+                    }
+                }
+                return low;
+        }
+
+        /** @dev Descend from the root to the leaf that (value, id) belongs
+         *  in.  Returns the ids of the nodes from the root down to that
+         *  leaf, and the position of the child taken at each internal node.
+         */
+        function _findLeaf(Index storage index, int value, bytes32 id) internal returns (uint[] path, uint[] slots) {
+                path = new uint[](index.depth);
+                slots = new uint[](index.depth);
+
+                uint nodeId = index.root;
+
+                for (uint level = 0; level < index.depth; level++) {
+                    path[level] = nodeId;
+
+                    if (level + 1 < index.depth) {
+                        slots[level] = _rank(index, nodeId, value, id);
+                        nodeId = index.nodes[nodeId].children[slots[level]];
+                    }
+                }
+        }
+
+        /// @dev Retrieve the leaf holding the entry, which must exist, and it's position within the leaf.
+        function _locate(Index storage index, bytes32 id) internal returns (uint leafId, uint position) {
+                int value = index.entries[id].value;
+
+                uint[] memory path;
+                uint[] memory slots;
+                (path, slots) = _findLeaf(index, value, id);
+
+                leafId = path[index.depth - 1];
+                position = _rank(index, leafId, value, id) - 1;
+        }
+
+        function _newNode(Index storage index, bool isLeaf) internal returns (uint) {
+                index.lastNodeId += 1;
+                index.nodes[index.lastNodeId].isLeaf = isLeaf;
+                return index.lastNodeId;
+        }
+}
@@ -1,4 +1,4 @@
-// Grove v0.3
+// Grove v0.4
 
 
 /// @title GroveLib - Library for queriable indexed ordered data.
@@ -7,20 +7,100 @@ library GroveLib {
         /*
          *  Indexes for ordered data
          *
-         *  Address: 0x7c1eb207c07e7ab13cf245585bd03d0fa478d034
+         *  v0.3 address, which does not have the v0.4 node layout:
+         *  0x7c1eb207c07e7ab13cf245585bd03d0fa478d034
          */
         struct Index {
                 bytes32 root;
                 mapping (bytes32 => Node) nodes;
+
+                // The ids of the nodes with the smallest and largest values.
+                bytes32 head;
+                bytes32 tail;
+
+                // Whether each node tracks the number of nodes in it's
+                // subtree, which enables the order statistic queries.
+                bool countNodes;
+
+                // Whether each node tracks the sum of the values in it's
+                // subtree, which enables `sumRange`.
+                bool sumValues;
+
+                // Whether nodes with equal values share a single tree node,
+                // with all but the first of them kept in it's bucket.
+                bool bucketValues;
+
+                // Whether the tree is kept balanced as a red-black tree
+                // rather than an AVL tree, and the number of black nodes on
+                // every path from the root down when it is.
+                bool redBlack;
+                uint8 blackHeight;
+
+                // Progress of a bulk load that is in progress.
+                LoadState load;
+        }
+
+        struct LoadState {
+                // The total number of nodes being loaded, which is 0 when
+                // no bulk load is in progress.
+                uint total;
+                uint loaded;
+                int lastValue;
+
+                // The id of the most recently loaded node for each height.
+                mapping (uint => bytes32) pending;
         }
 
+        /*
+         *  The id of a node is the key it is stored under in `Index.nodes`
+         *  so it is not duplicated on the node itself.  `height` shares the
+         *  final storage slot with any other small fields and doubles as the
+         *  presence flag for the node, as every node in the tree has a
+         *  height of at least 1.  `sum` is only maintained when value sums
+         *  are enabled for the index, but since it needs a full slot it is
+         *  after the packed fields so they are not moved.
+         *
+         *  In red-black indexes `red` holds the color of the node and heights
+         *  are not tracked, so every node has a height of 1.
+         *
+         *  When value buckets are enabled, every node after the first one
+         *  with a given value is kept in a bucket on the tree node for that
+         *  value instead of in the tree.  `bucket` is the id of the first
+         *  node in the bucket of a tree node.  Nodes in a bucket have
+         *  `inBucket` set, a height of 1, and use `left` and `right` to link
+         *  to the previous and next node in the bucket, except that the
+         *  `left` of the first node links to the last node of the bucket.
+         */
         struct Node {
-                bytes32 id;
                 int value;
                 bytes32 parent;
                 bytes32 left;
                 bytes32 right;
-                uint height;
+                uint8 height;
+                uint64 size;
+                bool inBucket;
+                bool red;
+                int sum;
+                bytes32 bucket;
+        }
+
+        /*
+         *  In-order position within an index, see `iterate`.
+         */
+        struct Iterator {
+                bool reverse;
+
+                // The current node and the tree node it belongs to, which
+                // differ when the current node is in a bucket.
+                bytes32 current;
+                bytes32 treeId;
+
+                // The tree nodes still to be visited, with the next one on
+                // top.  Every one of them is on the path from the root to
+                // the current tree node or below it, so the height of the
+                // tree bounds the size of the stack.
+                bytes32[] stack;
+                uint depth;
         }
 
         function max(uint a, uint b) internal returns (uint) {
@@ -30,6 +110,60 @@ library GroveLib {
             return b;
         }
 
+        /*
+         *  Index configuration
+         */
+        /** @dev Enable tracking of subtree sizes, which is required for
+         *  `rank`, `select` and `count`.  Must be enabled while the index is
+         *  still empty.
+         */
+        /// @param index The index to configure.
+        function enableNodeCounts(Index storage index) public {
+            if (index.root != 0x0 || index.load.total != 0) {
+                // Existing nodes would not have their sizes set.
+                throw;
+            }
+            index.countNodes = true;
+        }
+
+        /** @dev Enable tracking of subtree value sums, which is required for
+         *  `sumRange`.  Must be enabled while the index is still empty.
+         */
+        /// @param index The index to configure.
+        function enableValueSums(Index storage index) public {
+            if (index.root != 0x0 || index.load.total != 0) {
+                // Existing nodes would not have their sums set.
+                throw;
+            }
+            index.sumValues = true;
+        }
+
+        /** @dev Enable value buckets, which keep nodes with equal values out
+         *  of the tree so that it's depth only depends on the number of
+         *  distinct values.  Must be enabled while the index is still empty.
+         */
+        /// @param index The index to configure.
+        function enableValueBuckets(Index storage index) public {
+            if (index.root != 0x0 || index.load.total != 0) {
+                throw;
+            }
+            index.bucketValues = true;
+        }
+
+        /** @dev Balance the index as a red-black tree rather than an AVL
+         *  tree.  This does less rebalancing work on inserts and removals in
+         *  exchange for a tree that may be up to twice as deep as the
+         *  number of black nodes on each path.  Must be enabled while the
+         *  index is still empty.
+         */
+        /// @param index The index to configure.
+        function enableRedBlack(Index storage index) public {
+            if (index.root != 0x0 || index.load.total != 0) {
+                throw;
+            }
+            index.redBlack = true;
+        }
+
         /*
          *  Node getters
          */
@@ -37,7 +171,10 @@ library GroveLib {
         /// @param index The index that the node is part of.
         /// @param id The id for the node to be looked up.
         function getNodeId(Index storage index, bytes32 id) constant returns (bytes32) {
-            return index.nodes[id].id;
+            if (index.nodes[id].height == 0) {
+                return 0x0;
+            }
+            return id;
         }
 
         /// @dev Retrieve the value for the node.
@@ -54,6 +191,13 @@ library GroveLib {
             return index.nodes[id].height;
         }
 
+        /// @dev Retrieve whether the node is red, which only a node of a red-black index can be.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function isNodeRed(Index storage index, bytes32 id) constant returns (bool) {
+            return index.nodes[id].red;
+        }
+
         /// @dev Retrieve the parent id of the node.
         /// @param index The index that the node is part of.
         /// @param id The id for the node to be looked up.
@@ -75,158 +219,349 @@ library GroveLib {
             return index.nodes[id].right;
         }
 
-        /// @dev Retrieve the node id of the next node in the tree.
+        /// @dev Retrieve the id of the node with the smallest value, or 0x0 if the index is empty.
+        /// @param index The index to look up.
+        function getFirst(Index storage index) constant returns (bytes32) {
+            return index.head;
+        }
+
+        /// @dev Retrieve the id of the node with the largest value, or 0x0 if the index is empty.
+        /// @param index The index to look up.
+        function getLast(Index storage index) constant returns (bytes32) {
+            return index.tail;
+        }
+
+        /// @dev Retrieve the node id of the previous node in the tree.
         /// @param index The index that the node is part of.
         /// @param id The id for the node to be looked up.
         function getPreviousNode(Index storage index, bytes32 id) constant returns (bytes32) {
             Node storage currentNode = index.nodes[id];
 
-            if (currentNode.id == 0x0) {
+            if (currentNode.height == 0) {
+                // Unknown node, just return 0x0;
+                return 0x0;
+            }
+
+            if (currentNode.inBucket) {
+                // Only the first node of a bucket is not the next node of
+                // the one it links to on the left.
+                if (index.nodes[currentNode.left].right != id) {
+                    return _findTreeNode(index, currentNode.value);
+                }
+                return currentNode.left;
+            }
+
+            bytes32 previousId = _getPreviousTreeNode(index, id);
+
+            if (index.nodes[previousId].bucket != 0x0) {
+                // The last node in the bucket of the previous tree node.
+                return index.nodes[index.nodes[previousId].bucket].left;
+            }
+            return previousId;
+        }
+
+        /// @dev Retrieve the node id of the next node in the tree.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function getNextNode(Index storage index, bytes32 id) constant returns (bytes32) {
+            Node storage currentNode = index.nodes[id];
+
+            if (currentNode.height == 0) {
                 // Unknown node, just return 0x0;
                 return 0x0;
             }
 
-            Node memory child;
+            if (currentNode.inBucket) {
+                if (currentNode.right != 0x0) {
+                    return currentNode.right;
+                }
+                // The last node of the bucket is followed by the tree node
+                // after the one the bucket belongs to.
+                id = _findTreeNode(index, currentNode.value);
+            }
+            else if (currentNode.bucket != 0x0) {
+                return currentNode.bucket;
+            }
+
+            return _getNextTreeNode(index, id);
+        }
+
+        /// @dev Retrieve the id of the tree node before the given tree node, ignoring buckets.
+        /// @param index The index that the node is part of.
+        /// @param id The id of a node in the tree.
+        function _getPreviousTreeNode(Index storage index, bytes32 id) internal returns (bytes32) {
+            Node storage currentNode = index.nodes[id];
+            bytes32 childId;
 
             if (currentNode.left != 0x0) {
                 // Trace left to latest child in left tree.
-                child = index.nodes[currentNode.left];
+                childId = currentNode.left;
 
-                while (child.right != 0) {
-                    child = index.nodes[child.right];
+                while (index.nodes[childId].right != 0x0) {
+                    childId = index.nodes[childId].right;
                 }
-                return child.id;
+                return childId;
             }
 
-            if (currentNode.parent != 0x0) {
-                // Now we trace back up through parent relationships, looking
-                // for a link where the child is the right child of it's
-                // parent.
-                Node storage parent = index.nodes[currentNode.parent];
-                child = currentNode;
+            // Now we trace back up through parent relationships, looking
+            // for a link where the child is the right child of it's
+            // parent.
+            bytes32 parentId = currentNode.parent;
+            childId = id;
 
-                while (true) {
-                    if (parent.right == child.id) {
-                        return parent.id;
-                    }
+            while (parentId != 0x0) {
+                Node storage parent = index.nodes[parentId];
 
-                    if (parent.parent == 0x0) {
-                        break;
-                    }
-                    child = parent;
-                    parent = index.nodes[parent.parent];
+                if (parent.right == childId) {
+                    return parentId;
                 }
+
+                childId = parentId;
+                parentId = parent.parent;
             }
 
             // This is the first node, and has no previous node.
             return 0x0;
         }
 
-        /// @dev Retrieve the node id of the previous node in the tree.
+        /// @dev Retrieve the id of the tree node after the given tree node, ignoring buckets.
         /// @param index The index that the node is part of.
-        /// @param id The id for the node to be looked up.
-        function getNextNode(Index storage index, bytes32 id) constant returns (bytes32) {
+        /// @param id The id of a node in the tree.
+        function _getNextTreeNode(Index storage index, bytes32 id) internal returns (bytes32) {
             Node storage currentNode = index.nodes[id];
-
-            if (currentNode.id == 0x0) {
-                // Unknown node, just return 0x0;
-                return 0x0;
-            }
-
-            Node memory child;
+            bytes32 childId;
 
             if (currentNode.right != 0x0) {
                 // Trace right to earliest child in right tree.
-                child = index.nodes[currentNode.right];
+                childId = currentNode.right;
 
-                while (child.left != 0) {
-                    child = index.nodes[child.left];
+                while (index.nodes[childId].left != 0x0) {
+                    childId = index.nodes[childId].left;
                 }
-                return child.id;
+                return childId;
             }
 
-            if (currentNode.parent != 0x0) {
-                // if the node is the left child of it's parent, then the
-                // parent is the next one.
-                Node storage parent = index.nodes[currentNode.parent];
-                child = currentNode;
+            // if the node is the left child of it's parent, then the parent
+            // is the next one, otherwise keep tracing up the tree.
+            bytes32 parentId = currentNode.parent;
+            childId = id;
 
-                while (true) {
-                    if (parent.left == child.id) {
-                        return parent.id;
-                    }
+            while (parentId != 0x0) {
+                Node storage parent = index.nodes[parentId];
 
-                    if (parent.parent == 0x0) {
-                        break;
-                    }
-                    child = parent;
-                    parent = index.nodes[parent.parent];
+                if (parent.left == childId) {
+                    return parentId;
                 }
 
-                // Now we need to trace all the way up checking to see if any parent is the 
+                childId = parentId;
+                parentId = parent.parent;
             }
 
             // This is the final node.
             return 0x0;
         }
 
+        /// @dev Retrieve the id of the tree node with the given value, which is unique when value buckets are enabled.
+        /// @param index The index to search.
+        /// @param value The value to look for.
+        function _findTreeNode(Index storage index, int value) internal returns (bytes32) {
+            bytes32 currentId = index.root;
+
+            while (currentId != 0x0) {
+                Node storage currentNode = index.nodes[currentId];
+
+                if (currentNode.value == value) {
+                    break;
+                }
+                if (value > currentNode.value) {
+                    currentId = currentNode.right;
+                }
+                else {
+                    currentId = currentNode.left;
+                }
+            }
+            return currentId;
+        }
+
 
         /// @dev Updates or Inserts the id into the index at its appropriate location based on the value provided.
         /// @param index The index that the node is part of.
         /// @param id The unique identifier of the data element the index node will represent.
         /// @param value The value of the data element that represents it's total ordering with respect to other elementes.
         function insert(Index storage index, bytes32 id, int value) public {
-                if (index.nodes[id].id == id) {
+                if (index.load.total != 0) {
+                    // The tree is incomplete while a bulk load is in progress.
+                    throw;
+                }
+
+                if (index.nodes[id].height > 0) {
                     // A node with this id already exists.  If the value is
-                    // the same, then just return early, otherwise, remove it
-                    // and reinsert it.
+                    // the same, then just return early.  If the node still
+                    // belongs between the same neighbors with the new value
+                    // then only the value needs to change, otherwise, remove
+                    // it and reinsert it.
                     if (index.nodes[id].value == value) {
                         return;
                     }
+                    if (_isInOrder(index, id, value)) {
+                        if (index.sumValues) {
+                            _adjustSums(index, id, value - index.nodes[id].value);
+                        }
+                        index.nodes[id].value = value;
+                        return;
+                    }
                     remove(index, id);
                 }
 
-                uint leftHeight;
-                uint rightHeight;
+                bytes32 parentId = 0x0;
+                bytes32 currentId = index.root;
+                bool isRightChild;
+                bool countNodes = index.countNodes;
+                bool sumValues = index.sumValues;
 
-                bytes32 previousNodeId = 0x0;
+                // Find the empty slot the new node belongs in.
+                while (currentId != 0x0) {
+                    Node storage currentNode = index.nodes[currentId];
+                    parentId = currentId;
 
-                if (index.root == 0x0) {
-                    index.root = id;
+                    if (countNodes) {
+                        // The new node will be part of this subtree.
+                        currentNode.size += 1;
+                    }
+                    if (sumValues) {
+                        currentNode.sum += value;
+                    }
+
+                    if (index.bucketValues && value == currentNode.value) {
+                        // The new node joins the bucket of this node.
+                        _addToBucket(index, currentId, id, value);
+                        return;
+                    }
+
+                    // The new node belongs in the right subtree
+                    isRightChild = (value >= currentNode.value);
+
+                    if (isRightChild) {
+                        currentId = currentNode.right;
+                    }
+                    else {
+                        currentId = currentNode.left;
+                    }
                 }
-                Node storage currentNode = index.nodes[index.root];
 
                 // Do insertion
-                while (true) {
-                    if (currentNode.id == 0x0) {
-                        // This is a new unpopulated node.
-                        currentNode.id = id;
-                        currentNode.parent = previousNodeId;
-                        currentNode.value = value;
-                        break;
-                    }
+                Node storage newNode = index.nodes[id];
+                newNode.value = value;
+                newNode.parent = parentId;
 
-                    // Set the previous node id.
-                    previousNodeId = currentNode.id;
+                if (countNodes) {
+                    newNode.size = 1;
+                }
+                if (sumValues) {
+                    newNode.sum = value;
+                }
 
-                    // The new node belongs in the right subtree
-                    if (value >= currentNode.value) {
-                        if (currentNode.right == 0x0) {
-                            currentNode.right = id;
-                        }
-                        currentNode = index.nodes[currentNode.right];
-                        continue;
+                if (parentId == 0x0) {
+                    index.root = id;
+                    index.head = id;
+                    index.tail = id;
+                }
+                else {
+                    if (isRightChild) {
+                        index.nodes[parentId].right = id;
+                    }
+                    else {
+                        index.nodes[parentId].left = id;
                     }
 
-                    // The new node belongs in the left subtree.
-                    if (currentNode.left == 0x0) {
-                        currentNode.left = id;
+                    // Equal values are inserted to the right so the new node
+                    // only becomes the head if it is strictly smaller.
+                    if (value < index.nodes[index.head].value) {
+                        index.head = id;
+                    }
+                    if (value >= index.nodes[index.tail].value) {
+                        index.tail = id;
                     }
-                    currentNode = index.nodes[currentNode.left];
                 }
 
                 // Rebalance the tree
-                _rebalanceTree(index, currentNode.id);
+                if (index.redBlack) {
+                    newNode.height = 1;
+                    newNode.red = true;
+                    _insertFixup(index, id);
+                }
+                else {
+                    _rebalanceTree(index, id);
+                }
+        }
+
+        /// @dev Append a new node to the bucket of the tree node with the same value.
+        /// @param index The index that the node is part of.
+        /// @param treeId The id of the tree node the bucket belongs to.
+        /// @param id The id of the new node.
+        /// @param value The value of the new node.
+        function _addToBucket(Index storage index, bytes32 treeId, bytes32 id, int value) internal {
+                Node storage newNode = index.nodes[id];
+                newNode.value = value;
+                newNode.height = 1;
+                newNode.inBucket = true;
+
+                bytes32 firstId = index.nodes[treeId].bucket;
+
+                if (firstId == 0x0) {
+                    index.nodes[treeId].bucket = id;
+                    newNode.left = id;
+                }
+                else {
+                    bytes32 lastId = index.nodes[firstId].left;
+                    index.nodes[lastId].right = id;
+                    newNode.left = lastId;
+                    index.nodes[firstId].left = id;
+                }
+
+                // Equal values go after the existing nodes.
+                if (value >= index.nodes[index.tail].value) {
+                    index.tail = id;
+                }
+        }
+
+        /// @dev Checks whether the node would keep its position in the tree if its value were changed.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be checked.
+        /// @param value The new value for the node.
+        function _isInOrder(Index storage index, bytes32 id, int value) internal returns (bool) {
+                // With value buckets, a node can neither change the value of
+                // a bucket nor take the value of a neighbor without moving.
+                bool strict = index.bucketValues;
+
+                if (strict && (index.nodes[id].inBucket || index.nodes[id].bucket != 0x0)) {
+                    return false;
+                }
+
+                bytes32 neighborId = getPreviousNode(index, id);
+
+                if (neighborId != 0x0 && (index.nodes[neighborId].value > value || (strict && index.nodes[neighborId].value == value))) {
+                    return false;
+                }
+
+                neighborId = getNextNode(index, id);
+
+                if (neighborId != 0x0 && (index.nodes[neighborId].value < value || (strict && index.nodes[neighborId].value == value))) {
+                    return false;
+                }
+
+                return true;
+        }
+
+        /// @dev Add `delta` to the subtree sums of the node and all of it's ancestors.
+        /// @param index The index that the node is part of.
+        /// @param id The id of the lowest node whose subtree sum changed.
+        /// @param delta The amount the sums change by.
+        function _adjustSums(Index storage index, bytes32 id, int delta) internal {
+                while (id != 0x0) {
+                    index.nodes[id].sum += delta;
+                    id = index.nodes[id].parent;
+                }
         }
 
         /// @dev Checks whether a node for the given unique identifier exists within the given index.
@@ -242,51 +577,105 @@ library GroveLib {
         function remove(Index storage index, bytes32 id) public {
             Node storage replacementNode;
             Node storage parent;
-            Node storage child;
+            bytes32 replacementId;
+            bytes32 childId;
             bytes32 rebalanceOrigin;
+            bool removedRed;
+            bool isLeftChild;
+
+            if (index.load.total != 0) {
+                // The tree is incomplete while a bulk load is in progress.
+                throw;
+            }
 
             Node storage nodeToDelete = index.nodes[id];
 
-            if (nodeToDelete.id != id) {
+            if (nodeToDelete.height == 0) {
                 // The id does not exist in the tree.
                 return;
             }
 
+            // Rotations never change the order of the nodes, so the head and
+            // tail only need updating when they are the node being removed.
+            if (index.head == id) {
+                index.head = getNextNode(index, id);
+            }
+            if (index.tail == id) {
+                index.tail = getPreviousNode(index, id);
+            }
+
+            if (nodeToDelete.inBucket || nodeToDelete.bucket != 0x0) {
+                // The tree itself does not change shape.
+                _removeFromBucket(index, id);
+                return;
+            }
+
             if (nodeToDelete.left != 0x0 || nodeToDelete.right != 0x0) {
                 // This node is not a leaf node and thus must replace itself in
                 // it's tree by either the previous or next node.
                 if (nodeToDelete.left != 0x0) {
                     // This node is guaranteed to not have a right child.
-                    replacementNode = index.nodes[getPreviousNode(index, nodeToDelete.id)];
+                    replacementId = _getPreviousTreeNode(index, id);
                 }
                 else {
                     // This node is guaranteed to not have a left child.
-                    replacementNode = index.nodes[getNextNode(index, nodeToDelete.id)];
+                    replacementId = _getNextTreeNode(index, id);
                 }
-                // The replacementNode is guaranteed to have a parent.
-                parent = index.nodes[replacementNode.parent];
+                replacementNode = index.nodes[replacementId];
 
-                // Keep note of the location that our tree rebalancing should
-                // start at.
-                rebalanceOrigin = replacementNode.id;
+                // The replacement node's position is the one that leaves
+                // the tree, leaving it's child, if any, in it's place.
+                removedRed = replacementNode.red;
 
-                // Join the parent of the replacement node with any subtree of
-                // the replacement node.  We can guarantee that the replacement
-                // node has at most one subtree because of how getNextNode and
-                // getPreviousNode are used.
-                if (parent.left == replacementNode.id) {
-                    parent.left = replacementNode.right;
-                    if (replacementNode.right != 0x0) {
-                        child = index.nodes[replacementNode.right];
-                        child.parent = parent.id;
+                if (replacementNode.parent == id) {
+                    // The replacement node is a direct child of the node
+                    // being deleted so it keeps it's one subtree and the
+                    // rebalancing starts from it's new location.
+                    rebalanceOrigin = replacementId;
+
+                    if (nodeToDelete.left != 0x0) {
+                        childId = replacementNode.left;
+                        isLeftChild = true;
+                    }
+                    else {
+                        childId = replacementNode.right;
                     }
                 }
-                if (parent.right == replacementNode.id) {
-                    parent.right = replacementNode.left;
-                    if (replacementNode.left != 0x0) {
-                        child = index.nodes[replacementNode.left];
-                        child.parent = parent.id;
+                else {
+                    // We can guarantee that the replacement node has at most
+                    // one subtree because of how the previous and next tree
+                    // nodes are found.
+                    if (nodeToDelete.left != 0x0) {
+                        childId = replacementNode.left;
+                    }
+                    else {
+                        childId = replacementNode.right;
+                    }
+
+                    if (index.sumValues || (index.countNodes && index.bucketValues)) {
+                        _moveReplacementNode(index, id, replacementId, childId);
+                    }
+
+                    // Join the parent of the replacement node with it's
+                    // subtree.
+                    parent = index.nodes[replacementNode.parent];
+
+                    if (nodeToDelete.left != 0x0) {
+                        // The previous node is always a right child.
+                        parent.right = childId;
+                    }
+                    else {
+                        // The next node is always a left child.
+                        parent.left = childId;
+                        isLeftChild = true;
                     }
+                    if (childId != 0x0) {
+                        index.nodes[childId].parent = replacementNode.parent;
+                    }
+
+                    // Keep note of the location that our tree rebalancing
+                    // should start at.
+                    rebalanceOrigin = replacementNode.parent;
                 }
 
                 // Now we replace the nodeToDelete with the replacementNode.
@@ -295,45 +684,63 @@ library GroveLib {
                 replacementNode.parent = nodeToDelete.parent;
                 if (nodeToDelete.parent != 0x0) {
                     parent = index.nodes[nodeToDelete.parent];
-                    if (parent.left == nodeToDelete.id) {
-                        parent.left = replacementNode.id;
+                    if (parent.left == id) {
+                        parent.left = replacementId;
                     }
-                    if (parent.right == nodeToDelete.id) {
-                        parent.right = replacementNode.id;
+                    if (parent.right == id) {
+                        parent.right = replacementId;
                     }
                 }
                 else {
                     // If the node we are deleting is the root node update the
                     // index root node pointer.
-                    index.root = replacementNode.id;
+                    index.root = replacementId;
                 }
 
-                replacementNode.left = nodeToDelete.left;
-                if (nodeToDelete.left != 0x0) {
-                    child = index.nodes[nodeToDelete.left];
-                    child.parent = replacementNode.id;
+                if (nodeToDelete.left != replacementId) {
+                    replacementNode.left = nodeToDelete.left;
+                    if (nodeToDelete.left != 0x0) {
+                        index.nodes[nodeToDelete.left].parent = replacementId;
+                    }
                 }
 
-                replacementNode.right = nodeToDelete.right;
-                if (nodeToDelete.right != 0x0) {
-                    child = index.nodes[nodeToDelete.right];
-                    child.parent = replacementNode.id;
+                if (nodeToDelete.right != replacementId) {
+                    replacementNode.right = nodeToDelete.right;
+                    if (nodeToDelete.right != 0x0) {
+                        index.nodes[nodeToDelete.right].parent = replacementId;
+                    }
+                }
+
+                // The replacement node takes over the height, size and sum of
+                // the position it moved into so that rebalancing can tell
+                // when the heights above it stop changing.
+                replacementNode.height = nodeToDelete.height;
+                if (index.countNodes) {
+                    replacementNode.size = nodeToDelete.size;
+                }
+                if (index.sumValues) {
+                    replacementNode.sum = nodeToDelete.sum;
+                }
+                if (index.redBlack) {
+                    replacementNode.red = nodeToDelete.red;
                 }
             }
             else if (nodeToDelete.parent != 0x0) {
                 // The node being deleted is a leaf node so we only erase it's
                 // parent linkage.
                 parent = index.nodes[nodeToDelete.parent];
+                removedRed = nodeToDelete.red;
 
-                if (parent.left == nodeToDelete.id) {
+                if (parent.left == id) {
                     parent.left = 0x0;
+                    isLeftChild = true;
                 }
-                if (parent.right == nodeToDelete.id) {
+                if (parent.right == id) {
                     parent.right = 0x0;
                 }
 
                 // keep note of where the rebalancing should begin.
-                rebalanceOrigin = parent.id;
+                rebalanceOrigin = nodeToDelete.parent;
             }
             else {
                 // This is both a leaf node and the root node, so we need to
@@ -341,203 +748,1036 @@ library GroveLib {
                 index.root = 0x0;
             }
 
-            // Now we zero out all of the fields on the nodeToDelete.
-            nodeToDelete.id = 0x0;
-            nodeToDelete.value = 0;
-            nodeToDelete.parent = 0x0;
-            nodeToDelete.left = 0x0;
-            nodeToDelete.right = 0x0;
-            nodeToDelete.height = 0;
+            _deleteNode(index, id, rebalanceOrigin);
 
-            // Walk back up the tree rebalancing
-            if (rebalanceOrigin != 0x0) {
-                _rebalanceTree(index, rebalanceOrigin);
+            if (index.redBlack && !removedRed) {
+                // The path through the removed position lost a black node.
+                _removeFixup(index, childId, rebalanceOrigin, isLeftChild);
             }
         }
 
-        bytes2 constant GT = ">";
-        bytes2 constant LT = "<";
-        bytes2 constant GTE = ">=";
-        bytes2 constant LTE = "<=";
-        bytes2 constant EQ = "==";
-
-        function _compare(int left, bytes2 operator, int right) internal returns (bool) {
-            if (operator == GT) {
-                return (left > right);
-            }
-            if (operator == LT) {
-                return (left < right);
-            }
-            if (operator == GTE) {
-                return (left >= right);
-            }
-            if (operator == LTE) {
-                return (left <= right);
+        /** @dev Correct the sizes and sums of the nodes between the
+         *  replacement node and the node being deleted, which only lose the
+         *  replacement node and it's bucket.  Every node from the
+         *  rebalancing origin up to the root has the deleted node
+         *  subtracted once it is gone, so this makes up the difference.
+         */
+        /// @param index The index that the nodes are part of.
+        /// @param id The id of the node being deleted.
+        /// @param replacementId The id of the node replacing it.
+        /// @param childId The id of the only child of the replacement node.
+        function _moveReplacementNode(Index storage index, bytes32 id, bytes32 replacementId, bytes32 childId) internal {
+            Node storage replacementNode = index.nodes[replacementId];
+            bool countNodes = index.countNodes;
+            bool sumValues = index.sumValues;
+            uint64 sizeDelta;
+            int sumDelta;
+
+            if (countNodes) {
+                sizeDelta = replacementNode.size - index.nodes[childId].size - 1;
             }
-            if (operator == EQ) {
-                return (left == right);
+            if (sumValues) {
+                sumDelta = index.nodes[id].value - replacementNode.sum + index.nodes[childId].sum;
             }
 
-            // Invalid operator.
-            throw;
-        }
+            bytes32 currentId = replacementNode.parent;
 
-        function _getMaximum(Index storage index, bytes32 id) internal returns (int) {
-                Node storage currentNode = index.nodes[id];
+            while (currentId != id) {
+                Node storage currentNode = index.nodes[currentId];
 
-                while (true) {
-                    if (currentNode.right == 0x0) {
-                        return currentNode.value;
-                    }
-                    currentNode = index.nodes[currentNode.right];
+                if (countNodes) {
+                    currentNode.size -= sizeDelta;
                 }
-        }
-
-        function _getMinimum(Index storage index, bytes32 id) internal returns (int) {
-                Node storage currentNode = index.nodes[id];
-
-                while (true) {
-                    if (currentNode.left == 0x0) {
-                        return currentNode.value;
-                    }
-                    currentNode = index.nodes[currentNode.left];
+                if (sumValues) {
+                    currentNode.sum += sumDelta;
                 }
+                currentId = currentNode.parent;
+            }
         }
 
-
-        /** @dev Query the index for the edge-most node that satisfies the
-         *  given query.  For >, >=, and ==, this will be the left-most node
-         *  that satisfies the comparison.  For < and <= this will be the
-         *  right-most node that satisfies the comparison.
-         */
-        /// @param index The index that should be queried
-        /** @param operator One of '>', '>=', '<', '<=', '==' to specify what
-         *  type of comparison operator should be used.
+        /** @dev Remove a node that is either in a bucket or is the tree node
+         *  of a non-empty bucket.  In the latter case the first node of the
+         *  bucket takes it's place in the tree, so no rebalancing is needed
+         *  in either case.
          */
-        function query(Index storage index, bytes2 operator, int value) public returns (bytes32) {
-                bytes32 rootNodeId = index.root;
-                
-                if (rootNodeId == 0x0) {
-                    // Empty tree.
-                    return 0x0;
-                }
+        /// @param index The index that the node is part of.
+        /// @param id The id of the node to remove.
+        function _removeFromBucket(Index storage index, bytes32 id) internal {
+            Node storage nodeToDelete = index.nodes[id];
+            bool countNodes = index.countNodes;
+            bool sumValues = index.sumValues;
+            int value = nodeToDelete.value;
+            bytes32 currentId;
+            Node storage currentNode;
 
-                Node storage currentNode = index.nodes[rootNodeId];
+            if (nodeToDelete.inBucket) {
+                // Find the tree node of the bucket, removing the node from
+                // the subtrees along the way.
+                currentId = index.root;
 
                 while (true) {
-                    if (_compare(currentNode.value, operator, value)) {
-                        // We have found a match but it might not be the
-                        // *correct* match.
-                        if ((operator == LT) || (operator == LTE)) {
-                            // Need to keep traversing right until this is no
-                            // longer true.
-                            if (currentNode.right == 0x0) {
-                                return currentNode.id;
-                            }
-                            if (_compare(_getMinimum(index, currentNode.right), operator, value)) {
-                                // There are still nodes to the right that
-                                // match.
-                                currentNode = index.nodes[currentNode.right];
-                                continue;
-                            }
-                            return currentNode.id;
-                        }
+                    currentNode = index.nodes[currentId];
 
-                        if ((operator == GT) || (operator == GTE) || (operator == EQ)) {
-                            // Need to keep traversing left until this is no
-                            // longer true.
-                            if (currentNode.left == 0x0) {
-                                return currentNode.id;
-                            }
-                            if (_compare(_getMaximum(index, currentNode.left), operator, value)) {
-                                currentNode = index.nodes[currentNode.left];
-                                continue;
-                            }
-                            return currentNode.id;
-                        }
+                    if (countNodes) {
+                        currentNode.size -= 1;
                     }
-
-                    if ((operator == LT) || (operator == LTE)) {
-                        if (currentNode.left == 0x0) {
-                            // There are no nodes that are less than the value
-                            // so return null.
-                            return 0x0;
-                        }
-                        currentNode = index.nodes[currentNode.left];
-                        continue;
+                    if (sumValues) {
+                        currentNode.sum -= value;
                     }
-
-                    if ((operator == GT) || (operator == GTE)) {
-                        if (currentNode.right == 0x0) {
-                            // There are no nodes that are greater than the value
-                            // so return null.
-                            return 0x0;
-                        }
-                        currentNode = index.nodes[currentNode.right];
-                        continue;
+                    if (currentNode.value == value) {
+                        break;
                     }
-
-                    if (operator == EQ) {
-                        if (currentNode.value < value) {
-                            if (currentNode.right == 0x0) {
-                                return 0x0;
-                            }
-                            currentNode = index.nodes[currentNode.right];
-                            continue;
-                        }
-
-                        if (currentNode.value > value) {
-                            if (currentNode.left == 0x0) {
-                                return 0x0;
-                            }
-                            currentNode = index.nodes[currentNode.left];
-                            continue;
-                        }
+                    if (value > currentNode.value) {
+                        currentId = currentNode.right;
+                    }
+                    else {
+                        currentId = currentNode.left;
                     }
                 }
-        }
-
-        function _rebalanceTree(Index storage index, bytes32 id) internal {
-            // Trace back up rebalancing the tree and updating heights as
-            // needed..
-            Node storage currentNode = index.nodes[id];
 
-            while (true) {
-                int balanceFactor = _getBalanceFactor(index, currentNode.id);
+                bytes32 firstId = currentNode.bucket;
 
-                if (balanceFactor == 2) {
-                    // Right rotation (tree is heavy on the left)
-                    if (_getBalanceFactor(index, currentNode.left) == -1) {
-                        // The subtree is leaning right so it need to be
-                        // rotated left before the current node is rotated
-                        // right.
-                        _rotateLeft(index, currentNode.left);
-                    }
-                    _rotateRight(index, currentNode.id);
+                if (firstId == id) {
+                    currentNode.bucket = nodeToDelete.right;
+                }
+                else {
+                    index.nodes[nodeToDelete.left].right = nodeToDelete.right;
                 }
 
-                if (balanceFactor == -2) {
+                if (nodeToDelete.right != 0x0) {
+                    index.nodes[nodeToDelete.right].left = nodeToDelete.left;
+                }
+                else if (firstId != id) {
+                    // The node was the last one in the bucket.
+                    index.nodes[firstId].left = nodeToDelete.left;
+                }
+            }
+            else {
+                // Promote the first node of the bucket into the tree.
+                bytes32 replacementId = nodeToDelete.bucket;
+                Node storage replacementNode = index.nodes[replacementId];
+                bytes32 nextId = replacementNode.right;
+
+                if (nextId != 0x0) {
+                    index.nodes[nextId].left = replacementNode.left;
+                }
+                replacementNode.bucket = nextId;
+                replacementNode.inBucket = false;
+
+                replacementNode.parent = nodeToDelete.parent;
+                if (nodeToDelete.parent != 0x0) {
+                    Node storage parent = index.nodes[nodeToDelete.parent];
+                    if (parent.left == id) {
+                        parent.left = replacementId;
+                    }
+                    if (parent.right == id) {
+                        parent.right = replacementId;
+                    }
+                }
+                else {
+                    index.root = replacementId;
+                }
+
+                replacementNode.left = nodeToDelete.left;
+                if (nodeToDelete.left != 0x0) {
+                    index.nodes[nodeToDelete.left].parent = replacementId;
+                }
+                replacementNode.right = nodeToDelete.right;
+                if (nodeToDelete.right != 0x0) {
+                    index.nodes[nodeToDelete.right].parent = replacementId;
+                }
+
+                replacementNode.height = nodeToDelete.height;
+                if (countNodes) {
+                    replacementNode.size = nodeToDelete.size;
+                }
+                if (sumValues) {
+                    replacementNode.sum = nodeToDelete.sum;
+                }
+                if (index.redBlack) {
+                    replacementNode.red = nodeToDelete.red;
+                }
+
+                if (countNodes || sumValues) {
+                    currentId = replacementId;
+
+                    while (currentId != 0x0) {
+                        currentNode = index.nodes[currentId];
+
+                        if (countNodes) {
+                            currentNode.size -= 1;
+                        }
+                        if (sumValues) {
+                            currentNode.sum -= value;
+                        }
+                        currentId = currentNode.parent;
+                    }
+                }
+            }
+
+            nodeToDelete.value = 0;
+            nodeToDelete.parent = 0x0;
+            nodeToDelete.left = 0x0;
+            nodeToDelete.right = 0x0;
+            nodeToDelete.height = 0;
+            if (countNodes) {
+                nodeToDelete.size = 0;
+            }
+            nodeToDelete.inBucket = false;
+            if (index.redBlack) {
+                nodeToDelete.red = false;
+            }
+            if (sumValues) {
+                nodeToDelete.sum = 0;
+            }
+            nodeToDelete.bucket = 0x0;
+        }
+
+        /// @dev Remove the node with the smallest value from the index.
+        /// @param index The index that should be removed from.
+        function popFirst(Index storage index) public returns (bytes32 id, int value) {
+            id = index.head;
+
+            if (id != 0x0) {
+                value = index.nodes[id].value;
+                _removeEdge(index, id, false);
+            }
+        }
+
+        /// @dev Remove the node with the largest value from the index.
+        /// @param index The index that should be removed from.
+        function popLast(Index storage index) public returns (bytes32 id, int value) {
+            id = index.tail;
+
+            if (id != 0x0) {
+                value = index.nodes[id].value;
+                _removeEdge(index, id, true);
+            }
+        }
+
+        /** @dev Remove up to `maxCount` of the nodes whose values are below
+         *  ('<', '<=') or above ('>', '>=') the given value.  Nodes are
+         *  removed from the corresponding end of the index so that each
+         *  removal takes the edge path of `popFirst` or `popLast`.  Returns
+         *  the number of nodes removed, which is less than `maxCount` once
+         *  no matching nodes remain.
+         */
+        /// @param index The index that should be removed from.
+        /// @param operator One of '<', '<=', '>', '>='.
+        /// @param value The value to compare against.
+        /// @param maxCount The maximum number of nodes to remove.
+        function removeRange(Index storage index, bytes2 operator, int value, uint maxCount) public returns (uint removed) {
+            bool fromEnd;
+            bool inclusive;
+
+            if (operator == LTE) {
+                inclusive = true;
+            }
+            else if (operator == GT) {
+                fromEnd = true;
+            }
+            else if (operator == GTE) {
+                fromEnd = true;
+                inclusive = true;
+            }
+            else if (operator != LT) {
+                // Invalid operator.
+                throw;
+            }
+
+            bytes32 id;
+            int nodeValue;
+
+            while (removed < maxCount) {
+                if (fromEnd) {
+                    id = index.tail;
+                }
+                else {
+                    id = index.head;
+                }
+
+                if (id == 0x0) {
+                    // The index is empty.
+                    break;
+                }
+
+                nodeValue = index.nodes[id].value;
+
+                if (nodeValue == value && !inclusive) {
+                    break;
+                }
+                if (fromEnd && nodeValue < value) {
+                    break;
+                }
+                if (!fromEnd && nodeValue > value) {
+                    break;
+                }
+
+                _removeEdge(index, id, fromEnd);
+                removed += 1;
+            }
+        }
+
+        /** @dev Remove the first node (`isLast` false) or the last node
+         *  (`isLast` true) of the index.  Unlike `remove` this never needs to
+         *  search for a replacement node since the first node has no left
+         *  child and the last node has no right child.
+         */
+        function _removeEdge(Index storage index, bytes32 id, bool isLast) internal {
+            if (index.load.total != 0) {
+                // The tree is incomplete while a bulk load is in progress.
+                throw;
+            }
+
+            Node storage nodeToDelete = index.nodes[id];
+
+            if (nodeToDelete.inBucket || nodeToDelete.bucket != 0x0) {
+                remove(index, id);
+                return;
+            }
+
+            bytes32 parentId = nodeToDelete.parent;
+            bytes32 childId;
+            bool removedRed = nodeToDelete.red;
+
+            if (isLast) {
+                childId = nodeToDelete.left;
+            }
+            else {
+                childId = nodeToDelete.right;
+            }
+
+            // The child is reused below for the new edge node, but it is
+            // also where red-black rebalancing starts.
+            bytes32 fixupId = childId;
+
+            // Join the only subtree of the node to it's parent.  The first
+            // node is always a left child and the last node is always a
+            // right child.
+            if (childId != 0x0) {
+                index.nodes[childId].parent = parentId;
+            }
+
+            if (parentId == 0x0) {
+                index.root = childId;
+            }
+            else if (isLast) {
+                index.nodes[parentId].right = childId;
+            }
+            else {
+                index.nodes[parentId].left = childId;
+            }
+
+            // A node with a single child in a balanced tree has a leaf as
+            // that child, so the child is the new edge if there is one,
+            // otherwise the parent is.
+            if (childId == 0x0) {
+                childId = parentId;
+            }
+
+            if (index.head == id) {
+                index.head = childId;
+            }
+            if (index.tail == id) {
+                index.tail = childId;
+
+                if (index.nodes[childId].bucket != 0x0) {
+                    // The last node in the bucket of the new last tree node.
+                    index.tail = index.nodes[index.nodes[childId].bucket].left;
+                }
+            }
+
+            _deleteNode(index, id, parentId);
+
+            if (index.redBlack && !removedRed) {
+                // The first node is always a left child and the last node
+                // is always a right child.
+                _removeFixup(index, fixupId, parentId, !isLast);
+            }
+        }
+
+        /// @dev Zero out a node that has been unlinked from the tree and rebalance the tree from where it was.
+        /// @param index The index that the node was part of.
+        /// @param id The id of the removed node.
+        /// @param rebalanceOrigin The id of the lowest node whose subtree changed.
+        function _deleteNode(Index storage index, bytes32 id, bytes32 rebalanceOrigin) internal {
+            Node storage nodeToDelete = index.nodes[id];
+            int value = nodeToDelete.value;
+            bool countNodes = index.countNodes;
+            bool sumValues = index.sumValues;
+
+            // Now we zero out all of the fields on the nodeToDelete.
+            nodeToDelete.value = 0;
+            nodeToDelete.parent = 0x0;
+            nodeToDelete.left = 0x0;
+            nodeToDelete.right = 0x0;
+            nodeToDelete.height = 0;
+            if (countNodes) {
+                nodeToDelete.size = 0;
+            }
+            if (index.redBlack) {
+                nodeToDelete.red = false;
+            }
+            if (sumValues) {
+                nodeToDelete.sum = 0;
+            }
+
+            if (countNodes || sumValues) {
+                // Every subtree from the rebalancing origin up to the root
+                // has lost one node and it's value.
+                bytes32 currentId = rebalanceOrigin;
+
+                while (currentId != 0x0) {
+                    Node storage currentNode = index.nodes[currentId];
+
+                    if (countNodes) {
+                        currentNode.size -= 1;
+                    }
+                    if (sumValues) {
+                        currentNode.sum -= value;
+                    }
+                    currentId = currentNode.parent;
+                }
+            }
+
+            // Walk back up the tree rebalancing.  Red-black indexes are
+            // rebalanced by the caller, which knows the color of the
+            // position that was removed.
+            if (rebalanceOrigin != 0x0 && !index.redBlack) {
+                _rebalanceTree(index, rebalanceOrigin);
+            }
+        }
+
+        /*
+         *  Bulk loading
+         *
+         *  Nodes that are already sorted by value can be linked directly into
+         *  a balanced tree without any rotations.  The node at sorted
+         *  position `i` of `total` is placed by repeatedly splitting the
+         *  range of positions at its midpoint, which fixes the parent,
+         *  height and subtree size of every node up front.  Nodes arrive in
+         *  order, so a node's left child and, if it is a right child, it's
+         *  parent have always been loaded before it.  Both are the most
+         *  recently loaded node of their height.  Subtree sums are filled in
+         *  as each subtree is completed by the last node of it's range.
+         */
+        /** @dev Start loading `total` nodes into an empty index.  The nodes
+         *  are then provided in order of value over one or more calls to
+         *  `bulkLoad`.  The index cannot be modified until the load is
+         *  complete, and queries against it are undefined until then.
+         */
+        /// @param index The index to load into.
+        /// @param total The number of nodes that will be loaded.
+        function startBulkLoad(Index storage index, uint total) public {
+            if (index.root != 0x0 || index.load.total != 0 || total == 0) {
+                throw;
+            }
+            if (index.bucketValues) {
+                // Equal values would each be loaded as a tree node.
+                throw;
+            }
+            if (index.redBlack) {
+                // Loaded nodes are given AVL heights rather than colors.
+                throw;
+            }
+            index.load.total = total;
+            index.load.loaded = 0;
+        }
+
+        /** @dev Load the next chunk of nodes of a bulk load.  The values must
+         *  continue in non-decreasing order from the previous chunk.
+         */
+        /// @param index The index to load into.
+        /// @param ids The unique identifiers of the data elements.
+        /// @param values The values of the data elements.
+        function bulkLoad(Index storage index, bytes32[] ids, int[] values) public {
+            LoadState storage load = index.load;
+
+            if (ids.length != values.length || ids.length > load.total - load.loaded) {
+                throw;
+            }
+
+            for (uint i = 0; i < ids.length; i++) {
+                if (load.loaded > 0 && values[i] < load.lastValue) {
+                    // Values must be sorted.
+                    throw;
+                }
+                _loadNode(index, ids[i], values[i], load.loaded);
+                load.lastValue = values[i];
+                load.loaded += 1;
+            }
+
+            if (load.loaded == load.total) {
+                // Bulk load is complete.
+                for (i = 1; load.pending[i] != 0x0; i++) {
+                    load.pending[i] = 0x0;
+                }
+                load.total = 0;
+                load.loaded = 0;
+                load.lastValue = 0;
+            }
+        }
+
+        /// @dev Retrieve the number of nodes still to be provided for the bulk load in progress.
+        /// @param index The index being loaded.
+        function getBulkLoadRemaining(Index storage index) constant returns (uint) {
+            return index.load.total - index.load.loaded;
+        }
+
+        function _loadNode(Index storage index, bytes32 id, int value, uint position) internal {
+            Node storage node = index.nodes[id];
+
+            if (id == 0x0 || node.height != 0) {
+                // Ids must be unique.
+                throw;
+            }
+
+            // Split the range of positions until the midpoint is this node
+            // which leaves [lo, hi) as the positions of it's subtree.
+            uint lo = 0;
+            uint hi = index.load.total;
+            uint mid;
+            uint parentHeight = 0;
+            bool isRightChild;
+            bytes32 parentId;
+
+            while (true) {
+                mid = (lo + hi) / 2;
+                if (mid == position) {
+                    break;
+                }
+                parentHeight = _heightOf(hi - lo);
+                isRightChild = (position > mid);
+
+                if (isRightChild) {
+                    lo = mid + 1;
+                }
+                else {
+                    hi = mid;
+                }
+            }
+
+            node.value = value;
+            node.height = uint8(_heightOf(hi - lo));
+
+            if (index.countNodes) {
+                node.size = uint64(hi - lo);
+            }
+
+            if (position > lo) {
+                // The left subtree is complete.
+                bytes32 leftId = index.load.pending[_heightOf(position - lo)];
+                node.left = leftId;
+                index.nodes[leftId].parent = id;
+            }
+
+            if (parentHeight == 0) {
+                index.root = id;
+            }
+            else if (isRightChild) {
+                // A left child is linked by it's parent once the parent is
+                // loaded.
+                parentId = index.load.pending[parentHeight];
+                node.parent = parentId;
+                index.nodes[parentId].right = id;
+            }
+
+            if (index.sumValues && position == hi - 1) {
+                // This node has no right subtree so it completes it's own
+                // subtree along with that of every ancestor it is the last
+                // node of, which are those it is reached from by right
+                // children alone.
+                node.sum = value + index.nodes[node.left].sum;
+
+                bytes32 childId = id;
+
+                while (index.nodes[childId].parent != 0x0) {
+                    parentId = index.nodes[childId].parent;
+                    Node storage parent = index.nodes[parentId];
+
+                    if (parent.right != childId) {
+                        break;
+                    }
+                    parent.sum = parent.value + index.nodes[parent.left].sum + index.nodes[childId].sum;
+                    childId = parentId;
+                }
+            }
+
+            if (position == 0) {
+                index.head = id;
+            }
+            if (position == index.load.total - 1) {
+                index.tail = id;
+            }
+
+            index.load.pending[node.height] = id;
+        }
+
+        /// @dev The height of a balanced subtree containing `count` nodes.
+        function _heightOf(uint count) internal returns (uint height) {
+            while (count > 0) {
+                height += 1;
+                count /= 2;
+            }
+        }
+
+        bytes2 constant GT = ">";
+        bytes2 constant LT = "<";
+        bytes2 constant GTE = ">=";
+        bytes2 constant LTE = "<=";
+        bytes2 constant EQ = "==";
+
+        /** @dev Query the index for the edge-most node that satisfies the
+         *  given query.  For >, >=, and ==, this will be the left-most node
+         *  that satisfies the comparison.  For < and <= this will be the
+         *  right-most node that satisfies the comparison.
+         */
+        /// @param index The index that should be queried
+        /** @param operator One of '>', '>=', '<', '<=', '==' to specify what
+         *  type of comparison operator should be used.
+         */
+        function query(Index storage index, bytes2 operator, int value) public returns (bytes32) {
+                bytes32 currentId = index.root;
+
+                if (currentId == 0x0) {
+                    // Empty tree.
+                    return 0x0;
+                }
+
+                // Resolve the operator once up front.  `rightMost` is set for
+                // the operators whose edge-most match is the right-most node
+                // and `inclusive` when equal values satisfy the comparison.
+                bool rightMost;
+                bool inclusive;
+
+                if (operator == LT) {
+                    rightMost = true;
+                }
+                else if (operator == LTE) {
+                    rightMost = true;
+                    inclusive = true;
+                }
+                else if (operator == GTE || operator == EQ) {
+                    inclusive = true;
+                }
+                else if (operator != GT) {
+                    // Invalid operator.
+                    throw;
+                }
+
+                // Single descent from the root.  Every node that satisfies
+                // the comparison is a better candidate than the previous one
+                // since we only ever move towards the edge we are looking
+                // for.
+                bytes32 matchId = 0x0;
+                Node storage currentNode = index.nodes[currentId];
+                int nodeValue;
+                bool isMatch;
+
+                while (currentId != 0x0) {
+                    currentNode = index.nodes[currentId];
+                    nodeValue = currentNode.value;
+
+                    if (rightMost) {
+                        isMatch = (nodeValue < value) || (inclusive && nodeValue == value);
+                    }
+                    else {
+                        isMatch = (nodeValue > value) || (inclusive && nodeValue == value);
+                    }
+
+                    if (isMatch) {
+                        matchId = currentId;
+                    }
+
+                    // Move towards the edge if we matched, otherwise back
+                    // towards the values that can satisfy the comparison.
+                    if (isMatch == rightMost) {
+                        currentId = currentNode.right;
+                    }
+                    else {
+                        currentId = currentNode.left;
+                    }
+                }
+
+                if (operator == EQ && matchId != 0x0 && index.nodes[matchId].value != value) {
+                    // The left-most node that is >= value is not equal to it.
+                    return 0x0;
+                }
+
+                if (rightMost && index.nodes[matchId].bucket != 0x0) {
+                    // The right-most node is the last one in the bucket.
+                    return index.nodes[index.nodes[matchId].bucket].left;
+                }
+
+                return matchId;
+        }
+
+        /*
+         *  Iteration
+         *
+         *  Walking an index with `getNextNode` climbs back up through the
+         *  parents of every node that has no right subtree.  An iterator
+         *  instead keeps the ancestors it still has to visit on a stack in
+         *  memory, so each step reads the next node from the stack and only
+         *  descends into subtrees that have not been visited yet.  A walk
+         *  over the whole index reads each link once.
+         *
+         *      GroveLib.Iterator memory it = GroveLib.iterate(index, id, false);
+         *
+         *      while (it.current != 0x0) {
+         *          ...
+         *          GroveLib.advance(index, it);
+         *      }
+         */
+        /** @dev Create an iterator positioned at the given node.  The
+         *  iterator is exhausted immediately if the node does not exist.
+         */
+        /// @param index The index to iterate over.
+        /// @param id The id of the first node to visit.
+        /// @param reverse Whether to walk towards the previous nodes rather than the next nodes.
+        function iterate(Index storage index, bytes32 id, bool reverse) internal returns (Iterator it) {
+                it.reverse = reverse;
+                it.stack = new bytes32[](_getMaxHeight(index));
+
+                if (index.nodes[id].height == 0) {
+                    return it;
+                }
+
+                it.current = id;
+                it.treeId = id;
+
+                if (index.nodes[id].inBucket) {
+                    it.treeId = _findTreeNode(index, index.nodes[id].value);
+                }
+
+                // Queue up the ancestors that come after the tree node,
+                // which are the ones it is reached from through their left
+                // child, or their right child when in reverse.
+                bytes32 childId = it.treeId;
+                bytes32 parentId = index.nodes[childId].parent;
+
+                while (parentId != 0x0) {
+                    Node storage parent = index.nodes[parentId];
+
+                    if ((reverse && parent.right == childId) || (!reverse && parent.left == childId)) {
+                        it.stack[it.depth] = parentId;
+                        it.depth += 1;
+                    }
+
+                    childId = parentId;
+                    parentId = parent.parent;
+                }
+
+                // They were found closest first, but the closest one must be
+                // on top of the stack.
+                for (uint i = 0; i < it.depth / 2; i++) {
+                    childId = it.stack[i];
+                    it.stack[i] = it.stack[it.depth - 1 - i];
+                    it.stack[it.depth - 1 - i] = childId;
+                }
+
+                if (reverse) {
+                    _pushSubtree(index, it, index.nodes[it.treeId].left);
+                }
+                else {
+                    _pushSubtree(index, it, index.nodes[it.treeId].right);
+                }
+        }
+
+        /** @dev Move the iterator to the next node, or to 0x0 once it has
+         *  passed the last node, and return the id of that node.
+         */
+        /// @param index The index being iterated over.
+        /// @param it The iterator to advance.
+        function advance(Index storage index, Iterator it) internal returns (bytes32) {
+                bytes32 currentId = it.current;
+
+                if (currentId == 0x0) {
+                    return 0x0;
+                }
+
+                Node storage currentNode = index.nodes[currentId];
+
+                // The nodes with the same value come after their tree node,
+                // in the order of their bucket.
+                if (it.reverse) {
+                    if (currentId != it.treeId) {
+                        if (index.nodes[currentNode.left].right != currentId) {
+                            // This is the first node of the bucket.
+                            it.current = it.treeId;
+                        }
+                        else {
+                            it.current = currentNode.left;
+                        }
+                        return it.current;
+                    }
+                }
+                else if (currentId == it.treeId) {
+                    if (currentNode.bucket != 0x0) {
+                        it.current = currentNode.bucket;
+                        return it.current;
+                    }
+                }
+                else if (currentNode.right != 0x0) {
+                    it.current = currentNode.right;
+                    return it.current;
+                }
+
+                if (it.depth == 0) {
+                    // There are no more nodes.
+                    it.current = 0x0;
+                    return 0x0;
+                }
+
+                it.depth -= 1;
+                it.treeId = it.stack[it.depth];
+                it.current = it.treeId;
+
+                Node storage treeNode = index.nodes[it.treeId];
+
+                if (it.reverse) {
+                    _pushSubtree(index, it, treeNode.left);
+
+                    if (treeNode.bucket != 0x0) {
+                        // Start from the last node of the bucket.
+                        it.current = index.nodes[treeNode.bucket].left;
+                    }
+                }
+                else {
+                    _pushSubtree(index, it, treeNode.right);
+                }
+
+                return it.current;
+        }
+
+        /// @dev Push the nodes from the root of the subtree down to it's first node (last node in reverse).
+        function _pushSubtree(Index storage index, Iterator it, bytes32 id) internal {
+                while (id != 0x0) {
+                    it.stack[it.depth] = id;
+                    it.depth += 1;
+
+                    if (it.reverse) {
+                        id = index.nodes[id].right;
+                    }
+                    else {
+                        id = index.nodes[id].left;
+                    }
+                }
+        }
+
+        /** @dev Retrieve a page of up to `limit` consecutive nodes starting
+         *  at the given node, along with the id of the node the next page
+         *  starts at.  Entries past the end of the index are left as 0x0.
+         */
+        /// @param index The index that should be scanned.
+        /// @param id The id of the first node of the page.
+        /// @param reverse Whether to walk towards the previous nodes rather than the next nodes.
+        /// @param limit The maximum number of nodes to return.
+        function scan(Index storage index, bytes32 id, bool reverse, uint limit) internal returns (bytes32[] ids, int[] values, bytes32 cursor) {
+                ids = new bytes32[](limit);
+                values = new int[](limit);
+
+                Iterator memory it = iterate(index, id, reverse);
+
+                for (uint i = 0; i < limit && it.current != 0x0; i++) {
+                    ids[i] = it.current;
+                    values[i] = index.nodes[it.current].value;
+                    advance(index, it);
+                }
+
+                cursor = it.current;
+        }
+
+        /*
+         *  Order statistics
+         *
+         *  These require node counts to be enabled for the index.
+         */
+        /// @dev Retrieve the number of nodes whose value is less than the given value.
+        /// @param index The index that should be queried.
+        /// @param value The value to compare against.
+        function rank(Index storage index, int value) constant returns (uint) {
+            return _countBelow(index, value, false);
+        }
+
+        /** @dev Retrieve the id of the node at position `k` in the index,
+         *  counting from 0 at the node with the smallest value.  Returns 0x0
+         *  if the index has `k` or fewer nodes.
+         */
+        /// @param index The index that should be queried.
+        /// @param k The position of the node.
+        function select(Index storage index, uint k) constant returns (bytes32) {
+            if (!index.countNodes) {
+                throw;
+            }
+
+            bytes32 currentId = index.root;
+
+            while (currentId != 0x0) {
+                Node storage currentNode = index.nodes[currentId];
+                uint leftSize = index.nodes[currentNode.left].size;
+
+                if (k < leftSize) {
+                    currentId = currentNode.left;
+                    continue;
+                }
+                k -= leftSize;
+
+                // The number of nodes at this position, which is more than
+                // one for a tree node with a bucket.
+                uint nodeCount = currentNode.size - leftSize - index.nodes[currentNode.right].size;
+
+                if (k < nodeCount) {
+                    if (k > 0) {
+                        currentId = currentNode.bucket;
+
+                        while (k > 1) {
+                            currentId = index.nodes[currentId].right;
+                            k -= 1;
+                        }
+                    }
+                    return currentId;
+                }
+
+                k -= nodeCount;
+                currentId = currentNode.right;
+            }
+
+            return 0x0;
+        }
+
+        /// @dev Retrieve the number of nodes whose value is between `lo` and `hi` inclusive.
+        /// @param index The index that should be queried.
+        /// @param lo The lower bound of the range.
+        /// @param hi The upper bound of the range.
+        function count(Index storage index, int lo, int hi) constant returns (uint) {
+            if (hi < lo) {
+                return 0;
+            }
+            return _countBelow(index, hi, true) - _countBelow(index, lo, false);
+        }
+
+        function _countBelow(Index storage index, int value, bool inclusive) internal returns (uint) {
+            if (!index.countNodes) {
+                throw;
+            }
+
+            uint total;
+            bytes32 currentId = index.root;
+
+            while (currentId != 0x0) {
+                Node storage currentNode = index.nodes[currentId];
+
+                if (currentNode.value < value || (inclusive && currentNode.value == value)) {
+                    // This node, it's bucket and it's whole left subtree are
+                    // below the value.
+                    total += currentNode.size - index.nodes[currentNode.right].size;
+                    currentId = currentNode.right;
+                }
+                else {
+                    currentId = currentNode.left;
+                }
+            }
+
+            return total;
+        }
+
+        /*
+         *  Range sums
+         *
+         *  These require value sums to be enabled for the index.
+         */
+        /// @dev Retrieve the sum of the values of the nodes whose value is between `lo` and `hi` inclusive.
+        /// @param index The index that should be queried.
+        /// @param lo The lower bound of the range.
+        /// @param hi The upper bound of the range.
+        function sumRange(Index storage index, int lo, int hi) constant returns (int) {
+            if (hi < lo) {
+                return 0;
+            }
+            return _sumBelow(index, hi, true) - _sumBelow(index, lo, false);
+        }
+
+        function _sumBelow(Index storage index, int value, bool inclusive) internal returns (int) {
+            if (!index.sumValues) {
+                throw;
+            }
+
+            int total;
+            bytes32 currentId = index.root;
+
+            while (currentId != 0x0) {
+                Node storage currentNode = index.nodes[currentId];
+
+                if (currentNode.value < value || (inclusive && currentNode.value == value)) {
+                    // This node, it's bucket and it's whole left subtree are
+                    // below the value.
+                    total += currentNode.sum - index.nodes[currentNode.right].sum;
+                    currentId = currentNode.right;
+                }
+                else {
+                    currentId = currentNode.left;
+                }
+            }
+
+            return total;
+        }
+
+        function _rebalanceTree(Index storage index, bytes32 id) internal {
+            // Trace back up rebalancing the tree and updating heights as
+            // needed.  The heights of the nodes above `id` still reflect the
+            // tree from before the insert or removal, so once a subtree ends
+            // up the same height it was before, nothing above it can have
+            // changed and we can stop.
+            bytes32 currentId = id;
+            bytes32 childId;
+            uint8 previousHeight;
+
+            while (currentId != 0x0) {
+                Node storage currentNode = index.nodes[currentId];
+                previousHeight = currentNode.height;
+                int balanceFactor = _getBalanceFactor(index, currentId);
+
+                if (balanceFactor == 2) {
+                    // Right rotation (tree is heavy on the left)
+                    childId = currentNode.left;
+                    if (_getBalanceFactor(index, childId) == -1) {
+                        // The subtree is leaning right so it need to be
+                        // rotated left before the current node is rotated
+                        // right.
+                        _rotateLeft(index, childId);
+                        _updateNodeHeight(index, childId);
+                    }
+                    _rotateRight(index, currentId);
+                }
+                else if (balanceFactor == -2) {
                     // Left rotation (tree is heavy on the right)
-                    if (_getBalanceFactor(index, currentNode.right) == 1) {
+                    childId = currentNode.right;
+                    if (_getBalanceFactor(index, childId) == 1) {
                         // The subtree is leaning left so it need to be
                         // rotated right before the current node is rotated
                         // left.
-                        _rotateRight(index, currentNode.right);
+                        _rotateRight(index, childId);
+                        _updateNodeHeight(index, childId);
                     }
-                    _rotateLeft(index, currentNode.id);
+                    _rotateLeft(index, currentId);
                 }
 
-                if ((-1 <= balanceFactor) && (balanceFactor <= 1)) {
-                    _updateNodeHeight(index, currentNode.id);
+                _updateNodeHeight(index, currentId);
+
+                if (balanceFactor == 2 || balanceFactor == -2) {
+                    // The node that rotated into the place of the current
+                    // node is now it's parent, and is the root of the
+                    // subtree we compare against the previous height.
+                    currentId = currentNode.parent;
+                    _updateNodeHeight(index, currentId);
                 }
 
-                if (currentNode.parent == 0x0) {
-                    // Reached the root which may be new due to tree
-                    // rotation, so set it as the root and then break.
+                if (index.nodes[currentId].height == previousHeight) {
                     break;
                 }
 
-                currentNode = index.nodes[currentNode.parent];
+                currentId = index.nodes[currentId].parent;
             }
         }
 
@@ -549,10 +1789,186 @@ library GroveLib {
 
         function _updateNodeHeight(Index storage index, bytes32 id) internal {
                 Node storage node = index.nodes[id];
+                uint8 height = uint8(max(index.nodes[node.left].height, index.nodes[node.right].height) + 1);
+
+                // Skip the write if the height did not change.
+                if (node.height != height) {
+                    node.height = height;
+                }
+        }
+
+        /// @dev An upper bound on the height of the tree.
+        function _getMaxHeight(Index storage index) internal returns (uint) {
+                if (index.redBlack) {
+                    // No path from the root down has more red nodes than
+                    // black nodes.
+                    return 2 * uint(index.blackHeight);
+                }
+                return index.nodes[index.root].height;
+        }
 
-                node.height = max(index.nodes[node.left].height, index.nodes[node.right].height) + 1;
+        /*
+         *  Red-black rebalancing
+         *
+         *  The root is black, a red node has no red children, and every path
+         *  from the root down passes through the same number of black
+         *  nodes.  Colors are only read from and written to existing nodes,
+         *  as the empty children of a node count as black.
+         */
+        /// @dev Restore the red-black properties after inserting the red node `id`.
+        function _insertFixup(Index storage index, bytes32 id) internal {
+            bytes32 parentId = index.nodes[id].parent;
+            bytes32 uncleId;
+
+            while (index.nodes[parentId].red) {
+                // A red node is never the root so the grandparent exists.
+                Node storage parent = index.nodes[parentId];
+                bytes32 grandparentId = parent.parent;
+                Node storage grandparent = index.nodes[grandparentId];
+
+                if (grandparent.left == parentId) {
+                    uncleId = grandparent.right;
+                }
+                else {
+                    uncleId = grandparent.left;
+                }
+
+                if (index.nodes[uncleId].red) {
+                    // Push the black of the grandparent down to both of it's
+                    // children and continue from the grandparent.
+                    parent.red = false;
+                    index.nodes[uncleId].red = false;
+                    grandparent.red = true;
+
+                    id = grandparentId;
+                    parentId = grandparent.parent;
+                    continue;
+                }
+
+                if (grandparent.left == parentId) {
+                    if (parent.right == id) {
+                        // Turn the inner grandchild into an outer one.
+                        _rotateLeft(index, parentId);
+                        parentId = id;
+                    }
+                    index.nodes[parentId].red = false;
+                    grandparent.red = true;
+                    _rotateRight(index, grandparentId);
+                }
+                else {
+                    if (parent.left == id) {
+                        _rotateRight(index, parentId);
+                        parentId = id;
+                    }
+                    index.nodes[parentId].red = false;
+                    grandparent.red = true;
+                    _rotateLeft(index, grandparentId);
+                }
+                break;
+            }
+
+            if (index.nodes[index.root].red) {
+                // Every path now passes through one more black node.
+                index.nodes[index.root].red = false;
+                index.blackHeight += 1;
+            }
+        }
+
+        /** @dev Restore the red-black properties after a black position was
+         *  removed from the tree.  `id` is the node that took it's place,
+         *  which may be 0x0, `parentId` is it's parent and `isLeftChild`
+         *  says which side of the parent it is on.
+         */
+        function _removeFixup(Index storage index, bytes32 id, bytes32 parentId, bool isLeftChild) internal {
+            bytes32 siblingId;
+
+            // The paths through `id` are one black node short until either
+            // a red node can be made black or the shortage reaches the root.
+            while (parentId != 0x0 && !index.nodes[id].red) {
+                Node storage parent = index.nodes[parentId];
+
+                if (isLeftChild) {
+                    siblingId = parent.right;
+                }
+                else {
+                    siblingId = parent.left;
+                }
+
+                if (index.nodes[siblingId].red) {
+                    // Rotate the red sibling above the parent so that the
+                    // sibling is black.
+                    index.nodes[siblingId].red = false;
+                    parent.red = true;
+
+                    if (isLeftChild) {
+                        _rotateLeft(index, parentId);
+                        siblingId = parent.right;
+                    }
+                    else {
+                        _rotateRight(index, parentId);
+                        siblingId = parent.left;
+                    }
+                }
+
+                Node storage sibling = index.nodes[siblingId];
+
+                if (!index.nodes[sibling.left].red && !index.nodes[sibling.right].red) {
+                    // Take a black node off the paths through the sibling
+                    // too and move the shortage up to the parent.
+                    sibling.red = true;
+
+                    id = parentId;
+                    parentId = parent.parent;
+                    isLeftChild = (index.nodes[parentId].left == id);
+                    continue;
+                }
+
+                if (isLeftChild) {
+                    if (!index.nodes[sibling.right].red) {
+                        // Move the red child of the sibling to the outside.
+                        index.nodes[sibling.left].red = false;
+                        sibling.red = true;
+                        _rotateRight(index, siblingId);
+                        siblingId = parent.right;
+                        sibling = index.nodes[siblingId];
+                    }
+                    sibling.red = parent.red;
+                    parent.red = false;
+                    index.nodes[sibling.right].red = false;
+                    _rotateLeft(index, parentId);
+                }
+                else {
+                    if (!index.nodes[sibling.left].red) {
+                        index.nodes[sibling.right].red = false;
+                        sibling.red = true;
+                        _rotateLeft(index, siblingId);
+                        siblingId = parent.left;
+                        sibling = index.nodes[siblingId];
+                    }
+                    sibling.red = parent.red;
+                    parent.red = false;
+                    index.nodes[sibling.left].red = false;
+                    _rotateRight(index, parentId);
+                }
+                return;
+            }
+
+            if (parentId == 0x0 && !index.nodes[id].red) {
+                // The shortage reached the root, so every path lost a black
+                // node.
+                index.blackHeight -= 1;
+            }
+            if (id != 0x0) {
+                index.nodes[id].red = false;
+            }
         }
 
+        /*
+         *  Rotations relink the nodes and update subtree sizes and sums.  The heights
+         *  of both the original root and the new root change, so the caller
+         *  must update them, original root first, once it has finished any
+         *  double rotation so that no height is written more than once.
+         */
         function _rotateLeft(Index storage index, bytes32 id) internal {
             Node storage originalRoot = index.nodes[id];
 
@@ -564,7 +1980,8 @@ library GroveLib {
 
             // The right child is the new root, so it gets the original
             // `originalRoot.parent` as it's parent.
-            Node storage newRoot = index.nodes[originalRoot.right];
+            bytes32 newRootId = originalRoot.right;
+            Node storage newRoot = index.nodes[newRootId];
             newRoot.parent = originalRoot.parent;
 
             // The original root needs to have it's right child nulled out.
@@ -577,11 +1994,11 @@ library GroveLib {
 
                 // figure out if we're a left or right child and have the
                 // parent point to the new node.
-                if (parent.left == originalRoot.id) {
-                    parent.left = newRoot.id;
+                if (parent.left == id) {
+                    parent.left = newRootId;
                 }
-                if (parent.right == originalRoot.id) {
-                    parent.right = newRoot.id;
+                if (parent.right == id) {
+                    parent.right = newRootId;
                 }
             }
 
@@ -590,21 +2007,31 @@ library GroveLib {
                 // If the new root had a left child, that moves to be the
                 // new right child of the original root node
                 Node storage leftChild = index.nodes[newRoot.left];
-                originalRoot.right = leftChild.id;
-                leftChild.parent = originalRoot.id;
+                originalRoot.right = newRoot.left;
+                leftChild.parent = id;
             }
 
             // Update the newRoot's left node to point at the original node.
-            originalRoot.parent = newRoot.id;
-            newRoot.left = originalRoot.id;
+            originalRoot.parent = newRootId;
+            newRoot.left = id;
+
+            if (index.countNodes) {
+                // The new root takes over the whole subtree, while the
+                // original root loses the new root and gains the new root's
+                // left subtree.
+                uint64 size = originalRoot.size;
+                originalRoot.size = size - newRoot.size + index.nodes[originalRoot.right].size;
+                newRoot.size = size;
+            }
+            if (index.sumValues) {
+                int sum = originalRoot.sum;
+                originalRoot.sum = sum - newRoot.sum + index.nodes[originalRoot.right].sum;
+                newRoot.sum = sum;
+            }
 
             if (newRoot.parent == 0x0) {
-                index.root = newRoot.id;
+                index.root = newRootId;
             }
-
-            // TODO: are both of these updates necessary?
-            _updateNodeHeight(index, originalRoot.id);
-            _updateNodeHeight(index, newRoot.id);
         }
 
         function _rotateRight(Index storage index, bytes32 id) internal {
@@ -618,7 +2045,8 @@ library GroveLib {
 
             // The left child is taking the place of node, so we update it's
             // parent to be the original parent of the node.
-            Node storage newRoot = index.nodes[originalRoot.left];
+            bytes32 newRootId = originalRoot.left;
+            Node storage newRoot = index.nodes[newRootId];
             newRoot.parent = originalRoot.parent;
 
             // Null out the originalRoot.left
@@ -629,30 +2057,40 @@ library GroveLib {
                 // at the newRoot now.
                 Node storage parent = index.nodes[originalRoot.parent];
 
-                if (parent.left == originalRoot.id) {
-                    parent.left = newRoot.id;
+                if (parent.left == id) {
+                    parent.left = newRootId;
                 }
-                if (parent.right == originalRoot.id) {
-                    parent.right = newRoot.id;
+                if (parent.right == id) {
+                    parent.right = newRootId;
                 }
             }
 
             if (newRoot.right != 0x0) {
                 Node storage rightChild = index.nodes[newRoot.right];
                 originalRoot.left = newRoot.right;
-                rightChild.parent = originalRoot.id;
+                rightChild.parent = id;
             }
 
             // Update the new root's right node to point to the original node.
-            originalRoot.parent = newRoot.id;
-            newRoot.right = originalRoot.id;
+            originalRoot.parent = newRootId;
+            newRoot.right = id;
+
+            if (index.countNodes) {
+                // The new root takes over the whole subtree, while the
+                // original root loses the new root and gains the new root's
+                // right subtree.
+                uint64 size = originalRoot.size;
+                originalRoot.size = size - newRoot.size + index.nodes[originalRoot.left].size;
+                newRoot.size = size;
+            }
+            if (index.sumValues) {
+                int sum = originalRoot.sum;
+                originalRoot.sum = sum - newRoot.sum + index.nodes[originalRoot.left].sum;
+                newRoot.sum = sum;
+            }
 
             if (newRoot.parent == 0x0) {
-                index.root = newRoot.id;
+                index.root = newRootId;
             }
-
-            // Recompute heights.
-            _updateNodeHeight(index, originalRoot.id);
-            _updateNodeHeight(index, newRoot.id);
         }
 }
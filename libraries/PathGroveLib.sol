@@ -0,0 +1,754 @@
+// Grove v0.4
+
+
+/// @title PathGroveLib - Library for queriable indexed ordered data without parent pointers.
+/// @author PiperMerriam - <pipermerriam@gmail.com>
+library PathGroveLib {
+        /*
+         *  Indexes for ordered data
+         *
+         *  This is an alternative to `GroveLib` whose nodes do not store a
+         *  pointer to their parent.  Every operation that needs to move up
+         *  the tree first descends from the root and keeps the nodes it
+         *  passed through in memory, so rotations and removals never have
+         *  to rewrite a parent pointer.
+         *
+         *  Finding a node by descending requires a strict ordering of the
+         *  nodes, so nodes are ordered by value and then by id.  Nodes with
+         *  equal values are therefore in order of their ids rather than the
+         *  order they were inserted in.
+         */
+        struct Index {
+                bytes32 root;
+                mapping (bytes32 => Node) nodes;
+
+                // The ids of the nodes with the smallest and largest values.
+                bytes32 head;
+                bytes32 tail;
+        }
+
+        /*
+         *  The id of a node is the key it is stored under in `Index.nodes`.
+         *  `height` doubles as the presence flag for the node, as every node
+         *  in the tree has a height of at least 1.
+         */
+        struct Node {
+                int value;
+                bytes32 left;
+                bytes32 right;
+                uint8 height;
+        }
+
+        function max(uint a, uint b) internal returns (uint) {
+            if (a >= b) {
+                return a;
+            }
+            return b;
+        }
+
+        /*
+         *  Node getters
+         */
+        /// @dev Retrieve the unique identifier for the node.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function getNodeId(Index storage index, bytes32 id) constant returns (bytes32) {
+            if (index.nodes[id].height == 0) {
+                return 0x0;
+            }
+            return id;
+        }
+
+        /// @dev Retrieve the value for the node.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function getNodeValue(Index storage index, bytes32 id) constant returns (int) {
+            return index.nodes[id].value;
+        }
+
+        /// @dev Retrieve the height of the node.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function getNodeHeight(Index storage index, bytes32 id) constant returns (uint) {
+            return index.nodes[id].height;
+        }
+
+        /// @dev Retrieve the parent id of the node, which is found by descending from the root.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function getNodeParent(Index storage index, bytes32 id) constant returns (bytes32) {
+            if (index.nodes[id].height == 0) {
+                return 0x0;
+            }
+
+            bytes32[] memory path;
+            uint length;
+            (path, length) = _findPath(index, id);
+
+            if (length < 2) {
+                // The root node.
+                return 0x0;
+            }
+            return path[length - 2];
+        }
+
+        /// @dev Retrieve the left child id of the node.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function getNodeLeftChild(Index storage index, bytes32 id) constant returns (bytes32) {
+            return index.nodes[id].left;
+        }
+
+        /// @dev Retrieve the right child id of the node.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function getNodeRightChild(Index storage index, bytes32 id) constant returns (bytes32) {
+            return index.nodes[id].right;
+        }
+
+        /// @dev Retrieve the id of the node with the smallest value, or 0x0 if the index is empty.
+        /// @param index The index to look up.
+        function getFirst(Index storage index) constant returns (bytes32) {
+            return index.head;
+        }
+
+        /// @dev Retrieve the id of the node with the largest value, or 0x0 if the index is empty.
+        /// @param index The index to look up.
+        function getLast(Index storage index) constant returns (bytes32) {
+            return index.tail;
+        }
+
+        /// @dev Retrieve the node id of the previous node in the tree.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function getPreviousNode(Index storage index, bytes32 id) constant returns (bytes32) {
+            Node storage currentNode = index.nodes[id];
+
+            if (currentNode.height == 0) {
+                // Unknown node, just return 0x0;
+                return 0x0;
+            }
+
+            bytes32 childId;
+
+            if (currentNode.left != 0x0) {
+                // Trace left to latest child in left tree.
+                childId = currentNode.left;
+
+                while (index.nodes[childId].right != 0x0) {
+                    childId = index.nodes[childId].right;
+                }
+                return childId;
+            }
+
+            // The previous node is the closest ancestor whose right subtree
+            // contains this node.
+            bytes32[] memory path;
+            uint length;
+            (path, length) = _findPath(index, id);
+
+            for (uint i = length - 1; i > 0; i--) {
+                if (index.nodes[path[i - 1]].right == path[i]) {
+                    return path[i - 1];
+                }
+            }
+
+            // This is the first node, and has no previous node.
+            return 0x0;
+        }
+
+        /// @dev Retrieve the node id of the next node in the tree.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be looked up.
+        function getNextNode(Index storage index, bytes32 id) constant returns (bytes32) {
+            Node storage currentNode = index.nodes[id];
+
+            if (currentNode.height == 0) {
+                // Unknown node, just return 0x0;
+                return 0x0;
+            }
+
+            bytes32 childId;
+
+            if (currentNode.right != 0x0) {
+                // Trace right to earliest child in right tree.
+                childId = currentNode.right;
+
+                while (index.nodes[childId].left != 0x0) {
+                    childId = index.nodes[childId].left;
+                }
+                return childId;
+            }
+
+            // The next node is the closest ancestor whose left subtree
+            // contains this node.
+            bytes32[] memory path;
+            uint length;
+            (path, length) = _findPath(index, id);
+
+            for (uint i = length - 1; i > 0; i--) {
+                if (index.nodes[path[i - 1]].left == path[i]) {
+                    return path[i - 1];
+                }
+            }
+
+            // This is the final node.
+            return 0x0;
+        }
+
+        /// @dev Updates or Inserts the id into the index at its appropriate location based on the value provided.
+        /// @param index The index that the node is part of.
+        /// @param id The unique identifier of the data element the index node will represent.
+        /// @param value The value of the data element that represents it's total ordering with respect to other elementes.
+        function insert(Index storage index, bytes32 id, int value) public {
+                if (id == 0x0) {
+                    throw;
+                }
+
+                if (index.nodes[id].height > 0) {
+                    // A node with this id already exists.  If the value is
+                    // the same, then just return early.  If the node still
+                    // belongs between the same neighbors with the new value
+                    // then only the value needs to change, otherwise, remove
+                    // it and reinsert it.
+                    if (index.nodes[id].value == value) {
+                        return;
+                    }
+                    if (_isInOrder(index, id, value)) {
+                        index.nodes[id].value = value;
+                        return;
+                    }
+                    remove(index, id);
+                }
+
+                // The new node adds at most one level to the tree.
+                bytes32[] memory path = new bytes32[](index.nodes[index.root].height + 1);
+                uint length = 0;
+                bytes32 currentId = index.root;
+                bool isLeftChild;
+
+                // Find the empty slot the new node belongs in.
+                while (currentId != 0x0) {
+                    path[length] = currentId;
+                    length += 1;
+
+                    isLeftChild = _isBefore(index, value, id, currentId);
+
+                    if (isLeftChild) {
+                        currentId = index.nodes[currentId].left;
+                    }
+                    else {
+                        currentId = index.nodes[currentId].right;
+                    }
+                }
+
+                // Do insertion
+                Node storage newNode = index.nodes[id];
+                newNode.value = value;
+                newNode.height = 1;
+
+                if (length == 0) {
+                    index.root = id;
+                    index.head = id;
+                    index.tail = id;
+                }
+                else {
+                    if (isLeftChild) {
+                        index.nodes[path[length - 1]].left = id;
+                    }
+                    else {
+                        index.nodes[path[length - 1]].right = id;
+                    }
+
+                    if (_isBefore(index, value, id, index.head)) {
+                        index.head = id;
+                    }
+                    if (!_isBefore(index, value, id, index.tail)) {
+                        index.tail = id;
+                    }
+                }
+
+                // Rebalance the tree
+                _rebalancePath(index, path, length);
+        }
+
+        /// @dev Checks whether the node would keep its position in the tree if its value were changed.
+        /// @param index The index that the node is part of.
+        /// @param id The id for the node to be checked.
+        /// @param value The new value for the node.
+        function _isInOrder(Index storage index, bytes32 id, int value) internal returns (bool) {
+                bytes32 neighborId = getPreviousNode(index, id);
+
+                if (neighborId != 0x0 && _isBefore(index, value, id, neighborId)) {
+                    return false;
+                }
+
+                neighborId = getNextNode(index, id);
+
+                if (neighborId != 0x0 && !_isBefore(index, value, id, neighborId)) {
+                    return false;
+                }
+
+                return true;
+        }
+
+        /// @dev Checks whether a node for the given unique identifier exists within the given index.
+        /// @param index The index that should be searched
+        /// @param id The unique identifier of the data element to check for.
+        function exists(Index storage index, bytes32 id) constant returns (bool) {
+            return (index.nodes[id].height > 0);
+        }
+
+        /// @dev Remove the node for the given unique identifier from the index.
+        /// @param index The index that should be removed
+        /// @param id The unique identifier of the data element to remove.
+        function remove(Index storage index, bytes32 id) public {
+            Node storage nodeToDelete = index.nodes[id];
+
+            if (nodeToDelete.height == 0) {
+                // The id does not exist in the tree.
+                return;
+            }
+
+            if (index.head == id) {
+                index.head = getNextNode(index, id);
+            }
+            if (index.tail == id) {
+                index.tail = getPreviousNode(index, id);
+            }
+
+            bytes32[] memory path;
+            uint length;
+            (path, length) = _findPath(index, id);
+
+            // The position of the node being deleted within the path.
+            uint position = length - 1;
+
+            if (nodeToDelete.left != 0x0 && nodeToDelete.right != 0x0) {
+                // Replace the node with the previous node, which is the
+                // right-most node of it's left subtree, extending the path
+                // down to it.
+                bytes32 replacementId = nodeToDelete.left;
+
+                while (true) {
+                    path[length] = replacementId;
+                    length += 1;
+
+                    if (index.nodes[replacementId].right == 0x0) {
+                        break;
+                    }
+                    replacementId = index.nodes[replacementId].right;
+                }
+
+                Node storage replacementNode = index.nodes[replacementId];
+
+                if (length - 1 > position + 1) {
+                    // Join the parent of the replacement node with the left
+                    // subtree of the replacement node.
+                    index.nodes[path[length - 2]].right = replacementNode.left;
+                    replacementNode.left = nodeToDelete.left;
+                }
+                replacementNode.right = nodeToDelete.right;
+                replacementNode.height = nodeToDelete.height;
+
+                _replaceChild(index, path, position, replacementId);
+                path[position] = replacementId;
+
+                // Rebalance from the old parent of the replacement node.
+                length -= 1;
+            }
+            else {
+                // The node has at most one child, which takes it's place.
+                if (nodeToDelete.left != 0x0) {
+                    _replaceChild(index, path, position, nodeToDelete.left);
+                }
+                else {
+                    _replaceChild(index, path, position, nodeToDelete.right);
+                }
+                length -= 1;
+            }
+
+            // Now we zero out all of the fields on the nodeToDelete.
+            nodeToDelete.value = 0;
+            nodeToDelete.left = 0x0;
+            nodeToDelete.right = 0x0;
+            nodeToDelete.height = 0;
+
+            // Walk back up the tree rebalancing
+            _rebalancePath(index, path, length);
+        }
+
+        /// @dev Point the parent of the node at `path[position]` at a new child, or the root of the index if it has no parent.
+        function _replaceChild(Index storage index, bytes32[] path, uint position, bytes32 newChildId) internal {
+            if (position == 0) {
+                index.root = newChildId;
+                return;
+            }
+
+            Node storage parent = index.nodes[path[position - 1]];
+
+            if (parent.left == path[position]) {
+                parent.left = newChildId;
+            }
+            else {
+                parent.right = newChildId;
+            }
+        }
+
+        /// @dev Remove the node with the smallest value from the index.
+        /// @param index The index that should be removed from.
+        function popFirst(Index storage index) public returns (bytes32 id, int value) {
+            id = index.head;
+
+            if (id != 0x0) {
+                value = index.nodes[id].value;
+                remove(index, id);
+            }
+        }
+
+        /// @dev Remove the node with the largest value from the index.
+        /// @param index The index that should be removed from.
+        function popLast(Index storage index) public returns (bytes32 id, int value) {
+            id = index.tail;
+
+            if (id != 0x0) {
+                value = index.nodes[id].value;
+                remove(index, id);
+            }
+        }
+
+        /** @dev Remove up to `maxCount` of the nodes whose values are below
+         *  ('<', '<=') or above ('>', '>=') the given value, starting from
+         *  the corresponding end of the index.  Returns the number of nodes
+         *  removed.
+         */
+        /// @param index The index that should be removed from.
+        /// @param operator One of '<', '<=', '>', '>='.
+        /// @param value The value to compare against.
+        /// @param maxCount The maximum number of nodes to remove.
+        function removeRange(Index storage index, bytes2 operator, int value, uint maxCount) public returns (uint removed) {
+            bool fromEnd;
+            bool inclusive;
+
+            if (operator == LTE) {
+                inclusive = true;
+            }
+            else if (operator == GT) {
+                fromEnd = true;
+            }
+            else if (operator == GTE) {
+                fromEnd = true;
+                inclusive = true;
+            }
+            else if (operator != LT) {
+                // Invalid operator.
+                throw;
+            }
+
+            bytes32 id;
+            int nodeValue;
+
+            while (removed < maxCount) {
+                if (fromEnd) {
+                    id = index.tail;
+                }
+                else {
+                    id = index.head;
+                }
+
+                if (id == 0x0) {
+                    // The index is empty.
+                    break;
+                }
+
+                nodeValue = index.nodes[id].value;
+
+                if (nodeValue == value && !inclusive) {
+                    break;
+                }
+                if (fromEnd && nodeValue < value) {
+                    break;
+                }
+                if (!fromEnd && nodeValue > value) {
+                    break;
+                }
+
+                remove(index, id);
+                removed += 1;
+            }
+        }
+
+        bytes2 constant GT = ">";
+        bytes2 constant LT = "<";
+        bytes2 constant GTE = ">=";
+        bytes2 constant LTE = "<=";
+        bytes2 constant EQ = "==";
+
+        /** @dev Query the index for the edge-most node that satisfies the
+         *  given query.  For >, >=, and ==, this will be the left-most node
+         *  that satisfies the comparison.  For < and <= this will be the
+         *  right-most node that satisfies the comparison.
+         */
+        /// @param index The index that should be queried
+        /** @param operator One of '>', '>=', '<', '<=', '==' to specify what
+         *  type of comparison operator should be used.
+         */
+        function query(Index storage index, bytes2 operator, int value) public returns (bytes32) {
+                bool rightMost;
+                bool inclusive;
+
+                if (operator == LT) {
+                    rightMost = true;
+                }
+                else if (operator == LTE) {
+                    rightMost = true;
+                    inclusive = true;
+                }
+                else if (operator == GTE || operator == EQ) {
+                    inclusive = true;
+                }
+                else if (operator != GT) {
+                    // Invalid operator.
+                    throw;
+                }
+
+                bytes32 matchId = 0x0;
+                bytes32 currentId = index.root;
+                int nodeValue;
+                bool isMatch;
+
+                while (currentId != 0x0) {
+                    Node storage currentNode = index.nodes[currentId];
+                    nodeValue = currentNode.value;
+
+                    if (rightMost) {
+                        isMatch = (nodeValue < value) || (inclusive && nodeValue == value);
+                    }
+                    else {
+                        isMatch = (nodeValue > value) || (inclusive && nodeValue == value);
+                    }
+
+                    if (isMatch) {
+                        matchId = currentId;
+                    }
+
+                    if (isMatch == rightMost) {
+                        currentId = currentNode.right;
+                    }
+                    else {
+                        currentId = currentNode.left;
+                    }
+                }
+
+                if (operator == EQ && matchId != 0x0 && index.nodes[matchId].value != value) {
+                    // The left-most node that is >= value is not equal to it.
+                    return 0x0;
+                }
+
+                return matchId;
+        }
+
+        /** @dev Retrieve a page of up to `limit` consecutive nodes starting
+         *  at the given node, along with the id of the node the next page
+         *  starts at.  Entries past the end of the index are left as 0x0.
+         */
+        /// @param index The index that should be scanned.
+        /// @param id The id of the first node of the page.
+        /// @param reverse Whether to walk towards the previous nodes rather than the next nodes.
+        /// @param limit The maximum number of nodes to return.
+        function scan(Index storage index, bytes32 id, bool reverse, uint limit) internal returns (bytes32[] ids, int[] values, bytes32 cursor) {
+                ids = new bytes32[](limit);
+                values = new int[](limit);
+
+                if (index.nodes[id].height == 0) {
+                    return;
+                }
+
+                // Keep the ancestors that come after the node, which are the
+                // ones it is reached from through their left child (right
+                // child in reverse), as a stack with the closest on top.
+                bytes32[] memory stack;
+                uint depth;
+                (stack, depth) = _findPath(index, id);
+
+                uint length = depth - 1;
+                depth = 0;
+
+                for (uint i = 0; i < length; i++) {
+                    if ((reverse && index.nodes[stack[i]].right == stack[i + 1]) || (!reverse && index.nodes[stack[i]].left == stack[i + 1])) {
+                        stack[depth] = stack[i];
+                        depth += 1;
+                    }
+                }
+
+                cursor = id;
+
+                // Once the page is full the cursor is left on the node the
+                // next page starts at.
+                for (i = 0; i < limit && cursor != 0x0; i++) {
+                    ids[i] = cursor;
+                    values[i] = index.nodes[cursor].value;
+
+                    // Push the path down to the first node of the subtree
+                    // that comes next.
+                    if (reverse) {
+                        cursor = index.nodes[cursor].left;
+                    }
+                    else {
+                        cursor = index.nodes[cursor].right;
+                    }
+
+                    while (cursor != 0x0) {
+                        stack[depth] = cursor;
+                        depth += 1;
+
+                        if (reverse) {
+                            cursor = index.nodes[cursor].right;
+                        }
+                        else {
+                            cursor = index.nodes[cursor].left;
+                        }
+                    }
+
+                    if (depth > 0) {
+                        depth -= 1;
+                        cursor = stack[depth];
+                    }
+                }
+        }
+
+        /// @dev Whether a node with the given value and id belongs before the other node.
+        function _isBefore(Index storage index, int value, bytes32 id, bytes32 otherId) internal returns (bool) {
+                int otherValue = index.nodes[otherId].value;
+
+                if (value == otherValue) {
+                    return id < otherId;
+                }
+                return value < otherValue;
+        }
+
+        /** @dev Retrieve the ids of the nodes from the root down to the
+         *  node with the given id, which must exist.  The returned array
+         *  has room for one more level below the deepest node of the tree.
+         */
+        /// @param index The index that the node is part of.
+        /// @param id The id of the node to find.
+        function _findPath(Index storage index, bytes32 id) internal returns (bytes32[] path, uint length) {
+                path = new bytes32[](index.nodes[index.root].height + 1);
+
+                int value = index.nodes[id].value;
+                bytes32 currentId = index.root;
+
+                while (currentId != 0x0) {
+                    path[length] = currentId;
+                    length += 1;
+
+                    if (currentId == id) {
+                        break;
+                    }
+
+                    if (_isBefore(index, value, id, currentId)) {
+                        currentId = index.nodes[currentId].left;
+                    }
+                    else {
+                        currentId = index.nodes[currentId].right;
+                    }
+                }
+        }
+
+        /** @dev Rebalance the tree from the node at `path[length - 1]` up to
+         *  the root, where `path` holds the ids of the nodes from the root
+         *  down.  Heights still reflect the tree from before the insert or
+         *  removal, so once a subtree ends up the same height it was before
+         *  nothing above it can have changed and we can stop.
+         */
+        function _rebalancePath(Index storage index, bytes32[] path, uint length) internal {
+            bytes32 currentId;
+            bytes32 childId;
+            bytes32 subtreeId;
+            uint8 previousHeight;
+
+            while (length > 0) {
+                length -= 1;
+                currentId = path[length];
+
+                Node storage currentNode = index.nodes[currentId];
+                previousHeight = currentNode.height;
+                int balanceFactor = _getBalanceFactor(index, currentId);
+                subtreeId = currentId;
+
+                if (balanceFactor == 2) {
+                    // Right rotation (tree is heavy on the left)
+                    childId = currentNode.left;
+                    if (_getBalanceFactor(index, childId) == -1) {
+                        currentNode.left = _rotateLeft(index, childId);
+                        _updateNodeHeight(index, childId);
+                    }
+                    subtreeId = _rotateRight(index, currentId);
+                }
+                else if (balanceFactor == -2) {
+                    // Left rotation (tree is heavy on the right)
+                    childId = currentNode.right;
+                    if (_getBalanceFactor(index, childId) == 1) {
+                        currentNode.right = _rotateRight(index, childId);
+                        _updateNodeHeight(index, childId);
+                    }
+                    subtreeId = _rotateLeft(index, currentId);
+                }
+
+                _updateNodeHeight(index, currentId);
+
+                if (subtreeId != currentId) {
+                    // The subtree has a new root which the parent, which is
+                    // the next node up the path, needs to point at.
+                    _updateNodeHeight(index, subtreeId);
+                    _replaceChild(index, path, length, subtreeId);
+                }
+
+                if (index.nodes[subtreeId].height == previousHeight) {
+                    break;
+                }
+            }
+        }
+
+        function _getBalanceFactor(Index storage index, bytes32 id) internal returns (int) {
+                Node storage node = index.nodes[id];
+
+                return int(index.nodes[node.left].height) - int(index.nodes[node.right].height);
+        }
+
+        function _updateNodeHeight(Index storage index, bytes32 id) internal {
+                Node storage node = index.nodes[id];
+                uint8 height = uint8(max(index.nodes[node.left].height, index.nodes[node.right].height) + 1);
+
+                // Skip the write if the height did not change.
+                if (node.height != height) {
+                    node.height = height;
+                }
+        }
+
+        /*
+         *  Rotations only relink the two nodes involved and return the id of
+         *  the new root of the subtree.  The caller points the parent of the
+         *  subtree at it and updates the heights, original root first.
+         */
+        function _rotateLeft(Index storage index, bytes32 id) internal returns (bytes32 newRootId) {
+            Node storage originalRoot = index.nodes[id];
+
+            newRootId = originalRoot.right;
+            Node storage newRoot = index.nodes[newRootId];
+
+            originalRoot.right = newRoot.left;
+            newRoot.left = id;
+        }
+
+        function _rotateRight(Index storage index, bytes32 id) internal returns (bytes32 newRootId) {
+            Node storage originalRoot = index.nodes[id];
+
+            newRootId = originalRoot.left;
+            Node storage newRoot = index.nodes[newRootId];
+
+            originalRoot.left = newRoot.right;
+            newRoot.right = id;
+        }
+}
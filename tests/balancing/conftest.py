@@ -0,0 +1,89 @@
+import pytest
+
+
+def get_tree_state(grove, index_id, ids):
+    state = {}
+
+    for _id in ids:
+        node_id = grove.computeNodeId(index_id, _id)
+        state[_id] = (
+            grove.getNodeValue(node_id),
+            grove.getNodeParent(node_id),
+            grove.getNodeLeftChild(node_id),
+            grove.getNodeRightChild(node_id),
+            grove.getNodeHeight(node_id),
+        )
+    return state
+
+
+def assert_is_search_tree(grove, index_id, state):
+    for _id, (value, parent, left, right, height) in state.items():
+        if left is not None:
+            assert state[left][1] == _id
+            assert state[left][0] <= value
+        if right is not None:
+            assert state[right][1] == _id
+            assert state[right][0] >= value
+
+    roots = [_id for _id, node in state.items() if node[1] is None]
+    assert roots == [grove.getIndexRoot(index_id)]
+
+
+@pytest.fixture
+def assert_is_avl_tree():
+    def _assert_is_avl_tree(grove, index_id, ids):
+        state = get_tree_state(grove, index_id, ids)
+
+        def get_height(_id):
+            if _id is None:
+                return 0
+            return state[_id][4]
+
+        for _id, (value, parent, left, right, height) in state.items():
+            assert height == max(get_height(left), get_height(right)) + 1
+            assert abs(get_height(left) - get_height(right)) <= 1
+
+        assert_is_search_tree(grove, index_id, state)
+    return _assert_is_avl_tree
+
+
+@pytest.fixture
+def assert_is_red_black_tree():
+    def _assert_is_red_black_tree(grove, index_id, ids):
+        state = get_tree_state(grove, index_id, ids)
+        red = dict(
+            (_id, grove.isNodeRed(grove.computeNodeId(index_id, _id)))
+            for _id in ids
+        )
+
+        def get_black_height(_id):
+            # The empty children of a node count as black.
+            if _id is None:
+                return 1
+
+            left_height = get_black_height(state[_id][2])
+            right_height = get_black_height(state[_id][3])
+
+            # Every path down from a node passes through the same number of
+            # black nodes.
+            assert left_height == right_height
+
+            if red[_id]:
+                return left_height
+            return left_height + 1
+
+        for _id, (value, parent, left, right, height) in state.items():
+            # Heights are not tracked in red-black indexes.
+            assert height == 1
+
+            # A red node has no red children.
+            if red[_id]:
+                assert not (left is not None and red[left])
+                assert not (right is not None and red[right])
+
+        assert_is_search_tree(grove, index_id, state)
+
+        root = grove.getIndexRoot(index_id)
+        assert red[root] is False
+        get_black_height(root)
+    return _assert_is_red_black_tree
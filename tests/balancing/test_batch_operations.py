@@ -0,0 +1,92 @@
+tree_nodes = (
+    ('a', 8),
+    ('b', 6),
+    ('c', 7),
+    ('d', 10),
+    ('e', 2),
+    ('f', 12),
+    ('g', 3),
+    ('h', 15),
+    ('i', 13),
+    ('j', 5),
+    ('k', 19),
+    ('l', 11),
+    ('m', 17),
+    ('n', 0),
+    ('o', 4),
+    ('p', 14),
+    ('q', 18),
+    ('r', 9),
+    ('s', 16),
+    ('t', 1),
+)
+
+
+def get_tree_state(grove, index_id):
+    state = set()
+
+    for _id, _ in tree_nodes:
+        if not grove.exists(index_id, _id):
+            continue
+
+        node_id = grove.computeNodeId(index_id, _id)
+        state.add((
+            _id,
+            grove.getNodeValue(node_id),
+            grove.getNodeParent(node_id),
+            grove.getNodeLeftChild(node_id),
+            grove.getNodeRightChild(node_id),
+            grove.getNodeHeight(node_id),
+        ))
+    return state
+
+
+def test_insert_many_matches_sequential_inserts(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    sequential_id = grove.computeIndexId(deploy_coinbase, "test-sequential")
+    batched_id = grove.computeIndexId(deploy_coinbase, "test-batched")
+
+    for _id, value in tree_nodes:
+        grove.insert("test-sequential", _id, value)
+
+    grove.insertMany(
+        "test-batched",
+        [_id for _id, _ in tree_nodes],
+        [value for _, value in tree_nodes],
+    )
+
+    assert grove.getIndexRoot(batched_id) == grove.getIndexRoot(sequential_id)
+    assert get_tree_state(grove, batched_id) == get_tree_state(grove, sequential_id)
+
+    # Updating existing nodes through a batch.
+    grove.insertMany("test-batched", ['a', 'n'], [20, -1])
+
+    assert grove.getNodeValue(grove.computeNodeId(batched_id, 'a')) == 20
+    assert grove.getNodeValue(grove.computeNodeId(batched_id, 'n')) == -1
+    assert grove.getLast(batched_id) == 'a'
+    assert grove.getFirst(batched_id) == 'n'
+
+
+def test_remove_many_matches_sequential_removals(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    sequential_id = grove.computeIndexId(deploy_coinbase, "test-sequential-removal")
+    batched_id = grove.computeIndexId(deploy_coinbase, "test-batched-removal")
+
+    to_remove = ['c', 'a', 'r', 'n', 'zz']
+
+    for _id, value in tree_nodes:
+        grove.insert("test-sequential-removal", _id, value)
+        grove.insert("test-batched-removal", _id, value)
+
+    for _id in to_remove:
+        grove.remove("test-sequential-removal", _id)
+
+    grove.removeMany("test-batched-removal", to_remove)
+
+    for _id in to_remove:
+        assert grove.exists(batched_id, _id) is False
+
+    assert grove.getIndexRoot(batched_id) == grove.getIndexRoot(sequential_id)
+    assert get_tree_state(grove, batched_id) == get_tree_state(grove, sequential_id)
@@ -0,0 +1,51 @@
+import pytest
+
+
+sorted_nodes = tuple(
+    ("n{0}".format(i), value)
+    for i, value in enumerate((0, 1, 1, 3, 3, 3, 4, 5, 6, 6, 7, 7, 11, 11, 12, 12, 13, 14, 16, 16))
+)
+
+
+@pytest.mark.parametrize('chunk_size', (1, 7, 20))
+def test_bulk_loading(deploy_coinbase, deployed_contracts, assert_is_avl_tree, chunk_size):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-bulk-load-{0}".format(chunk_size)
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    grove.startBulkLoad(index_name, len(sorted_nodes))
+
+    for i in range(0, len(sorted_nodes), chunk_size):
+        assert grove.getBulkLoadRemaining(index_id) == len(sorted_nodes) - i
+
+        chunk = sorted_nodes[i:i + chunk_size]
+        grove.bulkLoad(
+            index_name,
+            [_id for _id, _ in chunk],
+            [value for _, value in chunk],
+        )
+
+    assert grove.getBulkLoadRemaining(index_id) == 0
+
+    ids = tuple(_id for _id, _ in sorted_nodes)
+
+    assert grove.getFirst(index_id) == ids[0]
+    assert grove.getLast(index_id) == ids[-1]
+    assert grove.getIndexRoot(index_id) == ids[len(ids) // 2]
+
+    for _id, next_id in zip(ids, ids[1:]):
+        assert grove.getNextNode(grove.computeNodeId(index_id, _id)) == next_id
+
+    assert_is_avl_tree(grove, index_id, ids)
+
+    assert grove.query(index_id, "==", 6) == 'n8'
+    assert grove.query(index_id, "<", 11) == 'n11'
+
+    # The index behaves normally once the load is complete.
+    grove.insert(index_name, 'extra', 2)
+    grove.remove(index_name, 'n0')
+
+    assert grove.getFirst(index_id) == 'n1'
+    assert grove.getNextNode(grove.computeNodeId(index_id, 'n2')) == 'extra'
+    assert_is_avl_tree(grove, index_id, ids[1:] + ('extra',))
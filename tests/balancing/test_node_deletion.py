@@ -188,3 +188,27 @@ def test_deleting_sets_new_root(deploy_coinbase, deployed_contracts):
     grove.remove(index_name, 'a')
 
     assert grove.getIndexRoot(index_id) == 'b'
+
+
+def test_deleting_clears_node_lookups(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-lookup_clearing"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    grove.insert(index_name, 'a', 2)
+    grove.insert(index_name, 'b', 1)
+
+    node_a_id = grove.computeNodeId(index_id, 'a')
+    assert grove.getNodeIndexId(node_a_id) == index_id
+
+    grove.remove(index_name, 'a')
+
+    assert grove.getNodeIndexId(node_a_id) is None
+    assert grove.getNodeValue(node_a_id) == 0
+
+    # Inserting the node again tracks it again.
+    grove.insert(index_name, 'a', 5)
+
+    assert grove.getNodeIndexId(node_a_id) == index_id
+    assert grove.getNodeValue(node_a_id) == 5
@@ -0,0 +1,90 @@
+import pytest
+
+
+tree_nodes = (
+    ('a', 8),
+    ('b', 6),
+    ('c', 7),
+    ('d', 10),
+    ('e', 2),
+    ('f', 12),
+    ('g', 3),
+    ('h', 15),
+    ('i', 13),
+    ('j', 5),
+    ('k', 19),
+    ('l', 11),
+    ('m', 17),
+    ('n', 0),
+    ('o', 4),
+    ('p', 14),
+    ('q', 18),
+    ('r', 9),
+    ('s', 16),
+    ('t', 1),
+)
+
+ordered_ids = (
+    'n', 't', 'e', 'g', 'o', 'j', 'b', 'c', 'a', 'r', 'd', 'l', 'f', 'i', 'p',
+    'h', 's', 'm', 'q', 'k',
+)
+
+values = dict(tree_nodes)
+
+
+@pytest.mark.parametrize(
+    'index_name,from_end',
+    (
+        ('test-pop-first', False),
+        ('test-pop-last', True),
+    )
+)
+def test_popping_every_node(deploy_coinbase, deployed_contracts, index_name, from_end):
+    grove = deployed_contracts.Grove
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, value in tree_nodes:
+        grove.insert(index_name, _id, value)
+
+    if from_end:
+        pop = grove.popLast
+        expected_ids = ordered_ids[::-1]
+    else:
+        pop = grove.popFirst
+        expected_ids = ordered_ids
+
+    for expected_id in expected_ids:
+        assert tuple(pop.call(index_name)) == (expected_id, values[expected_id])
+
+        pop(index_name)
+
+        assert grove.exists(index_id, expected_id) is False
+
+    assert grove.getIndexRoot(index_id) is None
+    assert grove.getFirst(index_id) is None
+    assert grove.getLast(index_id) is None
+
+
+def test_popping_keeps_tree_balanced(deploy_coinbase, deployed_contracts, assert_is_avl_tree):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-pop-balance"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, value in tree_nodes:
+        grove.insert(index_name, _id, value)
+
+    for _ in range(5):
+        grove.popFirst(index_name)
+        grove.popLast(index_name)
+
+    remaining = ordered_ids[5:-5]
+
+    assert grove.getFirst(index_id) == remaining[0]
+    assert grove.getLast(index_id) == remaining[-1]
+
+    for _id, next_id in zip(remaining, remaining[1:]):
+        node_id = grove.computeNodeId(index_id, _id)
+        assert grove.getNextNode(node_id) == next_id
+
+    assert_is_avl_tree(grove, index_id, remaining)
@@ -0,0 +1,74 @@
+tree_nodes = (
+    ('a', 80),
+    ('b', 60),
+    ('c', 70),
+    ('d', 100),
+    ('e', 20),
+    ('f', 120),
+    ('g', 30),
+    ('h', 150),
+    ('i', 130),
+    ('j', 50),
+    ('k', 190),
+    ('l', 110),
+    ('m', 170),
+    ('n', 0),
+    ('o', 40),
+    ('p', 140),
+    ('q', 180),
+    ('r', 90),
+    ('s', 160),
+    ('t', 10),
+)
+
+
+def get_node_state(grove, node_id):
+    return (
+        grove.getNodeValue(node_id),
+        grove.getNodeParent(node_id),
+        grove.getNodeLeftChild(node_id),
+        grove.getNodeRightChild(node_id),
+        grove.getNodeHeight(node_id),
+    )
+
+
+def test_update_within_neighbors_is_in_place(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-update-in-place"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, value in tree_nodes:
+        grove.insert(index_name, _id, value)
+
+    node_id = grove.computeNodeId(index_id, 'a')
+    _, parent, left, right, height = get_node_state(grove, node_id)
+
+    # 'a' sits between 'c' (70) and 'r' (90).
+    grove.insert(index_name, 'a', 85)
+
+    assert get_node_state(grove, node_id) == (85, parent, left, right, height)
+    assert grove.getPreviousNode(node_id) == 'c'
+    assert grove.getNextNode(node_id) == 'r'
+    assert grove.query(index_id, "==", 85) == 'a'
+    assert grove.query(index_id, "==", 80) is None
+
+
+def test_update_outside_neighbors_moves_node(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-update-move"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, value in tree_nodes:
+        grove.insert(index_name, _id, value)
+
+    node_id = grove.computeNodeId(index_id, 'a')
+
+    grove.insert(index_name, 'a', 195)
+
+    assert grove.getNodeValue(node_id) == 195
+    assert grove.getPreviousNode(node_id) == 'k'
+    assert grove.getNextNode(node_id) is None
+    assert grove.getNextNode(grove.computeNodeId(index_id, 'c')) == 'r'
+    assert grove.query(index_id, "<=", 200) == 'a'
@@ -0,0 +1,58 @@
+ids = tuple("n{0}".format(i) for i in range(40))
+
+
+def test_path_engine_orders_equal_values_by_id(deploy_coinbase, deployed_contracts, get_ordered_ids):
+    grove = deployed_contracts.PathGrove
+    index_name = "test-path-equal-values"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    values = dict((_id, i // 8) for i, _id in enumerate(reversed(ids)))
+
+    for _id in reversed(ids):
+        grove.insert(index_name, _id, values[_id])
+
+    # Nodes with equal values are ordered by their id.
+    expected = sorted(ids, key=lambda _id: (values[_id], _id))
+    assert get_ordered_ids(grove, index_id) == expected
+
+    removed = ids[::3]
+    for _id in removed:
+        grove.remove(index_name, _id)
+
+    assert get_ordered_ids(grove, index_id) == [_id for _id in expected if _id not in removed]
+
+
+def test_path_engine_updates_and_queries(deploy_coinbase, deployed_contracts, get_ordered_ids):
+    grove = deployed_contracts.PathGrove
+    index_name = "test-path-updates"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, value in (('a', 3), ('b', 1), ('c', 4), ('d', 1), ('e', 5), ('f', 9)):
+        grove.insert(index_name, _id, value)
+
+    assert grove.query(index_id, "==", 1) == 'b'
+    assert grove.query(index_id, "<=", 1) == 'd'
+    assert grove.query(index_id, ">", 4) == 'e'
+    assert grove.query(index_id, "<", 1) is None
+
+    # Stays between the same neighbors, so only the value changes.
+    grove.insert(index_name, 'c', 5)
+    # Moves to the other end of the index.
+    grove.insert(index_name, 'b', 10)
+
+    assert get_ordered_ids(grove, index_id) == ['d', 'a', 'c', 'e', 'f', 'b']
+    assert grove.getLast(index_id) == 'b'
+
+    assert tuple(grove.popFirst.call(index_name)) == ('d', 1)
+    grove.popFirst(index_name)
+    assert grove.removeRange.call(index_name, ">=", 9, 10) == 2
+    grove.removeRange(index_name, ">=", 9, 10)
+
+    assert get_ordered_ids(grove, index_id) == ['a', 'c', 'e']
+    assert grove.getFirst(index_id) == 'a'
+    assert grove.getLast(index_id) == 'e'
+
+    ids, values, cursor = grove.scanFrom(index_id, 'e', True, 2)
+    assert tuple(ids) == ('e', 'c')
+    assert tuple(values) == (5, 5)
+    assert cursor == 'a'
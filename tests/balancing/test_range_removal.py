@@ -0,0 +1,75 @@
+import pytest
+
+
+tree_nodes = (
+    ('a', 8),
+    ('b', 6),
+    ('c', 7),
+    ('d', 10),
+    ('e', 2),
+    ('f', 12),
+    ('g', 3),
+    ('h', 15),
+    ('i', 13),
+    ('j', 5),
+    ('k', 19),
+    ('l', 11),
+    ('m', 17),
+    ('n', 0),
+    ('o', 4),
+    ('p', 14),
+    ('q', 18),
+    ('r', 9),
+    ('s', 16),
+    ('t', 1),
+)
+
+
+@pytest.mark.parametrize(
+    'operator,value,removed_ids,first,last',
+    (
+        ("<", 5, ('n', 't', 'e', 'g', 'o'), 'j', 'k'),
+        ("<=", 5, ('n', 't', 'e', 'g', 'o', 'j'), 'b', 'k'),
+        (">", 15, ('s', 'm', 'q', 'k'), 'n', 'h'),
+        (">=", 15, ('h', 's', 'm', 'q', 'k'), 'n', 'p'),
+        ("<", 0, (), 'n', 'k'),
+        (">", 19, (), 'n', 'k'),
+    )
+)
+def test_removing_range(deploy_coinbase, deployed_contracts, operator, value,
+                        removed_ids, first, last):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-remove-range-{0}-{1}".format(operator, value)
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, node_value in tree_nodes:
+        grove.insert(index_name, _id, node_value)
+
+    assert grove.removeRange.call(index_name, operator, value, 100) == len(removed_ids)
+    grove.removeRange(index_name, operator, value, 100)
+
+    for _id, _ in tree_nodes:
+        assert grove.exists(index_id, _id) is (_id not in removed_ids)
+
+    assert grove.getFirst(index_id) == first
+    assert grove.getLast(index_id) == last
+
+
+def test_removing_range_over_several_calls(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-remove-range-bounded"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, node_value in tree_nodes:
+        grove.insert(index_name, _id, node_value)
+
+    for expected in (3, 3, 3, 1, 0):
+        assert grove.removeRange.call(index_name, "<", 10, 3) == expected
+        grove.removeRange(index_name, "<", 10, 3)
+
+    assert grove.getFirst(index_id) == 'd'
+    assert grove.query(index_id, "<", 10) is None
+    assert grove.exists(index_id, 'r') is False
+    assert grove.exists(index_id, 'd') is True
@@ -0,0 +1,57 @@
+import pytest
+
+
+ids = tuple("n{0}".format(i) for i in range(40))
+
+# The contract of each engine and the kind of tree it keeps.
+ENGINES = {
+    'avl': ('Grove', 'avl'),
+    'path': ('PathGrove', 'avl'),
+    'red-black': ('Grove', 'red-black'),
+}
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+@pytest.mark.parametrize(
+    'workload,values',
+    (
+        ('ascending', tuple(range(40))),
+        ('descending', tuple(reversed(range(40)))),
+        ('zigzag', tuple((i * 17) % 40 for i in range(40))),
+        ('duplicates', tuple(i // 8 for i in range(40))),
+    )
+)
+def test_tree_stays_balanced(deploy_coinbase, deployed_contracts, assert_is_avl_tree,
+                             assert_is_red_black_tree, engine, workload, values):
+    contract_name, tree = ENGINES[engine]
+    grove = getattr(deployed_contracts, contract_name)
+    assert_is_balanced = {
+        'avl': assert_is_avl_tree,
+        'red-black': assert_is_red_black_tree,
+    }[tree]
+
+    index_name = "test-{0}-{1}".format(engine, workload)
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    if tree == 'red-black':
+        grove.enableRedBlack(index_name)
+
+    for _id, value in zip(ids, values):
+        grove.insert(index_name, _id, value)
+
+    assert_is_balanced(grove, index_id, ids)
+
+    # Remove every third node which exercises leaf, single child and two
+    # child removals at various depths.
+    removed = ids[::3]
+    for _id in removed:
+        grove.remove(index_name, _id)
+
+    remaining = tuple(_id for _id in ids if _id not in removed)
+
+    for _id in removed:
+        assert grove.exists(index_id, _id) is False
+    for _id in remaining:
+        assert grove.exists(index_id, _id) is True
+
+    assert_is_balanced(grove, index_id, remaining)
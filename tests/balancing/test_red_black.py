@@ -0,0 +1,28 @@
+ids = tuple("n{0}".format(i) for i in range(40))
+
+
+def test_red_black_with_counts_and_buckets(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-rb-counts-buckets"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    grove.enableRedBlack(index_name)
+    grove.enableNodeCounts(index_name)
+    grove.enableValueBuckets(index_name)
+
+    values = dict(zip(ids, ((i * 7) % 10 for i in range(40))))
+
+    for _id in ids:
+        grove.insert(index_name, _id, values[_id])
+
+    for _id in ids[:20]:
+        grove.remove(index_name, _id)
+        del values[_id]
+
+    assert grove.popFirst.call(index_name)[1] == 0
+    assert grove.count(index_id, 0, 9) == 20
+    for value in range(10):
+        expected = len([v for v in values.values() if v < value])
+        assert grove.rank(index_id, value) == expected
+
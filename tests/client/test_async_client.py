@@ -0,0 +1,263 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from grove.aio import (
+    AsyncGroveClient, AsyncRPC, ConnectionPool,
+    GET_INDEX_ROOT, GET_NODES, GET_NEXT_NODE, GET_FIRST, GET_NODE_VALUE,
+    decode_words, encode_bytes32, encode_uint, keccak_256,
+)
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+class FakeGrove(object):
+    """
+    Answers the eth_calls the client makes from an unbalanced binary search
+    tree, counting the round trips.
+    """
+    def __init__(self, index_id, values):
+        self.index_id = index_id
+        self.round_trips = 0
+        self.root = None
+        self.nodes = {}
+        self.node_ids = {}
+
+        for _id, value in values:
+            self.nodes[_id] = {'value': value, 'left': None, 'right': None, 'parent': None}
+            self.node_ids[self.compute_node_id(_id)] = _id
+
+            if self.root is None:
+                self.root = _id
+                continue
+
+            current = self.root
+            while True:
+                side = 'right' if value >= self.nodes[current]['value'] else 'left'
+                if self.nodes[current][side] is None:
+                    self.nodes[current][side] = _id
+                    self.nodes[_id]['parent'] = current
+                    break
+                current = self.nodes[current][side]
+
+        self.ordered = []
+        self._walk(self.root)
+
+    def _walk(self, _id):
+        if _id is not None:
+            self._walk(self.nodes[_id]['left'])
+            self.ordered.append(_id)
+            self._walk(self.nodes[_id]['right'])
+
+    def compute_node_id(self, _id):
+        return keccak_256(self.index_id.ljust(32, b'\x00') + _id.ljust(32, b'\x00')).digest()
+
+    def get_height(self, _id):
+        if _id is None:
+            return 0
+        return 1 + max(self.get_height(self.nodes[_id]['left']), self.get_height(self.nodes[_id]['right']))
+
+    def _bytes32(self, value):
+        return encode_bytes32(value or b'')
+
+    def _int(self, value):
+        return encode_uint(value % 2 ** 256)
+
+    def eth_call(self, data):
+        data = data[2:]
+        selector, words = data[:8], decode_words('0x' + data[8:])
+        arg = bytes.fromhex(words[0]).rstrip(b'\x00') if words else None
+
+        if selector == GET_INDEX_ROOT:
+            return '0x' + self._bytes32(self.root)
+        if selector == GET_FIRST:
+            return '0x' + self._bytes32(self.ordered[0] if self.ordered else None)
+        if selector == GET_NODE_VALUE:
+            return '0x' + self._int(self.nodes[self.node_ids[bytes.fromhex(words[0])]]['value'])
+        if selector == GET_NEXT_NODE:
+            position = self.ordered.index(self.node_ids[bytes.fromhex(words[0])]) + 1
+            return '0x' + self._bytes32(self.ordered[position] if position < len(self.ordered) else None)
+        if selector == GET_NODES:
+            ids = [self.node_ids[bytes.fromhex(word)] for word in words[2:]]
+            columns = [
+                [self._bytes32(self.index_id) for _ in ids],
+                [self._bytes32(_id) for _id in ids],
+                [self._int(self.nodes[_id]['value']) for _id in ids],
+                [self._int(1) for _id in ids],
+                [self._bytes32(self.nodes[_id]['parent']) for _id in ids],
+                [self._bytes32(self.nodes[_id]['left']) for _id in ids],
+                [self._bytes32(self.nodes[_id]['right']) for _id in ids],
+            ]
+            head, tail = [], []
+            for column in columns:
+                head.append(encode_uint(32 * (len(columns) + len(tail))))
+                tail.extend([encode_uint(len(column))] + column)
+            return '0x' + ''.join(head + tail)
+        raise ValueError(selector)
+
+    def respond(self, message):
+        if message['method'] == 'eth_blockNumber':
+            result = '0x1'
+        else:
+            assert message['params'][1] == '0x1'
+            result = self.eth_call(message['params'][0]['data'])
+        return {'jsonrpc': '2.0', 'id': message['id'], 'result': result}
+
+
+class FakeChain(object):
+    """
+    Answers from a different FakeGrove at each block, moving on to the next
+    block every time the block number is asked for.
+    """
+    def __init__(self, groves):
+        self.groves = groves
+        self.block_number = 0
+        self.round_trips = 0
+
+    def respond(self, message):
+        if message['method'] == 'eth_blockNumber':
+            self.block_number += 1
+            result = hex(self.block_number)
+        else:
+            grove = self.groves[int(message['params'][1], 16) - 1]
+            result = grove.eth_call(message['params'][0]['data'])
+        return {'jsonrpc': '2.0', 'id': message['id'], 'result': result}
+
+
+class FakeRPC(AsyncRPC):
+    def __init__(self, grove):
+        super(FakeRPC, self).__init__(None)
+        self.grove = grove
+
+    async def request(self, method, params):
+        self.grove.round_trips += 1
+        await asyncio.sleep(0)
+        return self.grove.respond(self._message(method, params))['result']
+
+    async def batch(self, calls):
+        self.grove.round_trips += 1
+        await asyncio.sleep(0)
+        return [self.grove.respond(self._message(method, params))['result'] for method, params in calls]
+
+
+def test_dump_matches_walk():
+    index_id = b'test-async-dump'
+    values = [(('n{0}'.format(i)).encode('ascii'), value) for i, value in enumerate(random.Random(0).sample(range(-500, 500), 300))]
+
+    grove = FakeGrove(index_id, values)
+    client = AsyncGroveClient(FakeRPC(grove), '0xgrove', chunk_size=50)
+
+    dumped = run(client.dump(index_id))
+    dump_round_trips = grove.round_trips
+
+    assert dumped == [(_id, grove.nodes[_id]['value']) for _id in grove.ordered]
+
+    grove.round_trips = 0
+    assert run(client.walk(index_id)) == dumped
+
+    # One round trip per chunk of each level, plus the block number and the
+    # root, against two per node for the walk.
+    height = grove.get_height(grove.root)
+    assert dump_round_trips <= 2 + height * (300 // 50 + 1)
+    assert grove.round_trips == 2 + 2 * len(values)
+
+
+def test_compute_node_id():
+    client = AsyncGroveClient(None, '0xgrove')
+
+    assert client.computeNodeId(b'', b'') == bytes.fromhex(
+        'ad3228b676f7d3cd4284a5443f17f1962b36e491b30a40b2405849e597ba5fb5'
+    )
+    assert client.computeNodeId('index', 'id') == FakeGrove(b'index', []).compute_node_id(b'id')
+
+
+def test_concurrent_dumps_keep_their_own_block():
+    index_id = b'test-async-blocks'
+    groves = [
+        FakeGrove(index_id, [(b'a', 1), (b'b', 2), (b'c', 3)]),
+        FakeGrove(index_id, [(b'd', 4), (b'a', 5), (b'e', 6), (b'f', 7)]),
+    ]
+    client = AsyncGroveClient(FakeRPC(FakeChain(groves)), '0xgrove', chunk_size=1)
+
+    async def dump_both():
+        return await asyncio.gather(client.dump(index_id), client.dump(index_id))
+
+    first, second = run(dump_both())
+
+    assert first == [(b'a', 1), (b'b', 2), (b'c', 3)]
+    assert second == [(b'd', 4), (b'a', 5), (b'e', 6), (b'f', 7)]
+
+
+def test_connection_pool_batches():
+    grove = FakeGrove(b'test-async-pool', [(b'a', 2), (b'b', 1), (b'c', 3)])
+
+    async def handle(reader, writer):
+        # Answer requests on the connection until the client closes it,
+        # alternating between sized and chunked responses.
+        chunked = False
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line == b'\r\n':
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            body = json.loads((await reader.readexactly(int(headers['content-length']))).decode('utf-8'))
+            if isinstance(body, list):
+                response = [grove.respond(message) for message in reversed(body)]
+            else:
+                response = grove.respond(body)
+            payload = json.dumps(response).encode('utf-8')
+
+            if chunked:
+                writer.write(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n')
+                writer.write('{0:x}\r\n'.format(len(payload)).encode('ascii') + payload + b'\r\n0\r\n\r\n')
+            else:
+                writer.write('HTTP/1.1 200 OK\r\nContent-Length: {0}\r\n\r\n'.format(len(payload)).encode('ascii') + payload)
+            await writer.drain()
+            chunked = not chunked
+        writer.close()
+
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(handle, '127.0.0.1', 0))
+    port = server.sockets[0].getsockname()[1]
+
+    # The pool is created outside of the loop it is used on, and the dump
+    # has more chunks at a time than the pool has connections.
+    pool = ConnectionPool('http://127.0.0.1:{0}/'.format(port), size=1)
+    client = AsyncGroveClient(AsyncRPC(pool), '0xgrove', chunk_size=1)
+
+    async def main():
+        try:
+            dumped = await client.dump(b'test-async-pool')
+            batched = await client.rpc.batch([
+                ('eth_blockNumber', []),
+                ('eth_call', client._call_params(GET_INDEX_ROOT + encode_bytes32(b'test-async-pool'), '0x1')),
+            ])
+            return dumped, batched, pool.requests
+        finally:
+            pool.close()
+            # Let the handlers see the connections close.
+            await asyncio.sleep(0.01)
+            server.close()
+
+    dumped, batched, requests = loop.run_until_complete(main())
+    assert dumped == [(b'b', 1), (b'a', 2), (b'c', 3)]
+    assert batched == ['0x1', '0x' + encode_bytes32(b'a')]
+    # The block number, the root, one getNodes call for each of the three
+    # nodes, then the batch.
+    assert requests == 6
+
+
+def test_connection_pool_requires_http():
+    with pytest.raises(ValueError):
+        ConnectionPool('https://127.0.0.1:8545/')
@@ -0,0 +1,208 @@
+import threading
+
+from grove import GroveClient, JSONRPCSource
+
+
+class FakeChain(object):
+    def __init__(self):
+        self.block_number = 1
+
+    def get_block_number(self):
+        return self.block_number
+
+
+class SlowContract(object):
+    """
+    Counts the calls made to it, and holds `getIndexRoot` until released so
+    that concurrent requests overlap.
+    """
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def getIndexRoot(self, indexId):
+        self.calls.append(('getIndexRoot', indexId))
+        self.release.wait()
+        return 'root'
+
+    def getNodes(self, nodeIds):
+        self.calls.append(('getNodes', tuple(nodeIds)))
+        count = len(nodeIds)
+        return (
+            ['index'] * count,
+            [node_id[-1] for node_id in nodeIds],
+            list(range(count)),
+            [1] * count,
+            [''] * count,
+            [''] * count,
+            [''] * count,
+        )
+
+
+def test_cache_invalidated_by_new_block():
+    chain = FakeChain()
+    contract = SlowContract()
+    contract.release.set()
+    client = GroveClient(contract, chain, block_refresh=0)
+
+    assert client.getNodeValue('node-a') == 0
+    assert client.getNodeHeight('node-a') == 1
+    assert client.getNodeParent('node-a') is None
+    assert len(contract.calls) == 1
+
+    chain.block_number += 1
+
+    assert client.getNodeValue('node-a') == 0
+    assert len(contract.calls) == 2
+    assert client.stats['hits'] == 2
+    assert client.stats['misses'] == 2
+    assert client.stats['invalidations'] == 1
+
+
+def test_get_nodes_only_fetches_missing():
+    contract = SlowContract()
+    client = GroveClient(contract, FakeChain(), block_refresh=0)
+
+    client.get_node('node-a')
+    records = client.get_nodes(['node-a', 'node-b', 'node-c'])
+
+    assert [record[1] for record in records] == ['a', 'b', 'c']
+    assert sorted(contract.calls[1][1]) == ['node-b', 'node-c']
+
+
+def test_get_nodes_larger_than_cache():
+    contract = SlowContract()
+    client = GroveClient(contract, FakeChain(), max_size=2, block_refresh=0)
+
+    client.get_node('node-a')
+    client.get_node('node-b')
+
+    node_ids = ['node-a', 'node-b', 'node-c', 'node-d', 'node-e']
+    records = client.get_nodes(node_ids)
+
+    # The cached records are used even though storing the fetched ones
+    # evicts them.
+    assert [record[1] for record in records] == ['a', 'b', 'c', 'd', 'e']
+    assert len(contract.calls) == 3
+    assert sorted(contract.calls[2][1]) == ['node-c', 'node-d', 'node-e']
+    assert client.stats['hits'] == 2
+    assert client.stats['misses'] == 5
+    assert client.stats['size'] == 2
+
+
+def test_get_nodes_coalesced_with_get_node():
+    contract = SlowContract()
+    client = GroveClient(contract, FakeChain(), block_refresh=0)
+
+    started = threading.Event()
+    release = threading.Event()
+    fetch_nodes = client._fetch_nodes
+
+    def slow_fetch_nodes(node_ids):
+        started.set()
+        release.wait()
+        return fetch_nodes(node_ids)
+    client._fetch_nodes = slow_fetch_nodes
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(client.get_node('node-a')))
+    thread.start()
+    started.wait()
+
+    batch_thread = threading.Thread(target=lambda: results.append(client.get_nodes(['node-a', 'node-b'])))
+    batch_thread.start()
+
+    while client.stats['coalesced'] < 1:
+        pass
+    release.set()
+
+    thread.join()
+    batch_thread.join()
+
+    # `a` was only fetched by `get_node`.
+    assert sorted(call[1] for call in contract.calls) == [('node-a',), ('node-b',)]
+    assert client.stats['coalesced'] == 1
+
+
+def test_results_from_a_newer_block_are_not_cached():
+    chain = FakeChain()
+    contract = SlowContract()
+    client = GroveClient(contract, chain, block_refresh=60, clock=lambda: 0)
+
+    client.get_node('node-a')
+
+    # A block lands within `block_refresh` of the last check, so the client
+    # still thinks it is at the first block when it fetches `b` from the
+    # latest block.
+    chain.block_number += 1
+    client.get_node('node-b')
+
+    # Neither result was kept, and both are cached once fetched again.
+    for _ in range(2):
+        client.get_node('node-a')
+        client.get_node('node-b')
+
+    assert [call[1] for call in contract.calls] == [('node-a',), ('node-b',), ('node-a',), ('node-b',)]
+    assert client.stats['block_number'] == 2
+    assert client.stats['invalidations'] == 1
+
+
+def test_lru_eviction():
+    contract = SlowContract()
+    client = GroveClient(contract, FakeChain(), max_size=2, block_refresh=0)
+
+    client.get_node('node-a')
+    client.get_node('node-b')
+    client.get_node('node-a')
+    client.get_node('node-c')
+
+    # `b` was the least recently used.
+    client.get_node('node-a')
+    client.get_node('node-b')
+    assert [call[1] for call in contract.calls] == [('node-a',), ('node-b',), ('node-c',), ('node-b',)]
+
+
+def test_concurrent_requests_are_coalesced():
+    contract = SlowContract()
+    client = GroveClient(contract, FakeChain(), block_refresh=0)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.getIndexRoot('index')))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+
+    while client.stats['misses'] + client.stats['coalesced'] < 5:
+        pass
+    contract.release.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert results == ['root'] * 5
+    assert contract.calls == [('getIndexRoot', 'index')]
+    assert client.stats['coalesced'] == 4
+
+
+def test_matches_contract(deploy_client, deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+    index_name = 'test-grove-client'
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, value in (('a', 3), ('b', 1), ('c', 2)):
+        grove.insert(index_name, _id, value)
+
+    client = GroveClient(grove, JSONRPCSource(deploy_client), block_refresh=0)
+
+    for _id in ('a', 'b', 'c'):
+        node_id = grove.computeNodeId(index_id, _id)
+        for name in ('getNodeValue', 'getNodeHeight', 'getNodeParent', 'getNodeLeftChild', 'getNodeRightChild', 'getNextNode'):
+            assert getattr(client, name)(node_id) == getattr(grove, name)(node_id)
+
+    assert client.getIndexRoot(index_id) == grove.getIndexRoot(index_id)
+
+    # A write mines a new block, which the client picks up.
+    grove.insert(index_name, 'a', 0)
+    assert client.getNodeValue(grove.computeNodeId(index_id, 'a')) == 0
@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture
+def get_ordered_ids():
+    """
+    The ids of an index in order, following `getNextNode` from the first.
+    """
+    def _get_ordered_ids(grove, index_id):
+        ids = []
+        _id = grove.getFirst(index_id)
+
+        while _id is not None:
+            ids.append(_id)
+            _id = grove.getNextNode(grove.computeNodeId(index_id, _id))
+        return ids
+    return _get_ordered_ids
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from grove import Indexer, JSONRPCSource
+
+
+tree_nodes = (
+    ('a', 18),
+    ('b', 0),
+    ('c', 7),
+    ('d', 11),
+    ('e', 16),
+    ('f', 3),
+    ('g', 16),
+    ('h', 17),
+    ('i', 17),
+    ('j', 18),
+    ('k', 12),
+    ('l', 3),
+    ('m', 4),
+    ('n', 6),
+    ('o', 11),
+    ('p', 5),
+    ('q', 12),
+    ('r', 1),
+    ('s', 1),
+    ('t', 16),
+    ('u', 14),
+    ('v', 3),
+    ('w', 7),
+    ('x', 13),
+    ('y', 6),
+    ('z', 17),
+)
+
+
+@pytest.fixture(scope="module")
+def big_tree(deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    for _id, value in tree_nodes:
+        grove.insert('test-indexer', _id, value)
+    return grove
+
+
+def assert_matches_chain(grove, indexer, index_id):
+    index = indexer.get_index(index_id)
+
+    for operator in ('<', '<=', '>', '>=', '=='):
+        for value in range(-1, 21):
+            assert index.query(operator, value) == grove.query(index_id, operator, value)
+
+    ids, values, cursor = grove.scan(index_id, '>=', 0, False, len(tree_nodes) + 1)
+    page = [(_id, value) for _id, value in zip(ids, values) if _id]
+    assert index.items() == page
+
+
+def test_replay_matches_chain(deploy_client, deploy_coinbase, big_tree):
+    index_id = big_tree.computeIndexId(deploy_coinbase, 'test-indexer')
+
+    indexer = Indexer(JSONRPCSource(deploy_client), big_tree._meta.address)
+    indexer.sync()
+
+    assert_matches_chain(big_tree, indexer, index_id)
+
+    # Catch up with updates, which move some nodes within runs of equal
+    # values, and removals.
+    big_tree.insert('test-indexer', 'f', 4)
+    big_tree.insert('test-indexer', 'b', 3)
+    big_tree.insert('test-indexer', 'i', 16)
+    big_tree.remove('test-indexer', 'e')
+    big_tree.popLast('test-indexer')
+    big_tree.removeRange('test-indexer', '<', 3, 2)
+
+    assert indexer.sync() == 7
+
+    assert_matches_chain(big_tree, indexer, index_id)
+
+    # A checkpoint carries on where it left off.
+    checkpoint = json.loads(json.dumps(indexer.checkpoint()))
+    big_tree.insert('test-indexer', 'e', 9)
+
+    restored = Indexer.from_checkpoint(JSONRPCSource(deploy_client), checkpoint)
+    assert restored.sync() == 1
+
+    assert_matches_chain(big_tree, restored, index_id)
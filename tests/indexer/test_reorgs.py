@@ -0,0 +1,131 @@
+import json
+
+import pytest
+
+from grove import Indexer, ReorgTooDeep
+from grove.logs import NODE_INSERTED, NODE_UPDATED, NODE_REMOVED, encode_bytes32
+
+
+index_id = b'test-reorgs'
+
+
+def make_log(topic, _id, value):
+    return {
+        'topics': [topic, encode_bytes32(index_id)],
+        'data': encode_bytes32(_id) + '{0:064x}'.format(value % 2 ** 256),
+    }
+
+
+class FakeChain(object):
+    """
+    A chain of blocks, each of which is a list of logs, which can be
+    reorganized by replacing the blocks after a given block.
+    """
+    def __init__(self):
+        self.blocks = []
+        self.forks = 0
+
+    def mine(self, *logs):
+        self.blocks.append(("0x{0}-{1}".format(self.forks, len(self.blocks)), logs))
+
+    def reorg(self, block_number):
+        self.forks += 1
+        self.blocks = self.blocks[:block_number]
+
+    def get_block_number(self):
+        return len(self.blocks) - 1
+
+    def get_block_hash(self, block_number):
+        if block_number >= len(self.blocks):
+            return None
+        return self.blocks[block_number][0]
+
+    def get_logs(self, address, from_block, to_block):
+        logs = []
+        for block_number in range(from_block, to_block + 1):
+            block_hash, block_logs = self.blocks[block_number]
+            for log_index, log in enumerate(block_logs):
+                log = dict(log)
+                log.update({
+                    'blockNumber': hex(block_number),
+                    'blockHash': block_hash,
+                    'logIndex': hex(log_index),
+                })
+                logs.append(log)
+        return logs
+
+
+def test_reorg_is_undone():
+    chain = FakeChain()
+    chain.mine(make_log(NODE_INSERTED, b'a', 5), make_log(NODE_INSERTED, b'b', 5))
+    chain.mine(make_log(NODE_INSERTED, b'c', -3))
+    chain.mine()
+
+    indexer = Indexer(chain, '0xgrove')
+    assert indexer.sync() == 3
+
+    index = indexer.get_index(index_id)
+    assert index.items() == [(b'c', -3), (b'a', 5), (b'b', 5)]
+
+    # Moving `a` after `b` and removing `c` is reorganized away.
+    chain.mine(make_log(NODE_UPDATED, b'a', 6), make_log(NODE_UPDATED, b'a', 5), make_log(NODE_REMOVED, b'c', -3))
+    assert indexer.sync() == 3
+    assert index.items() == [(b'b', 5), (b'a', 5)]
+
+    chain.reorg(3)
+    chain.mine(make_log(NODE_INSERTED, b'd', 7))
+    chain.mine()
+
+    assert indexer.sync() == 1
+    assert index.items() == [(b'c', -3), (b'a', 5), (b'b', 5), (b'd', 7)]
+    assert indexer.query(index_id, '>=', 5) == b'a'
+    assert indexer.query(index_id, '<=', 5) == b'b'
+
+
+def test_catch_up_from_checkpoint():
+    chain = FakeChain()
+    chain.mine(make_log(NODE_INSERTED, b'a', 1), make_log(NODE_INSERTED, b'b', 2))
+
+    indexer = Indexer(chain, '0xgrove')
+    indexer.sync()
+
+    checkpoint = json.loads(json.dumps(indexer.checkpoint()))
+
+    chain.mine(make_log(NODE_REMOVED, b'a', 1), make_log(NODE_INSERTED, b'c', 0))
+
+    restored = Indexer.from_checkpoint(chain, checkpoint)
+    assert restored.get_index(index_id).items() == [(b'a', 1), (b'b', 2)]
+
+    assert restored.sync() == 2
+    assert restored.get_index(index_id).items() == [(b'c', 0), (b'b', 2)]
+
+    # The checkpoint remembers the blocks it can undo.
+    chain.reorg(1)
+    chain.mine()
+    restored.sync()
+    assert restored.get_index(index_id).items() == [(b'a', 1), (b'b', 2)]
+
+
+def test_reorg_past_remembered_blocks():
+    chain = FakeChain()
+    for i in range(5):
+        chain.mine(make_log(NODE_INSERTED, b'a', i))
+
+    indexer = Indexer(chain, '0xgrove', max_reorg_depth=2)
+    indexer.sync()
+
+    checkpoint = indexer.checkpoint()
+
+    chain.reorg(1)
+    chain.mine()
+
+    with pytest.raises(ReorgTooDeep):
+        indexer.sync()
+
+    # Nothing was undone, and the indexer keeps refusing to sync rather
+    # than serving a partially undone state.
+    assert indexer.checkpoint() == checkpoint
+    assert indexer.get_index(index_id).items() == [(b'a', 4)]
+
+    with pytest.raises(ReorgTooDeep):
+        indexer.sync()
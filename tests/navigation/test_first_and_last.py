@@ -0,0 +1,83 @@
+tree_nodes = (
+    ('a', 18),
+    ('b', 0),
+    ('c', 7),
+    ('d', 11),
+    ('e', 16),
+    ('f', 3),
+    ('g', 16),
+    ('h', 17),
+    ('i', 17),
+    ('j', 18),
+    ('k', 12),
+    ('l', 3),
+    ('m', 4),
+    ('n', 6),
+    ('o', 11),
+    ('p', 5),
+    ('q', 12),
+    ('r', 1),
+    ('s', 1),
+    ('t', 16),
+    ('u', 14),
+    ('v', 3),
+    ('w', 7),
+    ('x', 13),
+    ('y', 6),
+    ('z', 17),
+)
+
+
+def test_empty_index(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+    index_id = grove.computeIndexId(deploy_coinbase, "test-first-last-empty")
+
+    assert grove.getFirst(index_id) is None
+    assert grove.getLast(index_id) is None
+
+
+def test_first_and_last_track_inserts(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-first-last-inserts"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, value in tree_nodes:
+        grove.insert(index_name, _id, value)
+
+        assert grove.getFirst(index_id) == grove.query(index_id, ">=", -1)
+        assert grove.getLast(index_id) == grove.query(index_id, "<=", 100)
+
+    assert grove.getFirst(index_id) == 'b'
+    assert grove.getLast(index_id) == 'j'
+
+
+def test_first_and_last_track_removals_and_updates(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-first-last-removals"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, value in tree_nodes:
+        grove.insert(index_name, _id, value)
+
+    grove.remove(index_name, 'b')
+    assert grove.getFirst(index_id) == 'r'
+
+    grove.remove(index_name, 'j')
+    assert grove.getLast(index_id) == 'a'
+
+    # Moving the last node to the front.
+    grove.insert(index_name, 'a', -1)
+    assert grove.getFirst(index_id) == 'a'
+    assert grove.getLast(index_id) == 'z'
+
+    # An equal value is inserted after the existing last node.
+    grove.insert(index_name, 'b', 17)
+    assert grove.getLast(index_id) == 'b'
+
+    for _id, _ in tree_nodes:
+        grove.remove(index_name, _id)
+
+    assert grove.getFirst(index_id) is None
+    assert grove.getLast(index_id) is None
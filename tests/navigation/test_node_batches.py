@@ -0,0 +1,82 @@
+import pytest
+
+
+tree_nodes = (
+    ('a', 18),
+    ('b', 0),
+    ('c', 7),
+    ('d', 11),
+    ('e', 16),
+    ('f', 3),
+    ('g', 16),
+    ('h', 17),
+    ('i', 17),
+    ('j', 18),
+    ('k', 12),
+    ('l', 3),
+    ('m', 4),
+)
+
+
+@pytest.fixture(scope="module")
+def big_tree(deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    for _id, value in tree_nodes:
+        grove.insert('test-node-batches', _id, value)
+    return grove
+
+
+def get_node(grove, node_id):
+    return (
+        grove.getNodeIndexId(node_id),
+        grove.getNodeValue(node_id),
+        grove.getNodeHeight(node_id),
+        grove.getNodeParent(node_id),
+        grove.getNodeLeftChild(node_id),
+        grove.getNodeRightChild(node_id),
+    )
+
+
+def test_get_nodes(deploy_coinbase, big_tree):
+    index_id = big_tree.computeIndexId(deploy_coinbase, 'test-node-batches')
+    ids = [_id for _id, _ in tree_nodes] + ['missing']
+    node_ids = [big_tree.computeNodeId(index_id, _id) for _id in ids]
+
+    index_ids, returned_ids, values, heights, parents, lefts, rights = big_tree.getNodes(node_ids)
+
+    for i, node_id in enumerate(node_ids[:-1]):
+        assert returned_ids[i] == ids[i]
+        actual = (index_ids[i], values[i], heights[i], parents[i] or None, lefts[i] or None, rights[i] or None)
+        assert actual == get_node(big_tree, node_id)
+
+    assert values[-1] == 0
+    assert heights[-1] == 0
+
+
+@pytest.mark.parametrize('depth', (1, 2, 3, 10))
+def test_get_subtree(deploy_coinbase, big_tree, depth):
+    index_id = big_tree.computeIndexId(deploy_coinbase, 'test-node-batches')
+    root = big_tree.getIndexRoot(index_id)
+    root_height = big_tree.getNodeHeight(big_tree.computeNodeId(index_id, root))
+
+    ids, values, heights = big_tree.getSubtree(big_tree.computeNodeId(index_id, root), depth)
+
+    # Walk the tree one node at a time into the same layout.
+    expected = [root]
+    for k in range(1, 2 ** min(depth, root_height) - 1):
+        parent = expected[(k - 1) // 2]
+        if parent is None:
+            expected.append(None)
+        elif k % 2 == 1:
+            expected.append(big_tree.getNodeLeftChild(big_tree.computeNodeId(index_id, parent)))
+        else:
+            expected.append(big_tree.getNodeRightChild(big_tree.computeNodeId(index_id, parent)))
+
+    assert [_id or None for _id in ids] == expected
+
+    values_by_id = dict(tree_nodes)
+    for _id, value, height in zip(ids, values, heights):
+        if _id:
+            assert value == values_by_id[_id]
+            assert height == big_tree.getNodeHeight(big_tree.computeNodeId(index_id, _id))
@@ -0,0 +1,99 @@
+import pytest
+
+
+tree_nodes = (
+    ('a', 18),
+    ('b', 0),
+    ('c', 7),
+    ('d', 11),
+    ('e', 16),
+    ('f', 3),
+    ('g', 16),
+    ('h', 17),
+    ('i', 17),
+    ('j', 18),
+    ('k', 12),
+    ('l', 3),
+    ('m', 4),
+    ('n', 6),
+    ('o', 11),
+    ('p', 5),
+    ('q', 12),
+    ('r', 1),
+    ('s', 1),
+    ('t', 16),
+    ('u', 14),
+    ('v', 3),
+    ('w', 7),
+    ('x', 13),
+    ('y', 6),
+    ('z', 17),
+)
+
+ordered_ids = (
+    'b', 'r', 's', 'f', 'l', 'v', 'm', 'p', 'n', 'y', 'c', 'w', 'd', 'o', 'k',
+    'q', 'x', 'u', 'e', 'g', 't', 'h', 'i', 'z', 'a', 'j',
+)
+
+values = dict(tree_nodes)
+
+
+@pytest.fixture(scope="module")
+def big_tree(deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    for _id, value in tree_nodes:
+        grove.insert('test-scanning', _id, value)
+    return grove
+
+
+def trim(ids, node_values):
+    # Entries past the end of the index are returned as 0x0.
+    page = [(_id, value) for _id, value in zip(ids, node_values) if _id]
+    return tuple(_id for _id, _ in page), tuple(value for _, value in page)
+
+
+@pytest.mark.parametrize(
+    'operator,value,reverse,limit,expected_ids,expected_cursor',
+    (
+        (">=", 0, False, 5, ('b', 'r', 's', 'f', 'l'), 'v'),
+        (">", 16, False, 3, ('h', 'i', 'z'), 'a'),
+        (">", 16, False, 10, ('h', 'i', 'z', 'a', 'j'), None),
+        ("==", 6, False, 4, ('n', 'y', 'c', 'w'), 'd'),
+        ("<", 7, True, 3, ('y', 'n', 'p'), 'm'),
+        ("<=", 1, True, 5, ('s', 'r', 'b'), None),
+        (">", 18, False, 5, (), None),
+    )
+)
+def test_scanning(deploy_coinbase, big_tree, operator, value, reverse, limit,
+                  expected_ids, expected_cursor):
+    index_id = big_tree.computeIndexId(deploy_coinbase, "test-scanning")
+
+    ids, node_values, cursor = big_tree.scan(index_id, operator, value, reverse, limit)
+
+    assert len(ids) == limit
+    assert len(node_values) == limit
+    assert trim(ids, node_values) == (
+        expected_ids,
+        tuple(values[_id] for _id in expected_ids),
+    )
+    assert cursor == expected_cursor
+
+
+@pytest.mark.parametrize('reverse', (False, True))
+def test_scanning_whole_index_by_page(deploy_coinbase, big_tree, reverse):
+    index_id = big_tree.computeIndexId(deploy_coinbase, "test-scanning")
+
+    if reverse:
+        ids, _, cursor = big_tree.scan(index_id, "<=", 18, True, 7)
+    else:
+        ids, _, cursor = big_tree.scan(index_id, ">=", 0, False, 7)
+
+    actual = list(ids)
+
+    while cursor is not None:
+        ids, _, cursor = big_tree.scanFrom(index_id, cursor, reverse, 7)
+        actual.extend(ids)
+
+    expected = ordered_ids[::-1] if reverse else ordered_ids
+    assert tuple(_id for _id in actual if _id) == expected
@@ -0,0 +1,141 @@
+import pytest
+
+
+tree_nodes = (
+    ('a', 5),
+    ('b', 3),
+    ('c', 5),
+    ('d', 5),
+    ('e', 1),
+    ('f', 3),
+    ('g', 7),
+    ('h', 5),
+    ('i', 1),
+    ('j', 7),
+)
+
+
+def get_reverse_ordered_ids(grove, index_id):
+    ids = []
+    _id = grove.getLast(index_id)
+
+    while _id is not None:
+        ids.append(_id)
+        _id = grove.getPreviousNode(grove.computeNodeId(index_id, _id))
+    return ids
+
+
+def create_bucketed_index(grove, index_name):
+    grove.enableValueBuckets(index_name)
+    grove.enableNodeCounts(index_name)
+    for _id, value in tree_nodes:
+        grove.insert(index_name, _id, value)
+
+
+@pytest.fixture(scope="module")
+def bucketed_index(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-value-buckets"
+    create_bucketed_index(grove, index_name)
+    return grove, index_name, grove.computeIndexId(deploy_coinbase, index_name)
+
+
+def test_only_distinct_values_are_in_the_tree(bucketed_index):
+    grove, _, index_id = bucketed_index
+
+    assert grove.getIndexRoot(index_id) == 'b'
+    assert grove.getNodeHeight(grove.computeNodeId(index_id, 'b')) == 3
+
+    for _id in ('c', 'd', 'h', 'f', 'i', 'j'):
+        assert grove.getNodeParent(grove.computeNodeId(index_id, _id)) is None
+
+
+def test_navigation_walks_buckets(bucketed_index, get_ordered_ids):
+    grove, _, index_id = bucketed_index
+
+    expected = ['e', 'i', 'b', 'f', 'a', 'c', 'd', 'h', 'g', 'j']
+
+    assert get_ordered_ids(grove, index_id) == expected
+    assert get_reverse_ordered_ids(grove, index_id) == expected[::-1]
+
+
+@pytest.mark.parametrize(
+    'operator,value,expected',
+    (
+        ("==", 5, 'a'),
+        ("==", 4, None),
+        (">=", 5, 'a'),
+        (">", 5, 'g'),
+        ("<=", 5, 'h'),
+        ("<", 5, 'f'),
+        ("<=", 7, 'j'),
+    )
+)
+def test_querying_buckets(bucketed_index, operator, value, expected):
+    grove, _, index_id = bucketed_index
+
+    assert grove.query(index_id, operator, value) == expected
+
+
+def test_order_statistics_include_buckets(bucketed_index):
+    grove, _, index_id = bucketed_index
+
+    assert grove.rank(index_id, 5) == 4
+    assert grove.count(index_id, 5, 5) == 4
+    assert grove.select(index_id, 5) == 'c'
+    assert grove.select(index_id, 7) == 'h'
+    assert grove.select(index_id, 10) is None
+
+
+def test_removing_from_buckets(deploy_coinbase, deployed_contracts, get_ordered_ids):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-value-buckets-removal"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+    create_bucketed_index(grove, index_name)
+
+    # The first node of the bucket takes the place of the tree node.
+    grove.remove(index_name, 'a')
+    assert grove.query(index_id, "==", 5) == 'c'
+    assert grove.getNodeRightChild(grove.computeNodeId(index_id, 'b')) == 'c'
+    assert grove.getNodeRightChild(grove.computeNodeId(index_id, 'c')) == 'g'
+
+    grove.remove(index_name, 'd')
+    grove.remove(index_name, 'h')
+    assert grove.query(index_id, "<=", 5) == 'c'
+    assert get_ordered_ids(grove, index_id) == ['e', 'i', 'b', 'f', 'c', 'g', 'j']
+
+    assert tuple(grove.popLast.call(index_name)) == ('j', 7)
+    grove.popLast(index_name)
+    assert tuple(grove.popFirst.call(index_name)) == ('e', 1)
+    grove.popFirst(index_name)
+
+    assert grove.getFirst(index_id) == 'i'
+    assert grove.getLast(index_id) == 'g'
+    assert grove.count(index_id, 0, 10) == 5
+
+    # Moving a node into an existing bucket and out to a new value.
+    grove.insert(index_name, 'a', 3)
+    grove.insert(index_name, 'c', 9)
+    assert get_ordered_ids(grove, index_id) == ['i', 'b', 'f', 'a', 'g', 'c']
+    assert get_reverse_ordered_ids(grove, index_id) == ['c', 'g', 'a', 'f', 'b', 'i']
+
+
+@pytest.mark.parametrize(
+    'start,reverse,expected_ids,expected_cursor',
+    (
+        ('i', False, ('i', 'b', 'f', 'a'), 'c'),
+        ('c', False, ('c', 'd', 'h', 'g'), 'j'),
+        ('h', False, ('h', 'g', 'j'), None),
+        ('d', True, ('d', 'c', 'a', 'f'), 'b'),
+        ('a', True, ('a', 'f', 'b', 'i'), 'e'),
+    )
+)
+def test_scanning_buckets(bucketed_index, start, reverse, expected_ids, expected_cursor):
+    grove, _, index_id = bucketed_index
+
+    ids, values, cursor = grove.scanFrom(index_id, start, reverse, 4)
+
+    assert tuple(_id for _id in ids if _id is not None) == expected_ids
+    assert cursor == expected_cursor
@@ -0,0 +1,113 @@
+import pytest
+
+
+ids = tuple("n{0}".format(i) for i in range(60))
+values = tuple((i * 37) % 23 for i in range(60))
+
+
+def get_reverse_ordered_ids(grove, index_id):
+    ids = []
+    _id = grove.getLast(index_id)
+
+    while _id is not None:
+        ids.append(_id)
+        _id = grove.getPreviousNode(grove.computeNodeId(index_id, _id))
+    return ids
+
+
+def expected_order(entries):
+    return [_id for _id, _ in sorted(entries.items(), key=lambda item: (item[1], item[0]))]
+
+
+@pytest.fixture(scope="module")
+def btree_index(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.BTreeGrove
+
+    index_name = "test-btree"
+    for _id, value in zip(ids, values):
+        grove.insert(index_name, _id, value)
+    return grove, grove.computeIndexId(deploy_coinbase, index_name)
+
+
+def test_btree_navigation(btree_index, get_ordered_ids):
+    grove, index_id = btree_index
+
+    # 60 entries do not fit in a single leaf.
+    assert grove.getIndexDepth(index_id) > 1
+
+    expected = expected_order(dict(zip(ids, values)))
+
+    assert get_ordered_ids(grove, index_id) == expected
+    assert get_reverse_ordered_ids(grove, index_id) == expected[::-1]
+
+
+@pytest.mark.parametrize('value', (-1, 0, 7, 11, 22, 23))
+def test_btree_querying(btree_index, value):
+    grove, index_id = btree_index
+
+    order = expected_order(dict(zip(ids, values)))
+    entries = dict(zip(ids, values))
+
+    def first(matches):
+        return matches[0] if matches else None
+
+    def last(matches):
+        return matches[-1] if matches else None
+
+    assert grove.query(index_id, "==", value) == first([_id for _id in order if entries[_id] == value])
+    assert grove.query(index_id, ">=", value) == first([_id for _id in order if entries[_id] >= value])
+    assert grove.query(index_id, ">", value) == first([_id for _id in order if entries[_id] > value])
+    assert grove.query(index_id, "<=", value) == last([_id for _id in order if entries[_id] <= value])
+    assert grove.query(index_id, "<", value) == last([_id for _id in order if entries[_id] < value])
+
+
+def test_btree_scanning_crosses_leaves(btree_index):
+    grove, index_id = btree_index
+
+    order = expected_order(dict(zip(ids, values)))
+
+    scanned = []
+    cursor = grove.getFirst(index_id)
+
+    while cursor is not None:
+        page, _, cursor = grove.scanFrom(index_id, cursor, False, 16)
+        scanned.extend(_id for _id in page if _id is not None)
+
+    assert scanned == order
+
+
+def test_btree_removal(deploy_coinbase, deployed_contracts, get_ordered_ids):
+    grove = deployed_contracts.BTreeGrove
+
+    index_name = "test-btree-removal"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    for _id, value in zip(ids, values):
+        grove.insert(index_name, _id, value)
+
+    entries = dict(zip(ids, values))
+
+    # Emptying most of the leaves borrows keys from and merges them with
+    # their siblings.
+    for _id in ids[::2] + ids[1:40:2]:
+        grove.remove(index_name, _id)
+        del entries[_id]
+
+    for _id in ids:
+        assert grove.exists(index_id, _id) is (_id in entries)
+
+    assert get_ordered_ids(grove, index_id) == expected_order(entries)
+    assert grove.getIndexDepth(index_id) == 1
+
+    # Updating values moves entries between leaves.
+    grove.insert(index_name, 'n41', 100)
+    entries['n41'] = 100
+
+    assert get_ordered_ids(grove, index_id) == expected_order(entries)
+
+    for _id in list(entries):
+        grove.remove(index_name, _id)
+
+    assert grove.getFirst(index_id) is None
+    assert grove.getLast(index_id) is None
+    assert grove.getIndexDepth(index_id) == 0
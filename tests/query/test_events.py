@@ -0,0 +1,48 @@
+def get_logs(deploy_client, txn_hash):
+    receipt = deploy_client.wait_for_transaction(txn_hash)
+    return receipt['logs']
+
+
+def decode_log(log):
+    # The id and value are the two words of the log data.
+    data = log['data'][2:]
+    return data[:64], int(data[64:], 16)
+
+
+def test_writes_are_logged(deploy_client, deployed_contracts):
+    grove = deployed_contracts.Grove
+    index_name = 'test-events'
+
+    inserted = get_logs(deploy_client, grove.insert(index_name, 'a', 5))
+    assert len(inserted) == 1
+    assert decode_log(inserted[0])[1] == 5
+
+    # Re-inserting a node with the value it already has changes nothing.
+    assert get_logs(deploy_client, grove.insert(index_name, 'a', 5)) == []
+
+    updated = get_logs(deploy_client, grove.insert(index_name, 'a', 8))
+    assert len(updated) == 1
+    assert decode_log(updated[0])[1] == 8
+    assert updated[0]['topics'][0] != inserted[0]['topics'][0]
+    # Only the index id is indexed.
+    assert updated[0]['topics'][1] == inserted[0]['topics'][1]
+
+    removed = get_logs(deploy_client, grove.remove(index_name, 'a'))
+    assert len(removed) == 1
+    assert decode_log(removed[0]) == decode_log(updated[0])
+
+    # Removing a node that does not exist is not logged.
+    assert get_logs(deploy_client, grove.remove(index_name, 'a')) == []
+
+
+def test_remove_range_logs_each_node(deploy_client, deployed_contracts):
+    grove = deployed_contracts.Grove
+    index_name = 'test-events-range'
+
+    grove.insertMany(index_name, ['a', 'b', 'c', 'd'], [4, 1, 3, 2])
+
+    removed = get_logs(deploy_client, grove.removeRange(index_name, '<', 3, 10))
+    assert [decode_log(log)[1] for log in removed] == [1, 2]
+
+    popped = get_logs(deploy_client, grove.popLast(index_name))
+    assert [decode_log(log)[1] for log in popped] == [4]
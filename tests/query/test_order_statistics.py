@@ -0,0 +1,138 @@
+import pytest
+
+
+tree_nodes = (
+    ('a', 18),
+    ('b', 0),
+    ('c', 7),
+    ('d', 11),
+    ('e', 16),
+    ('f', 3),
+    ('g', 16),
+    ('h', 17),
+    ('i', 17),
+    ('j', 18),
+    ('k', 12),
+    ('l', 3),
+    ('m', 4),
+    ('n', 6),
+    ('o', 11),
+    ('p', 5),
+    ('q', 12),
+    ('r', 1),
+    ('s', 1),
+    ('t', 16),
+    ('u', 14),
+    ('v', 3),
+    ('w', 7),
+    ('x', 13),
+    ('y', 6),
+    ('z', 17),
+)
+
+ordered_ids = (
+    'b', 'r', 's', 'f', 'l', 'v', 'm', 'p', 'n', 'y', 'c', 'w', 'd', 'o', 'k',
+    'q', 'x', 'u', 'e', 'g', 't', 'h', 'i', 'z', 'a', 'j',
+)
+
+
+@pytest.fixture(scope="module")
+def big_tree(deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    grove.enableNodeCounts('test-order-statistics')
+    for _id, value in tree_nodes:
+        grove.insert('test-order-statistics', _id, value)
+    return grove
+
+
+@pytest.mark.parametrize(
+    'value,expected',
+    (
+        (-1, 0),
+        (0, 0),
+        (1, 1),
+        (3, 3),
+        (4, 6),
+        (10, 12),
+        (16, 18),
+        (18, 24),
+        (19, 26),
+    )
+)
+def test_rank(deploy_coinbase, big_tree, value, expected):
+    index_id = big_tree.computeIndexId(deploy_coinbase, "test-order-statistics")
+
+    assert big_tree.rank(index_id, value) == expected
+
+
+@pytest.mark.parametrize('k', range(len(ordered_ids) + 1))
+def test_select(deploy_coinbase, big_tree, k):
+    index_id = big_tree.computeIndexId(deploy_coinbase, "test-order-statistics")
+
+    if k < len(ordered_ids):
+        assert big_tree.select(index_id, k) == ordered_ids[k]
+    else:
+        assert big_tree.select(index_id, k) is None
+
+
+@pytest.mark.parametrize(
+    'lo,hi,expected',
+    (
+        (0, 18, 26),
+        (-5, 50, 26),
+        (3, 3, 3),
+        (3, 6, 7),
+        (8, 10, 0),
+        (16, 17, 6),
+        (17, 16, 0),
+        (19, 25, 0),
+    )
+)
+def test_count(deploy_coinbase, big_tree, lo, hi, expected):
+    index_id = big_tree.computeIndexId(deploy_coinbase, "test-order-statistics")
+
+    assert big_tree.count(index_id, lo, hi) == expected
+
+
+def test_counts_track_updates_and_removals(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = 'test-order-statistics-churn'
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    grove.enableNodeCounts(index_name)
+    for _id, value in tree_nodes:
+        grove.insert(index_name, _id, value)
+
+    grove.remove(index_name, 'c')
+    grove.remove(index_name, 'b')
+    grove.insert(index_name, 'a', 2)
+    grove.insert(index_name, 'u', 15)
+
+    assert grove.rank(index_id, 3) == 3
+    assert grove.count(index_id, 0, 18) == 24
+    assert grove.count(index_id, 14, 15) == 1
+    assert grove.select(index_id, 0) == 'r'
+    assert grove.select(index_id, 2) == 'a'
+    assert grove.select(index_id, 23) == 'j'
+    assert grove.select(index_id, 24) is None
+
+
+def test_enabling_counts_during_bulk_load_throws(deploy_client, deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = "test-counts-mid-load"
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    grove.startBulkLoad(index_name, 4)
+    grove.bulkLoad(index_name, ['a'], [1])
+
+    # The root is not set until the middle node is loaded.
+    assert grove.getIndexRoot(index_id) is None
+
+    txn_hash = grove.enableNodeCounts(index_name)
+    receipt = deploy_client.wait_for_transaction(txn_hash)
+
+    # A throw uses up all of the gas sent with the transaction.
+    assert int(receipt['gasUsed'], 16) == int(deploy_client.get_transaction_by_hash(txn_hash)['gas'], 16)
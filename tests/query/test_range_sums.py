@@ -0,0 +1,108 @@
+import pytest
+
+
+tree_nodes = (
+    ('a', 18),
+    ('b', 0),
+    ('c', 7),
+    ('d', 11),
+    ('e', 16),
+    ('f', 3),
+    ('g', 16),
+    ('h', 17),
+    ('i', 17),
+    ('j', 18),
+    ('k', 12),
+    ('l', 3),
+    ('m', 4),
+    ('n', 6),
+    ('o', 11),
+    ('p', 5),
+    ('q', 12),
+    ('r', 1),
+    ('s', 1),
+    ('t', 16),
+    ('u', 14),
+    ('v', 3),
+    ('w', 7),
+    ('x', 13),
+    ('y', 6),
+    ('z', 17),
+)
+
+
+@pytest.fixture(scope="module")
+def big_tree(deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    grove.enableValueSums('test-range-sums')
+    for _id, value in tree_nodes:
+        grove.insert('test-range-sums', _id, value)
+    return grove
+
+
+@pytest.mark.parametrize(
+    'lo,hi,expected',
+    (
+        (0, 18, 254),
+        (-5, 50, 254),
+        (3, 3, 9),
+        (3, 6, 30),
+        (8, 10, 0),
+        (16, 17, 99),
+        (17, 16, 0),
+        (19, 25, 0),
+    )
+)
+def test_sum_range(deploy_coinbase, big_tree, lo, hi, expected):
+    index_id = big_tree.computeIndexId(deploy_coinbase, "test-range-sums")
+
+    assert big_tree.sumRange(index_id, lo, hi) == expected
+
+
+def test_sums_track_updates_and_removals(deploy_coinbase, deployed_contracts):
+    grove = deployed_contracts.Grove
+
+    index_name = 'test-range-sums-churn'
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    grove.enableValueSums(index_name)
+    for _id, value in tree_nodes:
+        grove.insert(index_name, _id, value)
+
+    grove.remove(index_name, 'c')
+    grove.remove(index_name, 'b')
+    # Moves to a new position.
+    grove.insert(index_name, 'a', 2)
+    # Updated in place.
+    grove.insert(index_name, 'u', 15)
+    grove.popLast(index_name)
+
+    assert grove.sumRange(index_id, -100, 100) == 214
+    assert grove.sumRange(index_id, 2, 3) == 11
+    assert grove.sumRange(index_id, 14, 17) == 114
+
+
+@pytest.mark.parametrize('chunk_size', (1, 7))
+def test_sums_after_bulk_load(deploy_coinbase, deployed_contracts, chunk_size):
+    grove = deployed_contracts.Grove
+
+    index_name = 'test-range-sums-bulk-{0}'.format(chunk_size)
+    index_id = grove.computeIndexId(deploy_coinbase, index_name)
+
+    values = (0, 1, 1, 3, 3, 3, 4, 5, 6, 6, 7, 7, 11, 11, 12, 12, 13, 14, 16, 16)
+    ids = tuple("n{0}".format(i) for i in range(len(values)))
+
+    grove.enableValueSums(index_name)
+    grove.startBulkLoad(index_name, len(values))
+
+    for i in range(0, len(values), chunk_size):
+        grove.bulkLoad(
+            index_name,
+            list(ids[i:i + chunk_size]),
+            list(values[i:i + chunk_size]),
+        )
+
+    assert grove.sumRange(index_id, 0, 16) == 151
+    assert grove.sumRange(index_id, 3, 7) == 44
+    assert grove.sumRange(index_id, 12, 16) == 83
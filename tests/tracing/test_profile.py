@@ -0,0 +1,93 @@
+from grove.trace import Code, Profile, parse_source_map
+
+
+source = (
+    "library L {\n"
+    "        function a() { b(); }\n"
+    "        function b() { x = 1; }\n"
+    "}\n"
+)
+
+A = source.index("function a")
+B = source.index("function b")
+
+# op, source offset, jump marker
+library_program = (
+    ('JUMPDEST', 0, '-'),
+    ('JUMP', 0, 'i'),
+    ('JUMPDEST', A, '-'),
+    ('SLOAD', A + 15, '-'),
+    ('JUMP', A + 15, 'i'),
+    ('JUMPDEST', B, '-'),
+    ('SSTORE', B + 15, '-'),
+    ('JUMP', B, 'o'),
+    ('JUMPDEST', A, '-'),
+    ('JUMP', A, 'o'),
+    ('STOP', 0, '-'),
+)
+
+OPCODES = {
+    'STOP': '00', 'SLOAD': '54', 'SSTORE': '55', 'JUMP': '56', 'JUMPDEST': '5b', 'DELEGATECALL': 'f4',
+}
+GAS_COSTS = {'SLOAD': 50, 'SSTORE': 20000, 'JUMP': 8, 'JUMPDEST': 1, 'STOP': 0}
+
+LIBRARY = '0x' + '11' * 20
+CONTRACT = '0x' + '22' * 20
+
+
+def make_code(name, program):
+    bytecode = ''.join(OPCODES[op] for op, _, _ in program)
+    source_map = ';'.join("{0}:1:0:{1}".format(offset, jump) for _, offset, jump in program)
+    return Code(name, bytecode, source_map, [source])
+
+
+def make_steps(program, depth, gas):
+    steps = []
+    for pc, (op, _, _) in enumerate(program):
+        steps.append({'pc': pc, 'op': op, 'depth': depth, 'gas': gas, 'gasCost': GAS_COSTS[op]})
+        gas -= GAS_COSTS[op]
+    return steps, gas
+
+
+def test_parse_source_map():
+    assert parse_source_map("1:2:0:-;:3;4::1:i;;") == [
+        (1, 2, 0, '-'),
+        (1, 3, 0, '-'),
+        (4, 3, 1, 'i'),
+        (4, 3, 1, 'i'),
+        (4, 3, 1, 'i'),
+    ]
+
+
+def test_internal_calls_are_stacked():
+    profile = Profile({LIBRARY: make_code('L', library_program)})
+    steps, _ = make_steps(library_program, 1, 100000)
+
+    profile.add_trace(LIBRARY, steps)
+
+    assert profile.folded('sload') == "L.<dispatch>;L.a 1"
+    assert profile.folded('sstore') == "L.<dispatch>;L.a;L.b 1"
+    assert profile.by_function()['L.b'] == {'gas': 20000 + 1 + 8, 'sload': 0, 'sstore': 1}
+    assert profile.by_function()['L.a'] == {'gas': 1 + 50 + 8 + 1 + 8, 'sload': 1, 'sstore': 0}
+
+
+def test_delegatecall_continues_the_stack():
+    profile = Profile({
+        LIBRARY: make_code('L', library_program),
+        CONTRACT: Code('C', OPCODES['DELEGATECALL'] + OPCODES['STOP'], "0:1:1:-;0:1:1:-", [source, "contract C {}"]),
+    })
+
+    library_steps, gas_left = make_steps(library_program, 2, 90000)
+    steps = (
+        # The cost of the call includes the gas handed to the library.
+        [{'pc': 0, 'op': 'DELEGATECALL', 'depth': 1, 'gas': 100000, 'gasCost': 90700,
+          'stack': ['0x0', '0x' + '00' * 12 + LIBRARY[2:], '0x15f90']}] +
+        library_steps +
+        [{'pc': 1, 'op': 'STOP', 'depth': 1, 'gas': 100000 - 700 - (90000 - gas_left), 'gasCost': 0}]
+    )
+
+    profile.add_trace(CONTRACT, steps)
+
+    assert profile.folded('sstore') == "C.<dispatch>;L.<dispatch>;L.a;L.b 1"
+    assert profile.by_function()['C.<dispatch>']['gas'] == 700
+    assert sum(profile.totals['gas'].values()) == 700 + (90000 - gas_left)